@@ -0,0 +1,70 @@
+"""
+Import time benchmark (python -X importtime)
+
+Imports pyhdwallet (or the given statement) in fresh interpreters and prints
+the median cumulative import time in milliseconds. With --max-ms it exits
+with status 1 when the median is above the limit, so it can be used as a
+regression check.
+
+Example::
+
+    python benchmarks/import_time.py --runs 10 --max-ms 50
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+def _top_level_imports(statement):
+    """
+    Returns the top level imports of a statement run in a new interpreter
+    as (module, cumulative time in microseconds), as reported by
+    -X importtime.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                           statement],
+                          stderr=subprocess.PIPE, check=True,
+                          universal_newlines=True)
+    result = []
+    for line in proc.stderr.splitlines():
+        fields = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or \
+                not fields[1].strip().isdigit():
+            continue
+        # nested imports are indented
+        if not fields[2][1:].startswith(" "):
+            result.append((fields[2].strip(), int(fields[1])))
+    return result
+
+
+def import_time_us(statement):
+    """
+    Returns the cumulative import time (microseconds) of a statement in a
+    new interpreter, leaving out the modules imported by the interpreter
+    start up.
+    """
+    startup = {name for name, _ in _top_level_imports("pass")}
+    return sum(us for name, us in _top_level_imports(statement)
+               if name not in startup)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--statement", default="import pyhdwallet")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="fail if the median is above this limit")
+    args = parser.parse_args()
+    times = [import_time_us(args.statement) / 1000 for _ in range(args.runs)]
+    median = statistics.median(times)
+    print("{}: median {:.1f} ms, min {:.1f} ms, max {:.1f} ms ({} runs)"
+          .format(args.statement, median, min(times), max(times), args.runs))
+    if args.max_ms is not None and median > args.max_ms:
+        print("import time above {} ms".format(args.max_ms))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Thread pool vs process pool benchmark
+
+Derives a range of children and signs many hashes with both executors of
+pyhdwallet.parallel and prints the time of each. Thread pools only run in
+parallel on free-threaded (no-GIL) CPython builds, so run it with both kinds
+of interpreter to compare.
+
+Example::
+
+    python benchmarks/parallel_modes.py --count 20000 --workers 4
+    python3.13t benchmarks/parallel_modes.py --count 20000 --workers 4
+"""
+import argparse
+import sys
+import time
+from binascii import unhexlify
+from pyhdwallet import ecutils
+from pyhdwallet import parallel
+from pyhdwallet.hashutils import sha256
+from pyhdwallet.hdnode import HDNode
+
+SEED = unhexlify('000102030405060708090a0b0c0d0e0f')
+
+
+def _gil_enabled():
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="number of workers (0: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+    ecutils.warmup()
+    node = HDNode.from_seed(SEED)
+    # public derivation (the curve arithmetic is what runs in parallel)
+    xpub = node.neutered()
+    keypairs = [child.keypair for child in node.derive_range(0, 64)]
+    items = [(keypairs[i % 64], sha256(i.to_bytes(4, "big")))
+             for i in range(args.count)]
+    print("python {} (GIL {}), {} workers, {} items".format(
+        sys.version.split()[0], "enabled" if _gil_enabled() else "disabled",
+        parallel.resolve_workers(args.workers), args.count))
+    for executor in (None, parallel.THREAD, parallel.PROCESS):
+        workers = 1 if executor is None else args.workers
+        kind = executor or parallel.THREAD
+        derive = _timed(parallel.derive_range, xpub, 0, args.count, workers,
+                        kind, args.chunk_size)
+        sign = _timed(parallel.sign_many, items, workers, kind,
+                      args.chunk_size)
+        print("{:>10}: derive {:7.2f} s, sign {:7.2f} s".format(
+            executor or "serial", derive, sign))
+
+
+if __name__ == "__main__":
+    main()
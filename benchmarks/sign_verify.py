@@ -0,0 +1,93 @@
+"""
+ECDSA sign/verify microbenchmark
+
+Compares ECPair.sign/verify with the previous implementation, which built
+python-ecdsa Public_key/Private_key/Signature objects and converted the hash
+through a hex string on every call. Prints the time and the peak of memory
+allocated during a call (tracemalloc). python-ecdsa is no longer a
+dependency: the previous implementation is only measured when it is
+installed (pip install ecdsa).
+
+Example::
+
+    python benchmarks/sign_verify.py --count 200
+"""
+import argparse
+import importlib.util
+import time
+import tracemalloc
+from random import SystemRandom
+from pyhdwallet import ecutils
+from pyhdwallet.ecpair import ECPair
+from pyhdwallet.hashutils import sha256
+
+
+def _legacy_hash_to_int(buffer):
+    return int(''.join(['%02x' % b for b in bytearray(buffer)]), 16)
+
+
+def legacy_sign(ecpair, hash_buffer):
+    from ecdsa import SECP256k1
+    from ecdsa.ecdsa import Public_key, Private_key
+    secret = ecpair.privkey
+    g = SECP256k1.generator
+    privkey = Private_key(Public_key(g, g * secret), secret)
+    sig = privkey.sign(_legacy_hash_to_int(hash_buffer),
+                       SystemRandom().randrange(1, ecutils.ORDER - 1))
+    return ecutils.ECSignature(sig.r, sig.s)
+
+
+def legacy_verify(ecpair, hash_buffer, sig):
+    from ecdsa import SECP256k1, VerifyingKey
+    from ecdsa.ecdsa import Public_key, Signature
+    point = VerifyingKey.from_string(ecpair.pubkey_buffer,
+                                     curve=SECP256k1).pubkey.point
+    public_key = Public_key(SECP256k1.generator, point)
+    return public_key.verifies(_legacy_hash_to_int(hash_buffer),
+                               Signature(sig.r, sig.s))
+
+
+def _measure(func, items):
+    start = time.perf_counter()
+    for args in items:
+        func(*args)
+    elapsed = (time.perf_counter() - start) / len(items)
+    peaks = []
+    tracemalloc.start()
+    for args in items[:20]:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        func(*args)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return elapsed * 1e6, max(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=100)
+    args = parser.parse_args()
+    ecutils.warmup()
+    ecpair = ECPair(0x73d286994b2ac1a0f160fb45816c1dd6605551eb0ea12d5595a44)
+    hashes = [sha256(i.to_bytes(4, "big")) for i in range(args.count)]
+    signatures = [ecpair.sign(h) for h in hashes]
+    views = [memoryview(h) for h in hashes]
+    cases = [
+        ("sign (python-ecdsa objects)", legacy_sign,
+         [(ecpair, h) for h in hashes]),
+        ("sign", ECPair.sign, [(ecpair, h) for h in views]),
+        ("verify (python-ecdsa objects)", legacy_verify,
+         list(zip([ecpair] * args.count, hashes, signatures))),
+        ("verify", ECPair.verify, list(zip([ecpair] * args.count, views,
+                                           signatures))),
+    ]
+    if importlib.util.find_spec("ecdsa") is None:
+        cases = [case for case in cases if "python-ecdsa" not in case[0]]
+    for name, func, items in cases:
+        micros, peak = _measure(func, items)
+        print("{:<30} {:9.1f} us/call {:8} bytes peak".format(
+            name, micros, peak))
+
+
+if __name__ == "__main__":
+    main()
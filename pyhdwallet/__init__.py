@@ -1,5 +1,47 @@
 """ Hierarchical Deterministic Wallets (BIP32) in python """
-from .hdnode import HDNode
-from .ecpair import ECPair
+import importlib
 
 __version__ = "1.0.0"
+
+# public names -> module defining them (imported on first access)
+_LAZY_ATTRIBUTES = {
+    "HDNode": "pyhdwallet.hdnode",
+    "ECPair": "pyhdwallet.ecpair",
+}
+
+# True for type checkers and linters only (not imported from typing, which
+# is slow to import): at run time these names are resolved (and their
+# modules imported) by __getattr__
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pyhdwallet.ecpair import ECPair
+    from pyhdwallet.hdnode import HDNode
+
+__all__ = ["HDNode", "ECPair", "warmup"]
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(
+            "module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+def warmup():
+    """
+    Imports the modules deferred on start up and builds the precomputed curve
+    tables, so the first requests of a long-lived server are not slower than
+    the following ones.
+    """
+    from pyhdwallet import ecutils
+    for name in ("pyhdwallet.hdnode", "pyhdwallet.aio", "pyhdwallet.mnemonic",
+                 "base58"):
+        importlib.import_module(name)
+    ecutils.warmup()
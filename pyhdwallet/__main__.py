@@ -0,0 +1,5 @@
+""" Entry point of the command-line tool (see pyhdwallet.cli) """
+import sys
+from pyhdwallet.cli import main
+
+sys.exit(main())
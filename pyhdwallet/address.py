@@ -0,0 +1,139 @@
+"""
+Address encoding from public key hashes (P2PKH, P2WPKH and P2SH-P2WPKH),
+from Taproot output keys (P2TR) and from scripts (P2SH, P2WSH and
+P2SH-P2WSH)
+"""
+from pyhdwallet import hashutils
+from pyhdwallet import encoding
+from pyhdwallet import taproot
+
+# kinds of address
+P2PKH = "p2pkh"
+P2WPKH = "p2wpkh"
+P2SH_P2WPKH = "p2sh-p2wpkh"
+P2TR = "p2tr"
+
+P2SH = "p2sh"
+P2WSH = "p2wsh"
+P2SH_P2WSH = "p2sh-p2wsh"
+
+SEGWIT_KINDS = (P2WPKH, P2SH_P2WPKH)
+SCRIPT_KINDS = (P2SH, P2WSH, P2SH_P2WSH)
+
+
+def _encoder(network, kind):
+    """ Returns a function encoding hash160 values as addresses of a kind """
+    if kind == P2PKH:
+        prefix = network.pub_key_hash
+        return lambda h160: encoding.b58encode_check(prefix + h160)
+    if kind == P2WPKH:
+        if network.bech32_hrp is None:
+            raise ValueError("Network does not support SegWit")
+        hrp = network.bech32_hrp
+        return lambda h160: encoding.segwit_encode(hrp, 0, h160)
+    if kind == P2SH_P2WPKH:
+        if network.script_hash is None:
+            raise ValueError("Network does not support P2SH")
+        prefix = network.script_hash
+        return lambda h160: encoding.b58encode_check(
+            prefix + hashutils.hash160(b"\x00\x14" + h160))
+    if kind == P2TR:
+        raise ValueError("P2TR addresses are encoded from output keys")
+    raise ValueError("Unknown kind of address: {}".format(kind))
+
+
+def from_hash160(hash160, network, kind=P2PKH):
+    """
+    Encodes the hash160 of a public key as an address.
+
+    :param hash160: hash160 of the public key (20 bytes)
+    :param network: Network object
+    :param kind: P2PKH, P2WPKH or P2SH_P2WPKH
+    :return: address as string
+    """
+    return _encoder(network, kind)(hash160)
+
+
+def from_hash160s(hash160s, network, kind=P2PKH):
+    """
+    Encodes many public key hashes as addresses. (batch version of
+    from_hash160)
+
+    :param hash160s: iterable of hash160 values (20 bytes each)
+    :param network: Network object
+    :param kind: P2PKH, P2WPKH or P2SH_P2WPKH
+    :return: list of addresses
+    """
+    return list(map(_encoder(network, kind), hash160s))
+
+
+def from_output_keys(output_keys, network):
+    """
+    Encodes Taproot output keys as P2TR addresses (Bech32m).
+
+    :param output_keys: iterable of x-only output keys (32 bytes each)
+    :param network: Network object
+    :return: list of addresses
+    """
+    if network.bech32_hrp is None:
+        raise ValueError("Network does not support SegWit")
+    hrp = network.bech32_hrp
+    return [encoding.segwit_encode(hrp, 1, key) for key in output_keys]
+
+
+def from_output_key(output_key, network):
+    """
+    Encodes a Taproot output key as a P2TR address (Bech32m).
+
+    :param output_key: x-only output key (32 bytes)
+    :param network: Network object
+    :return: address as string
+    """
+    return from_output_keys([output_key], network)[0]
+
+
+def get_addresses(keys, kind=P2PKH):
+    """
+    Returns the addresses of many key pairs or nodes, reusing the hash160
+    (or, for P2TR, the public key point) already computed and cached by
+    each key pair. P2TR output keys are tweaked in one batch.
+
+    :param keys: iterable of ECPair or HDNode objects of the same network
+    :param kind: P2PKH, P2WPKH, P2SH_P2WPKH or P2TR
+    :return: list of addresses
+    """
+    keypairs = [getattr(key, "keypair", key) for key in keys]
+    if not keypairs:
+        return []
+    if kind == P2TR:
+        return from_output_keys(
+            taproot.output_keys([k.pubkey_point for k in keypairs]),
+            keypairs[0].network)
+    if kind in SEGWIT_KINDS and not all(k.compressed for k in keypairs):
+        raise ValueError("SegWit addresses need compressed public keys")
+    return from_hash160s([k.pubkey_hash for k in keypairs],
+                         keypairs[0].network, kind)
+
+
+def from_script(script, network, kind=P2SH):
+    """
+    Encodes the address paying to a script (e.g. a multisig redeem script).
+
+    :param script: script as bytes
+    :param network: Network object
+    :param kind: P2SH, P2WSH or P2SH_P2WSH
+    :return: address as string
+    """
+    if kind == P2WSH:
+        if network.bech32_hrp is None:
+            raise ValueError("Network does not support SegWit")
+        return encoding.segwit_encode(network.bech32_hrp, 0,
+                                      hashutils.sha256(script))
+    if kind not in (P2SH, P2SH_P2WSH):
+        raise ValueError("Unknown kind of address: {}".format(kind))
+    if network.script_hash is None:
+        raise ValueError("Network does not support P2SH")
+    if kind == P2SH_P2WSH:
+        script = b"\x00\x20" + hashutils.sha256(script)
+    return encoding.b58encode_check(network.script_hash +
+                                    hashutils.hash160(script))
@@ -0,0 +1,163 @@
+"""
+asyncio API for derivation and signing.
+
+CPU bound work runs in an executor (the event loop default executor unless
+another one is configured with set_executor) so the event loop is not
+blocked. Concurrent requests for the same work (same node and path, same
+key and hash) are coalesced: it is done once and every caller gets the same
+result. Cancelling a caller does not affect the other callers waiting for
+the same result; the work itself is cancelled when nobody waits for it.
+
+Functions submitted to a ProcessPoolExecutor must be picklable, so the
+workers are plain module level functions.
+"""
+import asyncio
+import types
+
+# chunk size used to split ranges of derivation
+DEFAULT_CHUNK_SIZE = 64
+
+
+# module settings (executor: see set_executor)
+_settings = types.SimpleNamespace(executor=None)
+_inflight = {}
+
+
+def set_executor(executor):
+    """
+    Sets up the executor (thread or process pool) used to offload the work.
+
+    :param executor: concurrent.futures.Executor or None for the default
+                     executor of the event loop
+    """
+    _settings.executor = executor
+
+
+def get_executor():
+    """
+    Returns the executor configured by set_executor (None for the default
+    executor of the event loop).
+
+    :return: concurrent.futures.Executor or None
+    """
+    return _settings.executor
+
+
+class _Inflight:
+    """ Work shared by concurrent callers """
+    def __init__(self, future):
+        self.future = future
+        self.waiters = 0
+
+
+def _discard(key, entry):
+    """ Removes the work of a key unless it was replaced meanwhile """
+    if _inflight.get(key) is entry:
+        del _inflight[key]
+
+
+async def _coalesce(key, func, *args):
+    """
+    Runs func(*args) in the executor. Callers passing the same key while the
+    work is in progress wait for the same result.
+    """
+    loop = asyncio.get_running_loop()
+    key = (loop, key)
+    entry = _inflight.get(key)
+    if entry is None:
+        future = loop.run_in_executor(_settings.executor, func, *args)
+        entry = _inflight[key] = _Inflight(future)
+        future.add_done_callback(lambda _: _discard(key, entry))
+    entry.waiters += 1
+    try:
+        return await asyncio.shield(entry.future)
+    finally:
+        entry.waiters -= 1
+        if not entry.waiters and not entry.future.done():
+            # removed right away (the done callback runs on a later loop
+            # iteration), so a new caller never gets the cancelled work
+            _discard(key, entry)
+            entry.future.cancel()
+
+
+def _derive_path(node, path):
+    return node.derive_path(path)
+
+
+def _derive_range(node, start, stop):
+    return node.derive_range(start, stop)
+
+
+def _sign(ecpair, hash_buffer):
+    return ecpair.sign(hash_buffer)
+
+
+def _verify_batch(items):
+    return [ecpair.verify(hash_buffer, signature)
+            for ecpair, hash_buffer, signature in items]
+
+
+async def derive_path(node, path):
+    """
+    Asynchronous version of HDNode.derive_path.
+
+    :param node: HDNode object
+    :param path: derivation path as string (e.g. m/0/1'/0)
+    :return: HDNode child
+    """
+    return await _coalesce(("derive_path", node.to_base58(), path),
+                           _derive_path, node, path)
+
+
+async def derive_range(node, start, stop, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Asynchronous version of HDNode.derive_range.
+    The range is split into chunks of chunk_size indexes which run
+    concurrently in the executor.
+
+    :param node: HDNode object
+    :param start: first index
+    :param stop: index after the last one
+    :param chunk_size: number of indexes per executor job
+    :return: list of HDNode children
+    """
+    encoded = node.to_base58()
+    chunks = await asyncio.gather(*[
+        _coalesce(("derive_range", encoded, i, min(i + chunk_size, stop)),
+                  _derive_range, node, i, min(i + chunk_size, stop))
+        for i in range(start, stop, chunk_size)])
+    return [child for chunk in chunks for child in chunk]
+
+
+async def sign(ecpair, hash_buffer):
+    """
+    Asynchronous version of ECPair.sign.
+
+    :param ecpair: ECPair object with a private key
+    :param hash_buffer: 32 byte hash (bytes-like object, e.g. bytearray)
+    :return: ECSignature object
+    """
+    if ecpair.privkey is None:
+        raise RuntimeError("A private key is needed for this operation")
+    # hashable (coalescing key), picklable and not changed by the caller
+    # while the job waits in the executor
+    hash_buffer = bytes(hash_buffer)
+    return await _coalesce(("sign", ecpair.privkey_buffer, hash_buffer),
+                           _sign, ecpair, hash_buffer)
+
+
+async def verify_batch(items, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Verifies many signatures in the executor.
+
+    :param items: sequence of (ECPair, hash_buffer, ECSignature)
+    :param chunk_size: number of signatures per executor job
+    :return: list of bool (True for each valid signature), in input order
+    """
+    loop = asyncio.get_running_loop()
+    items = list(items)
+    chunks = await asyncio.gather(*[
+        loop.run_in_executor(_settings.executor, _verify_batch,
+                             items[i:i + chunk_size])
+        for i in range(0, len(items), chunk_size)])
+    return [result for chunk in chunks for result in chunk]
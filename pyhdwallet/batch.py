@@ -0,0 +1,253 @@
+"""
+Batch operations over many keys.
+
+Each function is equivalent to calling the corresponding HDNode or ECPair
+method once per item, but the curve points of the whole batch are converted
+to affine coordinates (and the ECDSA nonces / s values inverted) with a
+single modular inversion.
+"""
+from array import array
+from pyhdwallet import hashutils
+from pyhdwallet import ecutils
+from pyhdwallet.ecpair import ECPair
+from pyhdwallet.hdnode import HARDENED_BIT
+
+# number of children sharing a modular inversion in derive_public
+DEFAULT_CHUNK_SIZE = 4096
+
+
+def derive_children(items):
+    """
+    Child Extended Key Derivation of many (parent, index) pairs.
+    (batch version of HDNode.derive)
+
+    :param items: sequence of (HDNode, index)
+    :return: list of HDNode children (in the same order)
+    """
+    items = list(items)
+    ECPair.precompute_pubkeys(
+        [node.keypair for node, _ in items if not node.is_neutered()])
+    result = [None] * len(items)
+    public = []  # (position, IL, IR) of neutered parents
+    for pos, (node, index) in enumerate(items):
+        keypair = node.keypair
+        if index >= HARDENED_BIT:
+            if node.is_neutered():
+                raise RuntimeError(
+                    "Neutered node cannot derive hardnened child")
+            data = b"\x00" + keypair.privkey_buffer
+        else:
+            data = keypair.pubkey_buffer
+        i = hashutils.hmac_sha512(node.chain_code,
+                                  data + index.to_bytes(4, "big"))
+        parse256_il = int.from_bytes(i[:32], "big")
+        if parse256_il >= ecutils.ORDER:
+            result[pos] = node.derive(index + 1)
+        elif node.is_neutered():
+            public.append((pos, parse256_il, i[32:]))
+        else:
+            new_key = (parse256_il + keypair.privkey) % ecutils.ORDER
+            if new_key == 0:
+                result[pos] = node.derive(index + 1)
+            else:
+                derived = ECPair(new_key.to_bytes(32, "big"), None,
+                                 network=keypair.network)
+                result[pos] = _child(node, index, derived, i[32:])
+
+    points = ecutils.batch_combine(
+        [(il, items[pos][0].keypair.pubkey_point) for pos, il, _ in public])
+    for (pos, _, ir), point in zip(public, points):
+        node, index = items[pos]
+        if point is None:  # POINT AT INFINITY
+            result[pos] = node.derive(index + 1)
+        else:
+            derived = ECPair.from_point(point, network=node.keypair.network)
+            result[pos] = _child(node, index, derived, ir)
+    return result
+
+
+def _child(node, index, keypair, chain_code):
+    return node.__class__(keypair, chaincode=chain_code, depth=node.depth + 1,
+                          index=index,
+                          parent_fingerprint=int.from_bytes(
+                              node.get_fingerprint(), "big"))
+
+
+def _public_children(nodes, indexes, chunk_size):
+    """
+    Derives the (non-hardened) children of many nodes for the same indexes,
+    chunk by chunk. The HMAC key schedule of each parent and its decoded
+    point are computed once, and each chunk of children shares a single
+    modular inversion.
+
+    :return: generator of lists of (node position, index position, child
+             index, chain code, point) in row order
+    """
+    if any(index >= HARDENED_BIT for index in indexes):
+        raise ValueError("Hardened indexes need private keys")
+    ECPair.precompute_pubkeys(
+        [node.keypair for node in nodes if not node.is_neutered()])
+    suffixes = [index.to_bytes(4, "big") for index in indexes]
+    pending = []  # (node position, index position, IL, IR)
+    for n, node in enumerate(nodes):
+        pubkey = node.keypair.pubkey_buffer
+        hmac_sha512 = hashutils.hmac_sha512_keyed(node.chain_code)
+        for i, suffix in enumerate(suffixes):
+            digest = hmac_sha512(pubkey + suffix)
+            pending.append((n, i, int.from_bytes(digest[:32], "big"),
+                            digest[32:]))
+            if len(pending) >= chunk_size:
+                yield _combine_chunk(nodes, indexes, pending)
+                pending = []
+    if pending:
+        yield _combine_chunk(nodes, indexes, pending)
+
+
+def _combine_chunk(nodes, indexes, pending):
+    valid = [item for item in pending if item[2] < ecutils.ORDER]
+    points = iter(ecutils.batch_combine(
+        [(il, nodes[n].keypair.pubkey_point) for n, _, il, _ in valid]))
+    result = []
+    for n, i, il, ir in pending:
+        point = next(points) if il < ecutils.ORDER else None
+        if point is None:  # invalid IL or POINT AT INFINITY
+            child = nodes[n].derive(indexes[i] + 1)
+            result.append((n, i, child.index, child.chain_code,
+                           child.keypair.pubkey_point))
+        else:
+            result.append((n, i, indexes[i], ir, point))
+    return result
+
+
+def derive_public_points(nodes, indexes):
+    """
+    Computes the public key points of the (non-hardened) children of many
+    nodes, for the same indexes, in a single batch. The point of each parent
+    is decoded only once (it is kept by its key pair).
+
+    :param nodes: sequence of HDNode objects
+    :param indexes: sequence of non-hardened indexes
+    :return: list (one per node) of lists (one per index) of (x, y)
+    """
+    nodes, indexes = list(nodes), list(indexes)
+    result = [[None] * len(indexes) for _ in nodes]
+    for chunk in _public_children(nodes, indexes, DEFAULT_CHUNK_SIZE):
+        for n, i, _, _, point in chunk:
+            result[n][i] = point
+    return result
+
+
+class ChildKeys:
+    """
+    Children of many parents at the same indexes, stored as aligned compact
+    arrays: entry k = n * len(indexes) + i is the child of parent n at
+    indexes[i], with its public key at pubkeys[33 * k:33 * (k + 1)] and its
+    chain code at chain_codes[32 * k:32 * (k + 1)].
+    """
+
+    def __init__(self, parents, indexes, pubkeys, chain_codes,
+                 child_indexes):
+        self.parents = parents
+        self.indexes = indexes
+        self.pubkeys = pubkeys
+        self.chain_codes = chain_codes
+        # index of each child (indexes[i] unless that index was invalid
+        # and the next one was used, as in HDNode.derive)
+        self.child_indexes = child_indexes
+
+    def __len__(self):
+        return len(self.child_indexes)
+
+    def __position(self, parent, index):
+        if not 0 <= parent < len(self.parents) or \
+                not 0 <= index < len(self.indexes):
+            raise IndexError("Child out of range")
+        return parent * len(self.indexes) + index
+
+    def get_pubkey(self, parent, index):
+        """
+        Returns the compressed public key of a child.
+
+        :param parent: position of the parent
+        :param index: position of the index
+        :return: public key as bytes (33 bytes)
+        """
+        k = self.__position(parent, index)
+        return self.pubkeys[33 * k:33 * (k + 1)]
+
+    def get_chain_code(self, parent, index):
+        """
+        Returns the chain code of a child.
+
+        :param parent: position of the parent
+        :param index: position of the index
+        :return: chain code as bytes (32 bytes)
+        """
+        k = self.__position(parent, index)
+        return self.chain_codes[32 * k:32 * (k + 1)]
+
+    def get_node(self, parent, index):
+        """
+        Returns a child as a (neutered) HDNode.
+
+        :param parent: position of the parent
+        :param index: position of the index
+        :return: HDNode object
+        """
+        k = self.__position(parent, index)
+        node = self.parents[parent]
+        keypair = ECPair(None, self.pubkeys[33 * k:33 * (k + 1)],
+                         network=node.keypair.network)
+        return _child(node, self.child_indexes[k], keypair,
+                      self.chain_codes[32 * k:32 * (k + 1)])
+
+
+def derive_public(nodes, indexes, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Derives the (non-hardened) children of many nodes (e.g. thousands of
+    xpubs) for the same index or indexes in a single batch. (batch version
+    of HDNode.derive for many parents)
+
+    :param nodes: sequence of HDNode objects (usually neutered)
+    :param indexes: index or sequence of non-hardened indexes (e.g. range)
+    :param chunk_size: number of children sharing a modular inversion
+    :return: ChildKeys object
+    """
+    nodes = list(nodes)
+    indexes = [indexes] if isinstance(indexes, int) else list(indexes)
+    pubkeys = bytearray()
+    chain_codes = bytearray()
+    child_indexes = array("I")
+    for chunk in _public_children(nodes, indexes, chunk_size):
+        for _, _, index, chain_code, point in chunk:
+            pubkeys += ecutils.point_to_bytes(point)
+            chain_codes += chain_code
+            child_indexes.append(index)
+    return ChildKeys(nodes, indexes, bytes(pubkeys), bytes(chain_codes),
+                     child_indexes)
+
+
+def sign_many(items):
+    """
+    Signs many hashes. (batch version of ECPair.sign)
+
+    :param items: sequence of (ECPair, hash_buffer)
+    :return: list of ECSignature objects (in the same order)
+    """
+    items = list(items)
+    for ecpair, _ in items:
+        if ecpair.privkey is None:
+            raise RuntimeError("A private key is needed for this operation")
+    return ecutils.batch_sign([(ecpair.privkey, hash_buffer)
+                               for ecpair, hash_buffer in items])
+
+
+def verify_many(items):
+    """
+    Verifies many signatures. (batch version of ECPair.verify)
+
+    :param items: sequence of (ECPair, hash_buffer, ECSignature)
+    :return: list of bool (True for each valid signature)
+    """
+    return ecutils.batch_verify([(ecpair.pubkey_point, hash_buffer, sig)
+                                 for ecpair, hash_buffer, sig in items])
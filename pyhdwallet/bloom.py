@@ -0,0 +1,213 @@
+"""
+Bloom filter of hash160s (e.g. HDNode.get_identifier or the hash160s of
+keyrange.enumerate_keys), to scan many outputs against millions of derived
+keys without keeping them all in a set. Only candidate hits (all of them
+plus a configurable rate of false positives) need an exact lookup.
+
+The items are already uniformly distributed hashes, so the positions of an
+item are taken from its own bytes (double hashing of two 64-bit words)
+instead of hashing it again. Filters can be saved to a file and loaded
+with mmap, so many processes share the same pages.
+
+Example::
+
+    >>> bloom = BloomFilter(10 ** 7, fp_rate=1e-4)
+    >>> for chunk in enumerate_keys(1, 10 ** 7 + 1):
+    ...     bloom.add_many(chunk.hash160s)
+    >>> bloom.save("keys.bloom")
+    >>> with BloomFilter.load("keys.bloom") as bloom:
+    ...     hits = bloom.contains_many(output_hashes)
+"""
+import math
+import mmap
+import struct
+
+# magic, number of hashes, number of bits, number of items added
+_HEADER = struct.Struct("<8sBxxxxxxxQQ")
+_MAGIC = b"PHWBLOOM"
+_WORD_MASK = (1 << 64) - 1
+MIN_ITEM_SIZE = 16
+
+
+def optimal_parameters(capacity, fp_rate):
+    """
+    Returns the size of a Bloom filter and its number of hashes for a
+    number of items and a false-positive rate.
+
+    :param capacity: expected number of items
+    :param fp_rate: false-positive rate (between 0 and 1)
+    :return: (number of bits, number of hashes)
+    """
+    if capacity < 1:
+        raise ValueError("capacity should be at least 1")
+    if not 0 < fp_rate < 1:
+        raise ValueError("fp_rate should be between 0 and 1")
+    bits = math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2)
+    bits = max(8, (bits + 7) // 8 * 8)
+    hashes = max(1, min(255, round(bits / capacity * math.log(2))))
+    return bits, hashes
+
+
+class BloomFilter:
+    """
+    Bloom filter of hashes (at least 16 bytes each, e.g. hash160s)
+    """
+
+    def __init__(self, capacity, fp_rate=0.001):
+        """
+        Creates an empty filter.
+
+        :param capacity: expected number of items
+        :param fp_rate: false-positive rate when capacity items were added
+        """
+        self.__bits, self.__hashes = optimal_parameters(capacity, fp_rate)
+        self.__buffer = bytearray(self.__bits // 8)
+        self.__count = 0
+        self.__mmap = None
+
+    @classmethod
+    def from_hash160s(cls, hash160s, fp_rate=0.001):
+        """
+        Creates a filter sized for a collection of hashes and adds them.
+
+        :param hash160s: sized collection of hashes (e.g. list of bytes)
+        :param fp_rate: false-positive rate
+        :return: new BloomFilter object
+        """
+        bloom = cls(max(1, len(hash160s)), fp_rate)
+        bloom.add_many(hash160s)
+        return bloom
+
+    @property
+    def size_bits(self):
+        """ Number of bits of the filter """
+        return self.__bits
+
+    @property
+    def num_hashes(self):
+        """ Number of positions set per item """
+        return self.__hashes
+
+    @property
+    def count(self):
+        """ Number of items added """
+        return self.__count
+
+    @property
+    def false_positive_rate(self):
+        """ Expected false-positive rate for the items added so far """
+        return (1 - math.exp(-self.__hashes * self.__count / self.__bits)) \
+            ** self.__hashes
+
+    def __positions(self, item):
+        if len(item) < MIN_ITEM_SIZE:
+            raise ValueError("Items should be hashes of at least {} bytes"
+                             .format(MIN_ITEM_SIZE))
+        words = int.from_bytes(item[:MIN_ITEM_SIZE], "little")
+        first, step = words & _WORD_MASK, (words >> 64) | 1
+        bits = self.__bits
+        return [(first + i * step) % bits for i in range(self.__hashes)]
+
+    def add(self, item):
+        """
+        Adds a hash to the filter.
+
+        :param item: hash as bytes (e.g. 20-byte hash160)
+        """
+        self.add_many([item])
+
+    def add_many(self, items):
+        """
+        Adds many hashes to the filter.
+
+        :param items: iterable of hashes
+        """
+        if self.__mmap is not None:
+            raise RuntimeError("Filters loaded from a file are read-only")
+        buffer = self.__buffer
+        if buffer is None:
+            raise RuntimeError("Filter is closed")
+        positions = self.__positions
+        count = 0
+        for item in items:
+            for position in positions(item):
+                buffer[position >> 3] |= 1 << (position & 7)
+            count += 1
+        self.__count += count
+
+    def __contains__(self, item):
+        return self.contains_many([item])[0]
+
+    def contains_many(self, items):
+        """
+        Checks many hashes. False means the hash was never added; True means
+        it was probably added (confirm it with an exact lookup).
+
+        :param items: iterable of hashes
+        :return: list of bool, in input order
+        """
+        buffer = self.__buffer
+        if buffer is None:
+            raise RuntimeError("Filter is closed")
+        positions = self.__positions
+        return [all(buffer[p >> 3] >> (p & 7) & 1 for p in positions(item))
+                for item in items]
+
+    def save(self, path):
+        """
+        Writes the filter to a file (see load).
+
+        :param path: path of the file
+        """
+        with open(path, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, self.__hashes, self.__bits,
+                                    self.__count))
+            file.write(self.__buffer)
+
+    @classmethod
+    def load(cls, path, use_mmap=True):
+        """
+        Loads a filter written by save. With use_mmap the bits are mapped
+        read-only (the file is not read into memory and the filter cannot be
+        changed); close it when done.
+
+        :param path: path of the file
+        :param use_mmap: maps the file instead of reading it
+        :return: BloomFilter object
+        """
+        with open(path, "rb") as file:
+            header = file.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError("Invalid Bloom filter file")
+            magic, hashes, bits, count = _HEADER.unpack(header)
+            if magic != _MAGIC or hashes < 1 or bits < 8 or bits % 8:
+                raise ValueError("Invalid Bloom filter file")
+            if use_mmap:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                buffer = memoryview(mapped)[_HEADER.size:]
+            else:
+                mapped = None
+                buffer = bytearray(file.read())
+        if len(buffer) != bits // 8:
+            if mapped is not None:
+                buffer.release()
+                mapped.close()
+            raise ValueError("Invalid Bloom filter file")
+        bloom = cls.__new__(cls)
+        bloom.__bits, bloom.__hashes, bloom.__count = bits, hashes, count
+        bloom.__buffer, bloom.__mmap = buffer, mapped
+        return bloom
+
+    def close(self):
+        """ Unmaps the file of a filter loaded with mmap (it is unusable) """
+        if self.__mmap is not None:
+            self.__buffer.release()
+            self.__mmap.close()
+            self.__mmap = None
+            self.__buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
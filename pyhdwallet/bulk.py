@@ -0,0 +1,84 @@
+"""
+Bulk import of extended keys (xpub/xprv), e.g. from files with millions of
+lines.
+
+The input is read lazily and parsed in chunks, optionally across processes,
+so memory usage does not depend on the size of the input.
+
+Example::
+
+    >>> for result in parse_extended_keys("xpubs.txt", workers=4,
+    ...                                   validate=True):
+    ...     if result.error:
+    ...         print("line", result.line, result.error)
+"""
+import os
+from collections import namedtuple
+from pyhdwallet import ecutils
+from pyhdwallet import parallel
+from pyhdwallet.hdnode import HDNode
+
+# line: line number (starting at 1), node: HDNode (None on error),
+# error: error message (None on success)
+ParsedKey = namedtuple("ParsedKey", ["line", "node", "error"])
+
+
+def _read_lines(source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf8") as file:
+            yield from file
+    else:
+        yield from source
+
+
+def validate_node(node):
+    """
+    Checks that the key of a node is valid: the public key must be a point
+    of the curve and the private key must be in the range [1, n-1].
+    The public key point is kept in the key pair.
+
+    :param node: HDNode object
+    :raise ValueError: if the key is invalid
+    """
+    keypair = node.get_keypair()
+    if node.is_neutered():
+        # decoding the point checks it is on the curve (and caches it)
+        _ = keypair.pubkey_point
+    elif not 0 < keypair.privkey < ecutils.ORDER:
+        raise ValueError("Invalid private key")
+
+
+def _parse_chunk(chunk, validate):
+    result = []
+    for line, encoded in chunk:
+        try:
+            node = HDNode.from_base58(encoded)
+            if validate:
+                validate_node(node)
+        except Exception as exc:  # pylint: disable=broad-except
+            result.append(ParsedKey(line, None, str(exc) or repr(exc)))
+        else:
+            result.append(ParsedKey(line, node, None))
+    return result
+
+
+def parse_extended_keys(source, workers=None,
+                        chunk_size=parallel.DEFAULT_CHUNK_SIZE,
+                        validate=False):
+    """
+    Parses extended keys, one per line. Blank lines are skipped.
+
+    :param source: path of a text file or iterable of strings
+    :param workers: number of processes (0 means one per CPU; None or 1
+                    parses in the calling process)
+    :param chunk_size: number of lines per chunk
+    :param validate: check that each key is valid (see validate_node)
+    :return: generator of ParsedKey(line, node, error) in input order
+    """
+    lines = ((number, text.strip())
+             for number, text in enumerate(_read_lines(source), 1)
+             if text.strip())
+    for chunk in parallel.map_chunks(_parse_chunk,
+                                     parallel.chunked(lines, chunk_size),
+                                     workers, args=(validate,)):
+        yield from chunk
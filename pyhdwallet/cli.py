@@ -0,0 +1,190 @@
+"""
+Command-line tool for bulk derivation (python -m pyhdwallet)
+
+Derives the children of a path template (e.g. m/0/*) for a range of indexes
+and streams addresses, public keys or WIFs to stdout as CSV, JSON lines or
+fixed-width binary records. The range is processed in chunks (optionally
+across processes) with a bounded number of chunks in flight, so memory usage
+does not depend on the size of the range.
+
+Binary records are a 4-byte big-endian index followed by a fixed-width
+value: the 33-byte compressed public key (pubkey), the 20-byte hash of the
+address payload (address; the 32-byte output key for P2TR) or the 32-byte
+private key (wif).
+
+Example::
+
+    python -m pyhdwallet --xkey xpub... --path "m/0/*" --start 0 \\
+        --count 1000000 --output address --format csv --workers 4
+"""
+import argparse
+import functools
+import json
+import os
+import sys
+from pyhdwallet import address
+from pyhdwallet import batch
+from pyhdwallet import hashutils
+from pyhdwallet import parallel
+from pyhdwallet import taproot
+from pyhdwallet.ecpair import ECPair
+from pyhdwallet.hdnode import HDNode, HARDENED_BIT
+from pyhdwallet.networks import Network
+
+OUTPUTS = ("address", "pubkey", "wif")
+FORMATS = ("csv", "jsonl", "binary")
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _parse_template(template):
+    """
+    Splits a path template (e.g. m/0/*) in the path of the parent and
+    whether the children are hardened.
+    """
+    parent, _, last = template.rpartition("/")
+    if not parent or last not in ("*", "*'", "*h", "*H"):
+        raise ValueError("Path template should end with /* (e.g. m/0/*)")
+    if "*" in parent:
+        raise ValueError("Only the last level of the path may be *")
+    return parent, last != "*"
+
+
+def _binary_value(child, output, kind):
+    keypair = child.keypair
+    if output == "pubkey":
+        return keypair.pubkey_buffer
+    if output == "wif":
+        return keypair.privkey_buffer
+    if kind == address.P2SH_P2WPKH:
+        return hashutils.hash160(b"\x00\x14" + keypair.pubkey_hash)
+    return keypair.pubkey_hash
+
+
+def _text_value(child, output, kind):
+    if output == "pubkey":
+        return child.keypair.pubkey_buffer.hex()
+    if output == "wif":
+        return child.keypair.to_wif()
+    return child.get_address(kind)
+
+
+def _render_chunk(bounds, parent, *, hardened, output, kind, fmt):
+    """ Derives a chunk of the range and returns the encoded records """
+    offset = HARDENED_BIT if hardened else 0
+    children = batch.derive_children(
+        [(parent, i + offset) for i in range(*bounds)])
+    if output != "wif":
+        ECPair.precompute_pubkeys([c.keypair for c in children])
+    if output == "address" and kind == address.P2TR:
+        # output keys of the whole chunk tweaked in one batch
+        values = taproot.output_keys([c.keypair.pubkey_point
+                                      for c in children])
+        if fmt != "binary":
+            values = address.from_output_keys(values,
+                                              parent.keypair.network)
+    elif fmt == "binary":
+        values = [_binary_value(c, output, kind) for c in children]
+    else:
+        values = [_text_value(c, output, kind) for c in children]
+    if fmt == "binary":
+        return b"".join([(child.index - offset).to_bytes(4, "big") + value
+                         for child, value in zip(children, values)])
+    lines = []
+    for child, value in zip(children, values):
+        if fmt == "csv":
+            lines.append("{},{}\n".format(child.index - offset, value))
+        else:
+            lines.append(json.dumps({"index": child.index - offset,
+                                     output: value}) + "\n")
+    return "".join(lines).encode()
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m pyhdwallet",
+        description="Bulk derivation of BIP32 keys")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--xkey", help="extended key (xpub/xprv)")
+    source.add_argument("--seed", help="seed as hex string")
+    source.add_argument("--mnemonic", help="bip39 mnemonic")
+    parser.add_argument("--passphrase", default="",
+                        help="bip39 passphrase (with --mnemonic)")
+    parser.add_argument("--network", default="Bitcoin Mainnet",
+                        help="network description (with --seed/--mnemonic)")
+    parser.add_argument("--path", default="m/0/*",
+                        help="path template, the last level is * "
+                             "(default: m/0/*)")
+    parser.add_argument("--start", type=int, default=0,
+                        help="first index (default: 0)")
+    parser.add_argument("--count", type=int, required=True,
+                        help="number of indexes")
+    parser.add_argument("--output", choices=OUTPUTS, default="address")
+    parser.add_argument("--address-kind", default=address.P2PKH,
+                        choices=(address.P2PKH,) + address.SEGWIT_KINDS +
+                        (address.P2TR,))
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of processes (0: one per CPU)")
+    parser.add_argument("--chunk-size", type=int,
+                        default=DEFAULT_CHUNK_SIZE)
+    return parser
+
+
+def _root_node(args):
+    if args.xkey:
+        return HDNode.from_base58(args.xkey)
+    networks = [x for x in Network.get_supported_networks()
+                if x.description.lower() == args.network.lower()]
+    if not networks:
+        raise ValueError("Network not supported: {}".format(args.network))
+    if args.seed:
+        return HDNode.from_seed(bytes.fromhex(args.seed), networks[0])
+    return HDNode.from_mnemonic(args.mnemonic, args.passphrase, networks[0])
+
+
+def main(argv=None, out=None):
+    """
+    Runs the command-line tool.
+
+    :param argv: list of arguments (default: sys.argv[1:])
+    :param out: binary stream the records are written to (default: stdout)
+    :return: exit status
+    """
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.start < 0 or args.count < 0 or \
+            args.start + args.count > HARDENED_BIT:
+        parser.error("invalid range of indexes")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size should be at least 1")
+    stdout = out is None
+    out = out or sys.stdout.buffer
+    try:
+        parent_path, hardened = _parse_template(args.path)
+        parent = _root_node(args).derive_path(parent_path)
+        if args.output == "wif" and parent.is_neutered():
+            raise ValueError("WIF output needs a private key")
+        if hardened and parent.is_neutered():
+            raise ValueError("Neutered node cannot derive hardened children")
+        if args.format == "csv":
+            out.write("index,{}\n".format(args.output).encode())
+        chunks = parallel.ranges(args.start, args.start + args.count,
+                                 args.chunk_size)
+        render = functools.partial(_render_chunk, hardened=hardened,
+                                   output=args.output,
+                                   kind=args.address_kind, fmt=args.format)
+        for data in parallel.map_chunks(render, chunks, args.workers,
+                                        args=(parent,)):
+            out.write(data)
+            out.flush()
+    except ValueError as exc:
+        print("error: {}".format(exc), file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # the reader went away (e.g. piped to head): stops quietly. stdout
+        # is pointed at devnull so flushing it at exit does not fail again
+        if stdout:
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    return 0
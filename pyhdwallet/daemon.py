@@ -0,0 +1,547 @@
+"""
+Local derivation daemon over a Unix domain socket.
+
+A long-lived process keeps the precomputed curve tables and a cache of
+derived nodes warm, and answers derive/address/sign/verify requests from
+short-lived workers on the same machine. It only listens on a Unix domain
+socket (created with 0600 permissions), never on the network.
+
+Protocol: each frame is a header (frame length, request id, code) followed by
+the body. The code of a request is the operation; the code of a response is
+OK or ERROR (the body is then the error message). Requests on a connection
+can be pipelined: clients may send many requests before reading the
+responses, which come back in order with the same request ids. Request
+bodies start with the 78-byte serialization of the extended key
+(HDNode.to_bytes):
+
+    DERIVE   key | path                       -> 78-byte child key
+    ADDRESS  key | kind (1 byte) | path       -> address (ASCII)
+    SIGN     key | hash (32) | path           -> r (32) | s (32)
+    VERIFY   key | hash (32) | r | s | path   -> 1 byte (1 if valid)
+
+Start it with::
+
+    python -m pyhdwallet.daemon --socket /run/user/1000/pyhdwallet.sock
+
+and use it with the client::
+
+    >>> with DaemonClient("/run/user/1000/pyhdwallet.sock") as client:
+    ...     node = client.node("xprv...")
+    ...     print(node.derive_path("m/84'/0'/0'/0/5").get_address())
+"""
+import argparse
+import os
+import queue
+import socket
+import socketserver
+import stat
+import struct
+import threading
+from pyhdwallet import address
+from pyhdwallet import ecutils
+from pyhdwallet import encoding
+from pyhdwallet.hdnode import HDNode, HARDENED_BIT, SERIALIZED_SIZE, \
+    KeyCache, parse_path
+
+# operations
+DERIVE = 1
+ADDRESS = 2
+SIGN = 3
+VERIFY = 4
+# response codes
+OK = 0
+ERROR = 1
+
+# kinds of address by code (ADDRESS requests)
+ADDRESS_KINDS = (address.P2PKH, address.P2WPKH, address.P2SH_P2WPKH,
+                 address.P2TR)
+
+DEFAULT_CACHE_SIZE = 100000
+DEFAULT_POOL_SIZE = 4
+# maximum number of requests in flight on a connection: the responses of a
+# window always fit in the socket buffers, so neither side blocks writing
+PIPELINE_WINDOW = 256
+MAX_FRAME_SIZE = 1 << 16
+
+# frame length (after this field), request id and code
+_HEADER = struct.Struct(">IIB")
+_LENGTH_SIZE = 4
+
+
+class NodeCache:
+    """
+    LRU cache of derived nodes (see hdnode.KeyCache), keyed by the
+    serialization of the parent and the indexes of the path. Every
+    intermediate node of a path is cached, so paths sharing a prefix derive
+    it once.
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        """
+        :param max_size: maximum number of nodes kept
+        """
+        self.__cache = KeyCache(max_size)
+
+    def __len__(self):
+        return self.__cache.info().currsize
+
+    @property
+    def hits(self):
+        """ Number of paths found in the cache """
+        return self.__cache.info().hits
+
+    @property
+    def misses(self):
+        """ Number of paths (partially) derived """
+        return self.__cache.info().misses
+
+    def get(self, key_buffer, path):
+        """
+        Returns the node of a path, deriving (and caching) only the part of
+        the path that is not cached yet.
+
+        :param key_buffer: 78-byte serialization of the parent
+        :param path: derivation path as string (e.g. m/0/1'/0)
+        :return: HDNode object
+        """
+        cache = self.__cache
+        indexes = parse_path(path)
+        depth = len(indexes)
+        node = cache.get((key_buffer, indexes), record=False)
+        while node is None and depth > 0:
+            depth -= 1
+            node = cache.get((key_buffer, indexes[:depth]), record=False)
+        hit = node is not None and depth == len(indexes)
+        cache.record(hit)
+        if hit:
+            return node
+        if node is None:
+            node = cache.put((key_buffer, ()), HDNode.from_bytes(key_buffer))
+        for depth in range(depth, len(indexes)):
+            node = cache.put((key_buffer, indexes[:depth + 1]),
+                             node.derive(indexes[depth]))
+        return node
+
+
+def _split_key(body):
+    if len(body) < SERIALIZED_SIZE:
+        raise ValueError("Invalid request")
+    return bytes(body[:SERIALIZED_SIZE]), body[SERIALIZED_SIZE:]
+
+
+def _path(buffer):
+    return bytes(buffer).decode("ascii") or "m"
+
+
+def process_request(cache, operation, body):
+    """
+    Runs a request and returns the body of the response.
+
+    :param cache: NodeCache object
+    :param operation: DERIVE, ADDRESS, SIGN or VERIFY
+    :param body: request body as bytes
+    :return: response body as bytes
+    """
+    key, rest = _split_key(body)
+    if operation == DERIVE:
+        return cache.get(key, _path(rest)).to_bytes()
+    if operation == ADDRESS:
+        if not rest or rest[0] >= len(ADDRESS_KINDS):
+            raise ValueError("Unknown kind of address")
+        node = cache.get(key, _path(rest[1:]))
+        return node.get_address(ADDRESS_KINDS[rest[0]]).encode("ascii")
+    if operation == SIGN:
+        if len(rest) < 32:
+            raise ValueError("Invalid request")
+        node = cache.get(key, _path(rest[32:]))
+        sig = node.keypair.sign(rest[:32])
+        return sig.r.to_bytes(32, "big") + sig.s.to_bytes(32, "big")
+    if operation == VERIFY:
+        if len(rest) < 96:
+            raise ValueError("Invalid request")
+        node = cache.get(key, _path(rest[96:]))
+        sig = ecutils.ECSignature(int.from_bytes(rest[32:64], "big"),
+                                  int.from_bytes(rest[64:96], "big"))
+        return b"\x01" if node.keypair.verify(rest[:32], sig) else b"\x00"
+    raise ValueError("Unknown operation: {}".format(operation))
+
+
+def _frame(request_id, code, body):
+    return _HEADER.pack(_HEADER.size - _LENGTH_SIZE + len(body), request_id,
+                        code) + body
+
+
+def _read_frame(stream):
+    """ Reads a frame; returns (request id, code, body) or None at EOF """
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    length, request_id, code = _HEADER.unpack(header)
+    size = length - (_HEADER.size - _LENGTH_SIZE)
+    if not 0 <= size <= MAX_FRAME_SIZE:
+        raise ValueError("Invalid frame")
+    body = stream.read(size)
+    if len(body) < size:
+        return None
+    return request_id, code, body
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        cache = self.server.cache
+        while True:
+            try:
+                frame = _read_frame(self.rfile)
+            except ValueError:
+                return  # protocol error: drops the connection
+            if frame is None:
+                return
+            request_id, operation, body = frame
+            try:
+                response = _frame(request_id, OK,
+                                  process_request(cache, operation, body))
+            except Exception as exc:  # pylint: disable=broad-except
+                # any failure is reported, so the client never waits forever
+                response = _frame(request_id, ERROR, "{}: {}".format(
+                    type(exc).__name__, exc).encode())
+            self.wfile.write(response)
+
+
+def _remove_socket(path):
+    """ Removes a Unix domain socket file (never any other kind of file) """
+    try:
+        if stat.S_ISSOCK(os.lstat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class DerivationServer(socketserver.ThreadingMixIn,
+                       socketserver.UnixStreamServer):
+    """
+    Derivation daemon listening on a Unix domain socket (one thread per
+    connection, sharing the node cache).
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path, cache_size=DEFAULT_CACHE_SIZE):
+        """
+        Creates the socket (only the current user can connect to it) and
+        builds the precomputed tables.
+
+        :param socket_path: path of the Unix domain socket
+        :param cache_size: maximum number of nodes in the cache
+        """
+        self.cache = NodeCache(cache_size)
+        ecutils.warmup()
+        _remove_socket(socket_path)  # left by a previous daemon
+        umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self):
+        super().server_close()
+        _remove_socket(self.server_address)
+
+
+def serve(socket_path, cache_size=DEFAULT_CACHE_SIZE):
+    """
+    Runs the daemon until interrupted.
+
+    :param socket_path: path of the Unix domain socket
+    :param cache_size: maximum number of nodes in the cache
+    """
+    with DerivationServer(socket_path, cache_size) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+class DaemonError(Exception):
+    """ Error returned by the daemon for a request """
+
+
+class _Connection:
+    """ Connection to the daemon (socket, reader and next request id) """
+
+    def __init__(self, socket_path, timeout):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path)
+        self.rfile = self.sock.makefile("rb")
+        self.next_id = 0
+
+    def close(self):
+        """ Closes the socket of this connection """
+        self.rfile.close()
+        self.sock.close()
+
+
+class DaemonClient:
+    """
+    Client of the derivation daemon with a pool of connections (so it can be
+    shared by many threads).
+    """
+
+    def __init__(self, socket_path, pool_size=DEFAULT_POOL_SIZE,
+                 timeout=None):
+        """
+        :param socket_path: path of the Unix domain socket of the daemon
+        :param pool_size: maximum number of connections
+        :param timeout: socket timeout in seconds (None: blocking)
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.__idle = queue.LifoQueue()
+        self.__slots = threading.BoundedSemaphore(pool_size)
+
+    def __acquire(self):
+        self.__slots.acquire()
+        try:
+            return self.__idle.get_nowait()
+        except queue.Empty:
+            try:
+                return _Connection(self.socket_path, self.timeout)
+            except OSError:
+                self.__slots.release()
+                raise
+
+    def __release(self, connection, broken=False):
+        if broken:
+            connection.close()
+        else:
+            self.__idle.put(connection)
+        self.__slots.release()
+
+    def call_many(self, requests):
+        """
+        Sends many requests on one connection (pipelined, PIPELINE_WINDOW
+        requests in flight at most) and returns their results in order.
+        Raises DaemonError for the first failed request (after all the
+        responses are read).
+
+        :param requests: sequence of (operation, body)
+        :return: list of response bodies
+        """
+        requests = list(requests)
+        connection = self.__acquire()
+        try:
+            results = []
+            for start in range(0, len(requests), PIPELINE_WINDOW):
+                window = requests[start:start + PIPELINE_WINDOW]
+                first_id = connection.next_id
+                connection.next_id = (first_id + len(window)) & 0xffffffff
+                connection.sock.sendall(b"".join(
+                    [_frame((first_id + i) & 0xffffffff, operation, body)
+                     for i, (operation, body) in enumerate(window)]))
+                for i in range(len(window)):
+                    frame = _read_frame(connection.rfile)
+                    if frame is None or \
+                            frame[0] != (first_id + i) & 0xffffffff:
+                        raise ConnectionError("Invalid response from daemon")
+                    results.append(frame[1:])
+        except BaseException:
+            self.__release(connection, broken=True)
+            raise
+        self.__release(connection)
+        for code, body in results:
+            if code != OK:
+                raise DaemonError(body.decode(errors="replace"))
+        return [body for _, body in results]
+
+    def call(self, operation, body):
+        """
+        Sends a request and returns the body of the response.
+
+        :param operation: DERIVE, ADDRESS, SIGN or VERIFY
+        :param body: request body as bytes
+        :return: response body as bytes
+        """
+        return self.call_many([(operation, body)])[0]
+
+    def node(self, key):
+        """
+        Returns a RemoteNode for an extended key.
+
+        :param key: extended key as Base58Check string, 78 bytes or HDNode
+        :return: RemoteNode object
+        """
+        if isinstance(key, HDNode):
+            key = key.to_bytes()
+        elif isinstance(key, str):
+            key = encoding.b58decode_check(key)
+        if len(key) != SERIALIZED_SIZE:
+            raise ValueError("Invalid extended key")
+        return RemoteNode(self, bytes(key))
+
+    def close(self):
+        """ Closes the idle connections """
+        while True:
+            try:
+                self.__idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class RemoteNode:
+    """
+    Extended key whose derivations and signatures are done by the daemon,
+    with the same methods as HDNode.
+    """
+
+    def __init__(self, client, key_buffer):
+        self.client = client
+        self.key_buffer = key_buffer
+
+    def to_bytes(self):
+        """ Returns the 78-byte serialization of the extended key """
+        return self.key_buffer
+
+    def to_base58(self):
+        """ Returns the extended key as a Base58Check string """
+        return encoding.b58encode_check(self.key_buffer)
+
+    def to_hdnode(self):
+        """ Returns the extended key as a local HDNode """
+        return HDNode.from_bytes(self.key_buffer)
+
+    def derive_path(self, path):
+        """
+        Child Extended Key Derivation. (see HDNode.derive_path)
+
+        :param path: derivation path as string (e.g. m/0/1'/0)
+        :return: RemoteNode child
+        """
+        return RemoteNode(self.client, self.client.call(
+            DERIVE, self.key_buffer + path.encode("ascii")))
+
+    def derive(self, index):
+        """
+        Child Extended Key Derivation. (see HDNode.derive)
+
+        :param index: index for derivation
+        :return: RemoteNode child
+        """
+        return self.derive_path(_index_path(index))
+
+    def derive_hardened(self, index):
+        """
+        Child Extended Key Derivation. (hardened version)
+
+        :param index: index for derivation
+        :return: RemoteNode child
+        """
+        return self.derive(index + HARDENED_BIT)
+
+    def derive_range(self, start, stop):
+        """
+        Child Extended Key Derivation of a range of indexes (pipelined).
+
+        :param start: first index
+        :param stop: index after the last one
+        :return: list of RemoteNode children
+        """
+        return [RemoteNode(self.client, key) for key in self.client.call_many(
+            [(DERIVE, self.key_buffer + _index_path(i).encode("ascii"))
+             for i in range(start, stop)])]
+
+    def get_address(self, kind=address.P2PKH):
+        """
+        Returns the address of this node (P2PKH by default)
+
+        :param kind: one of ADDRESS_KINDS
+        :return: Address as string
+        """
+        return self.get_addresses(["m"], kind)[0]
+
+    def get_addresses(self, paths, kind=address.P2PKH):
+        """
+        Returns the addresses of many descendants of this node (pipelined).
+
+        :param paths: sequence of derivation paths (e.g. m/0/1)
+        :param kind: one of ADDRESS_KINDS
+        :return: list of addresses
+        """
+        if kind not in ADDRESS_KINDS:
+            raise ValueError("Unknown kind of address: {}".format(kind))
+        prefix = self.key_buffer + bytes([ADDRESS_KINDS.index(kind)])
+        return [body.decode("ascii") for body in self.client.call_many(
+            [(ADDRESS, prefix + path.encode("ascii")) for path in paths])]
+
+    def sign(self, hash_buffer):
+        """
+        Signs a 32 byte hash with the key of this node. (see ECPair.sign)
+
+        :param hash_buffer: 32 byte buffer
+        :return: ECSignature object
+        """
+        return self.sign_many([("m", hash_buffer)])[0]
+
+    def sign_many(self, items):
+        """
+        Signs many hashes with keys derived from this node (pipelined).
+        (see HDNode.sign_many)
+
+        :param items: sequence of (derivation path, hash_buffer)
+        :return: list of ECSignature objects (in input order)
+        """
+        requests = []
+        for path, hash_buffer in items:
+            if len(hash_buffer) != 32:
+                raise ValueError("Hash should be 32 bytes")
+            requests.append((SIGN, self.key_buffer + bytes(hash_buffer) +
+                             path.encode("ascii")))
+        return [ecutils.ECSignature(int.from_bytes(body[:32], "big"),
+                                    int.from_bytes(body[32:], "big"))
+                for body in self.client.call_many(requests)]
+
+    def verify(self, hash_buffer, ec_signature):
+        """
+        Verifies a signature of a 32 byte hash. (see ECPair.verify)
+
+        :param hash_buffer: 32 byte buffer
+        :param ec_signature: ECSignature object
+        :return: True if this signature is valid
+        """
+        if len(hash_buffer) != 32:
+            raise ValueError("Hash should be 32 bytes")
+        body = self.client.call(VERIFY, self.key_buffer + bytes(hash_buffer) +
+                                ec_signature.r.to_bytes(32, "big") +
+                                ec_signature.s.to_bytes(32, "big") + b"m")
+        return body == b"\x01"
+
+
+def _index_path(index):
+    if index >= HARDENED_BIT:
+        return "m/{}'".format(index - HARDENED_BIT)
+    return "m/{}".format(index)
+
+
+def main(argv=None):
+    """
+    Runs the daemon from the command line.
+
+    :param argv: list of arguments (default: sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m pyhdwallet.daemon",
+        description="Local BIP32 derivation daemon (Unix domain socket)")
+    parser.add_argument("--socket", required=True,
+                        help="path of the Unix domain socket")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help="maximum number of cached nodes")
+    args = parser.parse_args(argv)
+    serve(args.socket, args.cache_size)
+
+
+if __name__ == "__main__":
+    main()
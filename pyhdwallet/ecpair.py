@@ -1,8 +1,10 @@
 """ Elliptic Curve Cryptography module """
 
-import base58
 from pyhdwallet import hashutils
+from pyhdwallet import encoding
+from pyhdwallet import address
 from pyhdwallet import ecutils
+from pyhdwallet import schnorr
 from pyhdwallet.networks import Network
 
 DEFAULT_NETWORK = Network.get_supported_networks()[0]
@@ -11,6 +13,10 @@ DEFAULT_NETWORK = Network.get_supported_networks()[0]
 class ECPair:
     """
     Elliptic Curve Cryptography key pair
+
+    The public key, its point and hash are computed on first use and kept.
+    They only depend on the key, so concurrent first accesses from many
+    threads at most compute them twice (and store the same value).
     """
 
     def __init__(self, privkey, pubkey_buffer=None, compressed=True,
@@ -32,11 +38,13 @@ class ECPair:
         self.__compressed = compressed
         self.__privkey_buf = None
         self.__pubkey_buf = None
+        self.__point = None
+        self.__pubkey_hash = None
 
         # basic validations
         if not (privkey is None) ^ (pubkey_buffer is None):
             raise ValueError("Pass public key or private key, not both")
-        if not network or network not in Network.get_supported_networks():
+        if not network or not Network.is_supported(network):
             raise ValueError("None or unsupported network")
         if compressed is not None and not isinstance(compressed, bool):
             raise ValueError("Compressed parameter should be bool or None")
@@ -73,6 +81,40 @@ class ECPair:
                 self.privkey, self.__compressed)
         return self.__pubkey_buf
 
+    @property
+    def pubkey_hash(self):
+        """
+        Returns the hash160 of the public key (computed once).
+
+        :return: hash160 of the public key as bytes (20 bytes)
+        """
+        if self.__pubkey_hash is None:
+            self.__pubkey_hash = hashutils.hash160(self.pubkey_buffer)
+        return self.__pubkey_hash
+
+    @property
+    def pubkey_point(self):
+        """
+        Returns the public key point in affine coordinates.
+
+        :return: (x, y) tuple of ints
+        """
+        if self.__point is None:
+            if self.__pubkey_buf is not None:
+                self.__point = ecutils.point_from_bytes(self.__pubkey_buf)
+            else:
+                self.__point = ecutils.batch_points([self.privkey])[0]
+        return self.__point
+
+    @property
+    def xonly_pubkey(self):
+        """
+        Returns the x-only public key (BIP340).
+
+        :return: x coordinate of the public key point as bytes (32 bytes)
+        """
+        return self.pubkey_point[0].to_bytes(32, "big")
+
     @property
     def privkey_buffer(self):
         """
@@ -111,6 +153,38 @@ class ECPair:
         """
         return self.__compressed
 
+    @classmethod
+    def from_point(cls, point, compressed=True, network=DEFAULT_NETWORK):
+        """
+        Creates a new ECPair object (public key only) from a public key point
+        already computed, which is kept in the object.
+
+        :param point: public key point as (x, y) tuple of ints
+        :param compressed: whether or not to use compressed public key
+        :param network: Network object
+        :return: new ECPair object
+        """
+        ecpair = cls(None, ecutils.point_to_bytes(point, compressed),
+                     network=network)
+        ecpair.__point = point
+        return ecpair
+
+    @classmethod
+    def precompute_pubkeys(cls, ecpairs):
+        """
+        Computes the public keys of many key pairs at once sharing a single
+        modular inversion. Key pairs whose public key is already known are
+        left unchanged.
+
+        :param ecpairs: iterable of ECPair objects
+        """
+        pending = [e for e in ecpairs if e.__pubkey_buf is None]
+        points = ecutils.batch_points([e.privkey for e in pending])
+        for ecpair, point in zip(pending, points):
+            ecpair.__point = point
+            ecpair.__pubkey_buf = ecutils.point_to_bytes(
+                point, ecpair.__compressed)
+
     @classmethod
     def from_wif(cls, wif):
         """
@@ -119,7 +193,7 @@ class ECPair:
         :param wif: private key as WIF (Wallet Import Format)
         :return: New object containing the imported private key
         """
-        buffer = base58.b58decode_check(wif)
+        buffer = encoding.b58decode_check(wif)
         if len(buffer) != 34 and len(buffer) != 33:
             raise ValueError("invalid data")
         version = buffer[0:1]
@@ -133,12 +207,12 @@ class ECPair:
             privkey = buffer[1:-1]
         else:
             privkey = buffer[1:]
-        n = [x for x in Network.get_supported_networks() if version in [x.wif]]
-        if not n:
+        network = Network.get_by_wif(version)
+        if network is None:
             raise ValueError("Network not supported")
 
         return cls(privkey, pubkey_buffer=None,
-                   compressed=compressed, network=n[0])
+                   compressed=compressed, network=network)
 
     def to_wif(self):
         """
@@ -154,45 +228,137 @@ class ECPair:
         buffer += self.privkey_buffer
         if self.__compressed:
             buffer += b'\x01'
-        return base58.b58encode_check(buffer).decode()
+        return encoding.b58encode_check(buffer)
 
-    def get_address(self):
+    def get_address(self, kind=address.P2PKH):
         """
-        Converts the public key to a bitcoin address (P2PKH address)
+        Converts the public key to a bitcoin address.
 
-        :return: Address as string (P2PKH address)
+        :param kind: address.P2PKH (default), address.P2WPKH (native SegWit),
+                     address.P2SH_P2WPKH (SegWit nested in P2SH) or
+                     address.P2TR (Taproot, BIP86 key path)
+        :return: Address as string
         """
-        return base58.b58encode_check(
-            self.network.pub_key_hash +
-            hashutils.hash160(self.pubkey_buffer)).decode()
+        if kind == address.P2TR:
+            return address.get_addresses([self], kind)[0]
+        if kind in address.SEGWIT_KINDS and not self.__compressed:
+            raise ValueError("SegWit addresses need compressed public keys")
+        return address.from_hash160(self.pubkey_hash, self.network, kind)
 
     def sign(self, hash_buffer):
         """
         Sign a 32 byte hash and returns a signature
 
-        :param buffer: 32 byte buffer (as bytes)
+        :param buffer: 32 byte buffer (bytes-like object, e.g. memoryview)
         :return: ECSignature object
         """
-        if self.privkey is None:
+        privkey = self.privkey
+        if privkey is None:
             raise RuntimeError("A private key is needed for this operation")
-        ec_sig = ecutils.ECSignature.sign(self.privkey, hash_buffer)
-        return ec_sig
+        return ecutils.ECSignature(*ecutils.sign(privkey, hash_buffer))
 
     def verify(self, buffer, ec_signature):
         """
-        Verify signature of a 32 byte buffer (as bytes)
+        Verify signature of a 32 byte buffer. The public key point is
+        decoded once and kept, so verifying many signatures of the same key
+        pair does no further allocation than the arithmetic itself.
 
-        :param buffer: 32 byte buffer (as bytes)
+        :param buffer: 32 byte buffer (bytes-like object, e.g. memoryview)
         :param ec_signature: ECSignature object
         :return: True if this signature is valid
         """
-        return ec_signature.verify(self.pubkey_buffer, buffer)
+        return ecutils.verify(self.pubkey_point, buffer, ec_signature.r,
+                              ec_signature.s)
+
+    def sign_schnorr(self, msg, aux_rand=None):
+        """
+        Signs a message with a BIP340 Schnorr signature.
+
+        :param msg: message as bytes (usually a 32-byte hash)
+        :param aux_rand: 32 bytes of auxiliary randomness (random by default)
+        :return: signature as bytes (64 bytes)
+        """
+        if self.privkey is None:
+            raise RuntimeError("A private key is needed for this operation")
+        return schnorr.sign(self.privkey, msg, aux_rand)
+
+    def verify_schnorr(self, msg, sig):
+        """
+        Verifies a BIP340 Schnorr signature against the x-only public key.
+
+        :param msg: message as bytes
+        :param sig: signature as bytes (64 bytes)
+        :return: True if this signature is valid
+        """
+        return schnorr.verify(self.xonly_pubkey, msg, sig)
+
+    async def asign(self, hash_buffer):
+        """
+        Asynchronous version of sign. (see pyhdwallet.aio)
+
+        :param hash_buffer: 32 byte buffer (bytes-like object, e.g.
+                            bytearray or memoryview)
+        :return: ECSignature object
+        """
+        from pyhdwallet import aio
+        return await aio.sign(self, hash_buffer)
+
+    @staticmethod
+    async def averify_batch(items):
+        """
+        Verifies many signatures without blocking the event loop.
+        (see pyhdwallet.aio)
+
+        :param items: sequence of (ECPair, hash_buffer, ECSignature)
+        :return: list of bool (True for each valid signature), in input order
+        """
+        from pyhdwallet import aio
+        return await aio.verify_batch(items)
+
+    def __reduce__(self):
+        # compact state: keys as bytes plus the cached public key and point
+        # (so the receiver does not compute them again)
+        return self.__class__._from_state, (
+            self.__privkey_buf, self.__pubkey_buf, self.__compressed,
+            self.__network, self.__point)
+
+    @classmethod
+    def _from_state(cls, privkey_buf, pubkey_buf, compressed, network,
+                    point):
+        """
+        Rebuilds an ECPair object, restoring the cached public key and point
+        (see __reduce__).
+        """
+        if privkey_buf is not None:
+            ecpair = cls(privkey_buf, None, compressed, network)
+            ecpair.__pubkey_buf = pubkey_buf
+        else:
+            ecpair = cls(None, pubkey_buf, network=network)
+        ecpair.__point = point
+        return ecpair
+
+    def _cached_state(self):
+        """
+        Returns the public key and point already computed (or None), without
+        computing them.
+        """
+        return self.__pubkey_buf, self.__point
+
+    def __key(self):
+        # the private key determines the public key, so it is not needed
+        # (and no curve operation is done to compare or hash key pairs)
+        if self.__privkey_buf is not None:
+            return (self.__privkey_buf, None, self.__compressed,
+                    self.__network)
+        return None, self.__pubkey_buf, self.__compressed, self.__network
 
     def __eq__(self, other):
-        return self.privkey == other.privkey and \
-               self.pubkey_buffer == other.pubkey_buffer and \
-               self.compressed == other.compressed and \
-               self.network == other.network
+        if not isinstance(other, ECPair):
+            return NotImplemented
+        return self.__key() == other.__key()
+
+    def __hash__(self):
+        return hash(self.__key())
 
     def __str__(self):
         return "{} (privKey={}, pubKey={}, compressed={}, network={})" \
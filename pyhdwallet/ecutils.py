@@ -1,55 +1,442 @@
 """ Low level Elliptic Curve Functions """
-
-from random import SystemRandom
-from ecdsa import SECP256k1, VerifyingKey, ellipticcurve
-from ecdsa.ecdsa import Public_key, Private_key, Signature
+import os
+import threading
 
 # domain parameters of the curve (SECP256k1)
-CURVE = SECP256k1
-ORDER = CURVE.order
-g = CURVE.generator
+ORDER = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+FIELD_PRIME = \
+    0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+G_AFFINE = (
+    0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+    0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8)
+
+# width (bits) of the windows of the precomputed table of the generator
+_G_WINDOW = 4
+_g_table = None
+# the wide table halves the additions of each multiplication by the
+# generator. It takes about as long to build as _G_WIDE_THRESHOLD
+# multiplications, so it is only built by warmup() or by batches at least
+# that large.
+_G_WIDE_WINDOW = 8
+_G_WIDE_THRESHOLD = 512
+_g_wide_table = None
+# tables are built once even when first used by many threads at once
+_table_lock = threading.Lock()
 
 
-def _point(secret):
+def point_add(point, other):
     """
-    Returns the public key point from private key.
+    Adds two points of the curve.
 
-    :param secret: private key number (32-byte int)
-    :return: public key point
+    :param point: first point in Jacobian coordinates (X, Y, Z)
+    :param other: second point in affine (x, y) or Jacobian (X, Y, Z)
+                  coordinates
+    :return: point + other in Jacobian coordinates (Z == 0 for the point at
+             infinity)
     """
-    assert isinstance(secret, int)
-    public_key_point = secret * g
-    return public_key_point
+    if len(other) == 2:
+        return _jacobian_add_affine(point, other)
+    return _jacobian_add(point, other)
+
+
+def _hash_to_int(buffer):
+    """ Converts a hash (any bytes-like object) to int (big endian) """
+    return int.from_bytes(buffer, "big")
+
+
+def _random_scalar():
+    """ Returns a random int in [1, ORDER - 1] from os.urandom """
+    while True:
+        k = int.from_bytes(os.urandom(32), "big")
+        if 0 < k < ORDER:
+            return k
+
 
+# Curve arithmetic on plain integers used by the batch operations.
+# Affine points are (x, y) tuples and Jacobian points are (X, Y, Z) tuples,
+# with x = X / Z^2 and y = Y / Z^3. Z == 0 represents the point at infinity.
+# The other modules use the public functions (mul_g, mul, multi_mul,
+# point_add, is_infinity, to_affine, batch_to_affine, lift_x,
+# point_to_bytes and point_from_bytes); the multiplications, point_add and
+# point_from_bytes are counted by pyhdwallet.instrumentation. The
+# underscore helpers are the building blocks of this module.
 
-def _pubkey_point_to_bytes(public_key_point, compressed=True):
+def _batch_inverse(values, modulus):
     """
-    Converts public key point to bytes (compressed format).
+    Inverts many numbers with a single modular inversion (Montgomery's
+    trick).
 
-    :param public_key_point:
-    :return: public key in compressed format
+    :param values: list of non-zero ints
+    :param modulus: prime modulus
+    :return: list of the inverses (in the same order)
     """
-    arg_compr = 'compressed' if compressed else 'uncompressed'
-    pki = VerifyingKey.from_public_point(public_key_point, curve=CURVE)
-    pub_key = pki.to_string(encoding=arg_compr)
-    return pub_key
+    prefix = []
+    acc = 1
+    for value in values:
+        prefix.append(acc)
+        acc = acc * value % modulus
+    inv = pow(acc, -1, modulus)
+    result = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        result[i] = prefix[i] * inv % modulus
+        inv = inv * values[i] % modulus
+    return result
 
-def _pubkey_point_from_bytes(pubkey_buffer):
+
+def _jacobian_double(point):
     """
-    Returns the public key point from public key in compressed format.
+    Doubles a point in Jacobian coordinates.
 
-    :param pub_key: public key as bytes
-    :return:
+    :param point: (X, Y, Z)
+    :return: 2 * point as (X, Y, Z)
     """
-    assert isinstance(pubkey_buffer, bytes)
-    vk_obj = VerifyingKey.from_string(pubkey_buffer, curve=CURVE)
-    point_pk = vk_obj.pubkey.point
-    return point_pk
+    x1, y1, z1 = point
+    if not y1 or not z1:
+        return 0, 1, 0
+    p = FIELD_PRIME
+    ysq = y1 * y1 % p
+    s = 4 * x1 * ysq % p
+    m = 3 * x1 * x1 % p
+    x3 = (m * m - 2 * s) % p
+    y3 = (m * (s - x3) - 8 * ysq * ysq) % p
+    z3 = 2 * y1 * z1 % p
+    return x3, y3, z3
 
-def _hash_to_int(buffer):
-    barr = bytearray(buffer)
-    hexa = ''.join(['%02x' % b for b in barr])
-    return int(hexa, 16)
+
+def _jacobian_add_affine(point, affine):
+    """
+    Adds an affine point to a point in Jacobian coordinates.
+
+    :param point: (X, Y, Z)
+    :param affine: (x, y)
+    :return: point + affine as (X, Y, Z)
+    """
+    x1, y1, z1 = point
+    x2, y2 = affine
+    if not z1:
+        return x2, y2, 1
+    p = FIELD_PRIME
+    z1z1 = z1 * z1 % p
+    h = (x2 * z1z1 - x1) % p
+    r = (y2 * z1 * z1z1 - y1) % p
+    if not h:
+        if not r:
+            return _jacobian_double((x2, y2, 1))
+        return 0, 1, 0
+    hh = h * h % p
+    hhh = h * hh % p
+    v = x1 * hh % p
+    x3 = (r * r - hhh - 2 * v) % p
+    y3 = (r * (v - x3) - y1 * hhh) % p
+    z3 = z1 * h % p
+    return x3, y3, z3
+
+
+def _jacobian_add(point_a, point_b):
+    """
+    Adds two points in Jacobian coordinates.
+
+    :param point_a: (X, Y, Z)
+    :param point_b: (X, Y, Z)
+    :return: point_a + point_b as (X, Y, Z)
+    """
+    x1, y1, z1 = point_a
+    x2, y2, z2 = point_b
+    if not z1:
+        return point_b
+    if not z2:
+        return point_a
+    p = FIELD_PRIME
+    z1z1 = z1 * z1 % p
+    z2z2 = z2 * z2 % p
+    u1 = x1 * z2z2 % p
+    s1 = y1 * z2 * z2z2 % p
+    h = (x2 * z1z1 - u1) % p
+    r = (y2 * z1 * z1z1 - s1) % p
+    if not h:
+        if not r:
+            return _jacobian_double(point_a)
+        return 0, 1, 0
+    hh = h * h % p
+    hhh = h * hh % p
+    v = u1 * hh % p
+    x3 = (r * r - hhh - 2 * v) % p
+    y3 = (r * (v - x3) - s1 * hhh) % p
+    z3 = z1 * z2 * h % p
+    return x3, y3, z3
+
+
+def is_infinity(point):
+    """
+    Checks whether or not a point is the point at infinity.
+
+    :param point: (X, Y, Z)
+    :return: True if Z == 0
+    """
+    return point[2] == 0
+
+
+def to_affine(point):
+    """
+    Converts a Jacobian point to affine coordinates. (see batch_to_affine to
+    convert many points)
+
+    :param point: (X, Y, Z), not the point at infinity
+    :return: (x, y) as ints
+    """
+    x, y, z = point
+    if not z:
+        raise ValueError("Point at infinity")
+    p = FIELD_PRIME
+    z_inv = pow(z, -1, p)
+    zz_inv = z_inv * z_inv % p
+    return x * zz_inv % p, y * zz_inv * z_inv % p
+
+
+def batch_to_affine(points):
+    """
+    Converts many Jacobian points to affine coordinates sharing a single
+    modular inversion.
+
+    :param points: list of (X, Y, Z)
+    :return: list of (x, y) (None for the point at infinity)
+    """
+    p = FIELD_PRIME
+    finite = [i for i, point in enumerate(points) if point[2]]
+    inverses = _batch_inverse([points[i][2] for i in finite], p) \
+        if finite else []
+    result = [None] * len(points)
+    for i, z_inv in zip(finite, inverses):
+        x, y, _ = points[i]
+        zz_inv = z_inv * z_inv % p
+        result[i] = (x * zz_inv % p, y * zz_inv * z_inv % p)
+    return result
+
+
+def _build_generator_table(window):
+    """
+    Returns a table of the generator: table[w][d - 1] holds
+    d * 2^(w * window) * G in affine coordinates.
+    """
+    size = (1 << window) - 1
+    points = []
+    base = G_AFFINE + (1,)
+    for _ in range(0, 256, window):
+        acc = base
+        for _ in range(size):
+            points.append(acc)
+            acc = _jacobian_add(acc, base)
+        base = acc
+    affine = batch_to_affine(points)
+    return [affine[i:i + size] for i in range(0, len(affine), size)]
+
+
+def _generator_table():
+    """
+    Returns the precomputed table of the generator (windows of _G_WINDOW
+    bits). It is built on first use.
+    """
+    global _g_table
+    if _g_table is None:
+        with _table_lock:
+            if _g_table is None:
+                _g_table = _build_generator_table(_G_WINDOW)
+    return _g_table
+
+
+def _generator_wide_table():
+    """
+    Returns the precomputed table of the generator with windows of
+    _G_WIDE_WINDOW bits, building it if needed.
+    """
+    global _g_wide_table
+    if _g_wide_table is None:
+        with _table_lock:
+            if _g_wide_table is None:
+                _g_wide_table = _build_generator_table(_G_WIDE_WINDOW)
+    return _g_wide_table
+
+
+def mul_g(secret):
+    """
+    Multiplies the generator by a scalar using the precomputed table (the
+    wide one when it has been built).
+
+    :param secret: int
+    :return: secret * G in Jacobian coordinates
+    """
+    if _g_wide_table is not None:
+        table, window_bits = _g_wide_table, _G_WIDE_WINDOW
+    else:
+        table, window_bits = _generator_table(), _G_WINDOW
+    mask = (1 << window_bits) - 1
+    secret %= ORDER
+    acc = (0, 1, 0)
+    window = 0
+    while secret:
+        digit = secret & mask
+        if digit:
+            acc = _jacobian_add_affine(acc, table[window][digit - 1])
+        secret >>= window_bits
+        window += 1
+    return acc
+
+
+def mul(affine, secret):
+    """
+    Multiplies an affine point by a scalar (double-and-add).
+
+    :param affine: (x, y)
+    :param secret: int
+    :return: secret * point in Jacobian coordinates
+    """
+    acc = (0, 1, 0)
+    for bit in bin(secret % ORDER)[2:]:
+        acc = _jacobian_double(acc)
+        if bit == "1":
+            acc = _jacobian_add_affine(acc, affine)
+    return acc
+
+
+def _straus(items, bits):
+    """
+    Multi-scalar multiplication sharing the doublings among all the points
+    (interleaved windows of _G_WINDOW bits). The small multiples of the
+    points are converted to affine coordinates with a single modular
+    inversion.
+    """
+    size = (1 << _G_WINDOW) - 1
+    multiples = []
+    for point, _ in items:
+        acc = point + (1,)
+        for _ in range(size):
+            multiples.append(acc)
+            acc = _jacobian_add_affine(acc, point)
+    affine = batch_to_affine(multiples)
+    tables = [(affine[i * size:(i + 1) * size], scalar)
+              for i, (_, scalar) in enumerate(items)]
+    acc = (0, 1, 0)
+    for window in range(-(-bits // _G_WINDOW) - 1, -1, -1):
+        for _ in range(_G_WINDOW):
+            acc = _jacobian_double(acc)
+        shift = window * _G_WINDOW
+        for table, scalar in tables:
+            digit = (scalar >> shift) & size
+            if digit:
+                acc = _jacobian_add_affine(acc, table[digit - 1])
+    return acc
+
+
+def _pippenger(items, bits, width):
+    """
+    Multi-scalar multiplication with the bucket method: for each window of
+    width bits the points are added to the bucket of their digit and the
+    buckets are summed weighted by the digit. Each point costs one addition
+    per window, without precomputation.
+    """
+    mask = (1 << width) - 1
+    infinity = (0, 1, 0)
+    acc = infinity
+    for window in range(-(-bits // width) - 1, -1, -1):
+        for _ in range(width):
+            acc = _jacobian_double(acc)
+        shift = window * width
+        buckets = [infinity] * mask
+        for point, scalar in items:
+            digit = (scalar >> shift) & mask
+            if digit:
+                buckets[digit - 1] = _jacobian_add_affine(buckets[digit - 1],
+                                                          point)
+        running = total = infinity
+        for bucket in reversed(buckets):
+            running = _jacobian_add(running, bucket)
+            total = _jacobian_add(total, running)
+        acc = _jacobian_add(acc, total)
+    return acc
+
+
+def multi_mul(items):
+    """
+    Multi-scalar multiplication: computes the sum of scalar * point. Uses
+    interleaved windows for small inputs and the bucket method (Pippenger)
+    for large ones, depending on the estimated number of point additions.
+
+    :param items: list of ((x, y), scalar)
+    :return: sum of the products in Jacobian coordinates
+    """
+    items = [(point, scalar % ORDER) for point, scalar in items]
+    bits = max([scalar.bit_length() for _, scalar in items] + [0])
+    count = len(items)
+    windows = -(-bits // _G_WINDOW)
+    cost, width = count * ((1 << _G_WINDOW) + windows), None
+    for candidate in range(5, 13):
+        # bucket sums cost about two (more expensive) additions per bucket
+        candidate_cost = -(-bits // candidate) * \
+            (count + 3 * (1 << candidate))
+        if candidate_cost < cost:
+            cost, width = candidate_cost, candidate
+    if width is None:
+        return _straus(items, bits)
+    return _pippenger(items, bits, width)
+
+
+def lift_x(x):
+    """
+    Returns the point of the curve with the given x coordinate and even y
+    (BIP340), or None if there is no such point.
+
+    :param x: int
+    :return: (x, y) or None
+    """
+    p = FIELD_PRIME
+    if x >= p:
+        return None
+    ysq = (pow(x, 3, p) + 7) % p
+    y = pow(ysq, (p + 1) // 4, p)
+    if y * y % p != ysq:
+        return None
+    return x, y if y & 1 == 0 else p - y
+
+
+def point_from_bytes(pubkey_buffer):
+    """
+    Decodes a public key (compressed or uncompressed) checking that it is a
+    point of the curve.
+
+    :param pubkey_buffer: public key as bytes
+    :return: (x, y)
+    """
+    p = FIELD_PRIME
+    is_compressed_key(pubkey_buffer)
+    x = int.from_bytes(pubkey_buffer[1:33], "big")
+    if x >= p:
+        raise ValueError("Invalid public key")
+    ysq = (pow(x, 3, p) + 7) % p
+    if len(pubkey_buffer) == 33:
+        y = pow(ysq, (p + 1) // 4, p)
+        if y * y % p != ysq:
+            raise ValueError("Invalid public key")
+        if (y & 1) != pubkey_buffer[0] & 1:
+            y = p - y
+    else:
+        y = int.from_bytes(pubkey_buffer[33:], "big")
+        if y >= p or y * y % p != ysq:
+            raise ValueError("Invalid public key")
+    return x, y
+
+
+def point_to_bytes(affine, compressed=True):
+    """
+    Encodes an affine point as a public key.
+
+    :param affine: (x, y)
+    :param compressed: compressed (33 bytes) or uncompressed (65 bytes)
+    :return: public key as bytes
+    """
+    x, y = affine
+    if compressed:
+        return (b"\x03" if y & 1 else b"\x02") + x.to_bytes(32, "big")
+    return b"\x04" + x.to_bytes(32, "big") + y.to_bytes(32, "big")
 
 
 
@@ -63,11 +450,11 @@ def combine_pubkeys(secret, pubkey_buffer):
     """
     assert isinstance(secret, int)
     assert isinstance(pubkey_buffer, bytes)
-    point_pubkey = _pubkey_point_from_bytes(pubkey_buffer)
-    k = _point(secret) + point_pubkey
-    if k is ellipticcurve.INFINITY:
+    point_pubkey = point_from_bytes(pubkey_buffer)
+    k = batch_to_affine([point_add(mul_g(secret), point_pubkey)])[0]
+    if k is None:
         raise ValueError("Point at infinity")
-    return _pubkey_point_to_bytes(k)
+    return point_to_bytes(k)
 
 
 def get_pubkey_from_privkey(secret, compressed=True):
@@ -79,30 +466,79 @@ def get_pubkey_from_privkey(secret, compressed=True):
     :return: public key as bytes
     """
     assert isinstance(secret, int)
-    return _pubkey_point_to_bytes(_point(secret), compressed)
+    return point_to_bytes(batch_points([secret])[0], compressed)
 
 
 def is_compressed_key(pubkey_buffer):
     """
     Checks whether or not a public key is compressed.
 
-    :param pubkey_buffer: public keys as bytes obj.
+    :param pubkey_buffer: public keys as bytes-like object
     :return: true if public key is compressed; false otherwise
     """
-    if not isinstance(pubkey_buffer, bytes):
+    if not isinstance(pubkey_buffer, (bytes, bytearray, memoryview)):
         raise ValueError
     length = len(pubkey_buffer)
     if length not in [33, 65]:
         raise ValueError("Invalid public key")
     if length == 33:
-        if pubkey_buffer[0:1] not in [b"\x02", b"\x03"]:
+        if pubkey_buffer[0] not in (2, 3):
             raise ValueError("Invalid public key")
     if length == 65:
-        if pubkey_buffer[0:1] != b"\x04":
+        if pubkey_buffer[0] != 4:
             raise ValueError("Invalid public key")
     return length == 33
 
 
+def sign(secret, hash_buffer):
+    """
+    ECDSA signature of a hash, without intermediate objects.
+
+    :param secret: private key as 32-byte int
+    :param hash_buffer: hash of the message (any bytes-like object)
+    :return: (r, s) as ints
+    """
+    hash_int = _hash_to_int(hash_buffer)
+    while True:
+        k = _random_scalar()
+        x, _, z = mul_g(k)
+        r = x * pow(z * z, -1, FIELD_PRIME) % FIELD_PRIME % ORDER
+        s = pow(k, -1, ORDER) * (hash_int + r * secret) % ORDER
+        if r and s:
+            return r, s
+
+
+def _matches_r(point, r):
+    """
+    Checks whether the x coordinate of a Jacobian point (modulo ORDER)
+    equals r, comparing in projective coordinates (no inversion).
+    """
+    x, _, z = point
+    if not z:
+        return False
+    p = FIELD_PRIME
+    zz = z * z % p
+    return (x - r * zz) % p == 0 or \
+        (r + ORDER < p and (x - (r + ORDER) * zz) % p == 0)
+
+
+def verify(point, hash_buffer, r, s):
+    """
+    ECDSA verification, without intermediate objects.
+
+    :param point: public key point as (x, y) (e.g. ECPair.pubkey_point)
+    :param hash_buffer: hash of the message (any bytes-like object)
+    :param r: r value of the signature
+    :param s: s value of the signature
+    :return: True if the signature is valid
+    """
+    if not (0 < r < ORDER and 0 < s < ORDER):
+        return False
+    w = pow(s, -1, ORDER)
+    return _matches_r(_jacobian_add(mul_g(_hash_to_int(hash_buffer) * w),
+                                    mul(point, r * w)), r)
+
+
 class ECSignature:
     """ EC Signature """
     def __init__(self, r, s):
@@ -115,17 +551,12 @@ class ECSignature:
         """
         Verify a digital signature.
 
-        :param pubkey_buffer: Public key as bytes
-        :param hash_buffer: hash of the message
+        :param pubkey_buffer: Public key as bytes-like object
+        :param hash_buffer: hash of the message (bytes-like object)
         :return: True if this signature is valid
         """
-        assert isinstance(hash_buffer, bytes)
-        assert isinstance(pubkey_buffer, bytes)
-        hash_int = _hash_to_int(hash_buffer)
-        point = _pubkey_point_from_bytes(pubkey_buffer)
-        pk = Public_key(g, point)
-        obj = Signature(self.r, self.s)
-        return pk.verifies(hash_int, obj)
+        return verify(point_from_bytes(pubkey_buffer), hash_buffer, self.r,
+                      self.s)
 
     @classmethod
     def sign(cls, secret, hash_buffer):
@@ -134,14 +565,95 @@ class ECSignature:
         signature.
 
         :param secret: private key as 32-byte int
-        :param hash_buffer: Hash of the message as bytes
+        :param hash_buffer: Hash of the message (bytes-like object)
         :return: ECSignature object
         """
         assert isinstance(secret, int)
-        assert isinstance(hash_buffer, bytes)
-        hash_int = _hash_to_int(hash_buffer)
-        pubkey = Public_key(g, g * secret)
-        privkey = Private_key(pubkey, secret)
-        random = SystemRandom().randrange(1, ORDER - 1)
-        signature = privkey.sign(hash_int, random)
-        return cls(signature.r, signature.s)
+        return cls(*sign(secret, hash_buffer))
+
+
+def batch_points(secrets):
+    """
+    Computes the public key points of many private keys sharing a single
+    modular inversion for the conversion to affine coordinates.
+
+    :param secrets: list of private keys (32-byte int)
+    :return: list of public key points as (x, y)
+    """
+    if len(secrets) >= _G_WIDE_THRESHOLD:
+        _generator_wide_table()
+    return batch_to_affine([mul_g(secret) for secret in secrets])
+
+
+def warmup():
+    """
+    Builds the precomputed tables ahead of time (they are otherwise built on
+    first use or by large batches), e.g. when a long-lived server starts.
+    """
+    _generator_table()
+    _generator_wide_table()
+
+
+def batch_combine(items):
+    """
+    Computes secret * G + point for many pairs sharing a single modular
+    inversion. (batch version of combine_pubkeys)
+
+    :param items: list of (secret, (x, y))
+    :return: list of (x, y) (None where the result is the point at infinity)
+    """
+    if len(items) >= _G_WIDE_THRESHOLD:
+        _generator_wide_table()
+    return batch_to_affine([point_add(mul_g(secret), point)
+                             for secret, point in items])
+
+
+def batch_sign(items):
+    """
+    Signs many hashes. The nonce points are converted to affine coordinates
+    and the nonces inverted with one modular inversion each for the whole
+    batch.
+
+    :param items: list of (secret, hash_buffer)
+    :return: list of ECSignature objects
+    """
+    pending = list(range(len(items)))
+    result = [None] * len(items)
+    while pending:
+        nonces = [_random_scalar() for _ in pending]
+        points = batch_points(nonces)
+        k_inverses = _batch_inverse(nonces, ORDER)
+        retry = []
+        for i, k_inv, point in zip(pending, k_inverses, points):
+            secret, hash_buffer = items[i]
+            r = point[0] % ORDER
+            s = k_inv * (_hash_to_int(hash_buffer) + r * secret) % ORDER
+            if not r or not s:
+                retry.append(i)
+            else:
+                result[i] = ECSignature(r, s)
+        pending = retry
+    return result
+
+
+def batch_verify(items):
+    """
+    Verifies many signatures. The s values are inverted with a single
+    modular inversion and the points are compared in Jacobian coordinates,
+    so no further inversion is needed.
+
+    :param items: list of (pubkey point as (x, y), hash_buffer, ECSignature)
+    :return: list of bool (True for each valid signature)
+    """
+    result = [False] * len(items)
+    valid = [i for i, (_, _, sig) in enumerate(items)
+             if 0 < sig.r < ORDER and 0 < sig.s < ORDER]
+    inverses = _batch_inverse([items[i][2].s for i in valid], ORDER) \
+        if valid else []
+    for i, w in zip(valid, inverses):
+        point, hash_buffer, sig = items[i]
+        u1 = _hash_to_int(hash_buffer) * w % ORDER
+        u2 = sig.r * w % ORDER
+        result[i] = _matches_r(_jacobian_add(mul_g(u1), mul(point, u2)),
+                               sig.r)
+    return result
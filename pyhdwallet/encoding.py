@@ -0,0 +1,106 @@
+"""
+Encoding functions (Base58Check, Bech32 and Bech32m)
+
+The base58 package is imported on first use.
+"""
+from functools import lru_cache
+
+BECH32_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+BECH32_CONST = 1
+BECH32M_CONST = 0x2bc830a3
+_BECH32_GENERATOR = (0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd,
+                     0x2a1462b3)
+
+
+def _polymod_table():
+    table = []
+    for top in range(32):
+        value = 0
+        for i, generator in enumerate(_BECH32_GENERATOR):
+            if (top >> i) & 1:
+                value ^= generator
+        table.append(value)
+    return tuple(table)
+
+
+# _BECH32_TABLE[top] is the XOR of the generator terms selected by the top 5
+# bits of the checksum, so each polymod step is a single table lookup
+_BECH32_TABLE = _polymod_table()
+
+
+def b58encode_check(buffer):
+    """
+    Base58Check encoding.
+
+    :param buffer: payload as bytes
+    :return: Base58Check string
+    """
+    import base58
+    return base58.b58encode_check(buffer).decode()
+
+
+def b58decode_check(encoded):
+    """
+    Base58Check decoding. Raises ValueError if the checksum is invalid.
+
+    :param encoded: Base58Check string
+    :return: decoded payload as bytes
+    """
+    import base58
+    return base58.b58decode_check(encoded)
+
+
+def _bech32_polymod(values, chk=1):
+    table = _BECH32_TABLE
+    for value in values:
+        chk = ((chk & 0x1ffffff) << 5) ^ value ^ table[chk >> 25]
+    return chk
+
+
+@lru_cache(maxsize=None)
+def _bech32_hrp_state(hrp):
+    """ Checksum state after the expanded human-readable part """
+    return _bech32_polymod([ord(c) >> 5 for c in hrp] + [0] +
+                           [ord(c) & 31 for c in hrp])
+
+
+def _to_5bit(data):
+    """ Converts bytes to 5-bit groups (padding the last one with zeros) """
+    bits = len(data) * 8
+    pad = -bits % 5
+    number = int.from_bytes(data, "big") << pad
+    count = (bits + pad) // 5
+    return [(number >> (5 * i)) & 31 for i in range(count - 1, -1, -1)]
+
+
+def bech32_encode(hrp, data, const=BECH32_CONST):
+    """
+    Bech32 encoding (BIP173).
+
+    :param hrp: human-readable part
+    :param data: list of 5-bit values
+    :param const: checksum constant
+    :return: Bech32 string
+    """
+    chk = _bech32_polymod(data + [0] * 6, _bech32_hrp_state(hrp)) ^ const
+    checksum = [(chk >> 5 * (5 - i)) & 31 for i in range(6)]
+    return hrp + "1" + "".join([BECH32_CHARSET[d] for d in data + checksum])
+
+
+def segwit_encode(hrp, witness_version, program):
+    """
+    Encodes a SegWit address: Bech32 (BIP173) for version 0 and Bech32m
+    (BIP350) for versions 1 to 16 (e.g. Taproot).
+
+    :param hrp: human-readable part (e.g. "bc")
+    :param witness_version: witness version (0 to 16)
+    :param program: witness program as bytes
+    :return: address as string
+    """
+    if not 0 <= witness_version <= 16:
+        raise ValueError("Unsupported witness version")
+    if witness_version == 0 and len(program) not in (20, 32) or \
+            not 2 <= len(program) <= 40:
+        raise ValueError("Invalid witness program")
+    const = BECH32_CONST if witness_version == 0 else BECH32M_CONST
+    return bech32_encode(hrp, [witness_version] + _to_5bit(program), const)
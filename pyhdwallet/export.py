@@ -0,0 +1,124 @@
+"""
+Columnar export of batch derivation results (batch.ChildKeys) to NumPy
+structured arrays and Arrow tables (optionally written as Parquet).
+
+The parent (uint32, position of the parent), index (uint32, index of the
+child) and pubkey (33-byte compressed public key) columns are built from
+the contiguous buffers of ChildKeys, with no Python object per row. The
+optional hash160 column (20 bytes) is hashed one key at a time, as hashlib
+has no batch API: each digest is written into a single preallocated buffer,
+but hashlib still creates a temporary bytes object per row.
+
+numpy and pyarrow are optional dependencies (pip install pyhdwallet[numpy]
+or pyhdwallet[arrow]), imported on first use.
+
+Example::
+
+    >>> children = batch.derive_public(xpubs, range(1000))
+    >>> table = to_numpy(children)
+    >>> table["hash160"][:3]
+"""
+import sys
+from array import array
+from pyhdwallet import hashutils
+
+PUBKEY_SIZE = 33
+HASH160_SIZE = 20
+
+
+def _parent_positions(keys):
+    """ uint32 array with the position of the parent of each child """
+    positions = array("I")
+    for parent in range(len(keys.parents)):
+        positions.extend(array("I", [parent]) * len(keys.indexes))
+    return positions
+
+
+def _little_endian(values):
+    """ Buffer of an array("I") in little-endian byte order """
+    if sys.byteorder == "little":
+        return values
+    values = array("I", values)
+    values.byteswap()
+    return values
+
+
+def _hash160s(pubkeys):
+    """ Concatenated hash160s of concatenated 33-byte public keys """
+    view = memoryview(pubkeys)
+    hash160 = hashutils.hash160
+    result = bytearray(len(view) // PUBKEY_SIZE * HASH160_SIZE)
+    offset = 0
+    for i in range(0, len(view), PUBKEY_SIZE):
+        end = offset + HASH160_SIZE
+        result[offset:end] = hash160(view[i:i + PUBKEY_SIZE])
+        offset = end
+    return result
+
+
+def to_numpy(keys, hash160s=True):
+    """
+    Exports children derived in batch to a NumPy structured array with the
+    fields parent and index (uint32), pubkey (S33) and hash160 (S20).
+
+    Note that NumPy strips trailing zero bytes when a single S33/S20 item is
+    read as bytes; whole columns and their buffers are not affected.
+
+    :param keys: batch.ChildKeys object
+    :param hash160s: also exports the hash160 of the public keys
+    :return: numpy structured array (one row per child)
+    """
+    import numpy
+    fields = [("parent", "<u4"), ("index", "<u4"),
+              ("pubkey", "S{}".format(PUBKEY_SIZE))]
+    if hash160s:
+        fields.append(("hash160", "S{}".format(HASH160_SIZE)))
+    result = numpy.empty(len(keys), dtype=fields)
+    result["parent"] = numpy.frombuffer(_parent_positions(keys), "=u4")
+    result["index"] = numpy.frombuffer(keys.child_indexes, "=u4")
+    result["pubkey"] = numpy.frombuffer(keys.pubkeys, fields[2][1])
+    if hash160s:
+        result["hash160"] = numpy.frombuffer(_hash160s(keys.pubkeys),
+                                             fields[3][1])
+    return result
+
+
+def to_arrow(keys, hash160s=True):
+    """
+    Exports children derived in batch to an Arrow table with the columns
+    parent and index (uint32), pubkey (fixed_size_binary(33)) and hash160
+    (fixed_size_binary(20)). The pubkey column shares the buffer of keys.
+
+    :param keys: batch.ChildKeys object
+    :param hash160s: also exports the hash160 of the public keys
+    :return: pyarrow.Table object
+    """
+    import pyarrow
+    count = len(keys)
+
+    def _column(data_type, buffer):
+        return pyarrow.Array.from_buffers(data_type, count,
+                                          [None, pyarrow.py_buffer(buffer)])
+
+    names = ["parent", "index", "pubkey"]
+    columns = [
+        _column(pyarrow.uint32(), _little_endian(_parent_positions(keys))),
+        _column(pyarrow.uint32(), _little_endian(keys.child_indexes)),
+        _column(pyarrow.binary(PUBKEY_SIZE), keys.pubkeys)]
+    if hash160s:
+        names.append("hash160")
+        columns.append(_column(pyarrow.binary(HASH160_SIZE),
+                               _hash160s(keys.pubkeys)))
+    return pyarrow.Table.from_arrays(columns, names=names)
+
+
+def write_parquet(keys, path, hash160s=True):
+    """
+    Writes children derived in batch to a Parquet file. (see to_arrow)
+
+    :param keys: batch.ChildKeys object
+    :param path: path of the Parquet file
+    :param hash160s: also exports the hash160 of the public keys
+    """
+    import pyarrow.parquet
+    pyarrow.parquet.write_table(to_arrow(keys, hash160s), path)
@@ -3,6 +3,7 @@ Hash functions
 """
 import hashlib
 import hmac
+from functools import lru_cache
 
 def ripemd160(data):
     """
@@ -43,3 +44,56 @@ def hmac_sha512(key, msg):
     :return:
     """
     return hmac.new(key, msg, hashlib.sha512).digest()
+
+
+def hmac_sha512_keyed(key):
+    """
+    Returns a function computing HMAC-SHA512 with a fixed key. The key
+    schedule is done once, so it is cheaper than hmac_sha512 when the same
+    key is used with many messages.
+
+    :param key:
+    :return: function msg -> HMAC-SHA512(key, msg)
+    """
+    mac = hmac.new(key, digestmod=hashlib.sha512)
+    # _hmac_sha512_copy is looked up on each call, so it can be instrumented
+    return lambda msg: _hmac_sha512_copy(mac, msg)
+
+
+def _hmac_sha512_copy(mac, msg):
+    """ HMAC-SHA512 of a message from a keyed HMAC object (left unchanged) """
+    keyed = mac.copy()
+    keyed.update(msg)
+    return keyed.digest()
+
+
+def pbkdf2_hmac_sha512(password, salt, iterations):
+    """
+    PBKDF2 using HMAC-SHA512.
+
+    :param password:
+    :param salt:
+    :param iterations: number of iterations
+    :return: 64-byte derived key
+    """
+    return hashlib.pbkdf2_hmac("sha512", password, salt, iterations)
+
+
+@lru_cache(maxsize=None)
+def _tag_state(tag):
+    """ SHA-256 state after the prefix of a tag (computed once per tag) """
+    tag_hash = hashlib.sha256(tag.encode()).digest()
+    return hashlib.sha256(tag_hash + tag_hash)
+
+
+def tagged_hash(tag, data):
+    """
+    Tagged hash (BIP340): SHA-256(SHA-256(tag) || SHA-256(tag) || data).
+
+    :param tag: tag as string (e.g. "BIP0340/challenge")
+    :param data:
+    :return: 32-byte hash
+    """
+    state = _tag_state(tag).copy()
+    state.update(data)
+    return state.digest()
@@ -1,10 +1,16 @@
 """
 Module to deal with Hierarchical Deterministic (HD) tree according to BIP32
 specification (https://github.com/bitcoin/bips/blob/master/bip-0032.mediawiki)
-"""
 
-import base58
+The aio and mnemonic modules are imported by the methods using them, so
+importing this module stays fast.
+"""
+import struct
+import threading
+from collections import OrderedDict, namedtuple
 from pyhdwallet import hashutils
+from pyhdwallet import encoding
+from pyhdwallet import address
 from pyhdwallet import ecutils
 from pyhdwallet.networks import Network
 from pyhdwallet.ecpair import ECPair
@@ -14,26 +20,84 @@ DEFAULT_NETWORK = Network.get_supported_networks()[0]
 BITCOIN_SEED = b"Bitcoin seed"
 HARDENED_BIT = 0x80000000
 
+# version, depth, parent fingerprint, index and chain code (the key follows)
+_HEADER = struct.Struct(">IBII32s")
+SERIALIZED_SIZE = 78
+DEFAULT_KEY_CACHE_SIZE = 4096
+
+# statistics of the cache of parsed extended keys (see enable_key_cache)
+KeyCacheInfo = namedtuple("KeyCacheInfo",
+                          ["hits", "misses", "maxsize", "currsize"])
+
+
+def parse_path(path):
+    """
+    Parses a derivation path in the format m/x/x' (e.g. m/0/1'/0).
+
+    :param path: derivation path as string
+    :return: tuple of indexes (HARDENED_BIT added to hardened ones)
+    """
+    indexes = []
+    for i in path.split("/")[1:]:
+        if i[-1:] in ["'", 'H', 'h']:
+            indexes.append(int(i[:-1]) + HARDENED_BIT)
+        else:
+            indexes.append(int(i))
+    return tuple(indexes)
+
 
 class HDNode:
     """
     A node from Hierarchical Deterministic (HD) tree.
 
     Each node has extended keys allowing derivation of children nodes
+
+    Nodes are immutable, so they can be shared between threads (the
+    serialization is memoized the same way as the keys of ECPair). The
+    fields are read-only properties: assigning to them raises
+    AttributeError (they were plain attributes before), so create a new
+    node instead.
     """
 
     def __init__(self, keypair, chaincode, depth=0, index=0,
                  parent_fingerprint=0x00000000):
-        self.keypair = keypair
-        self.chain_code = chaincode
-        self.depth = depth
-        self.index = index
-        self.parent_fingerprint = parent_fingerprint
+        self.__keypair = keypair
+        self.__chain_code = bytes(chaincode)
+        self.__depth = depth
+        self.__index = index
+        self.__parent_fingerprint = parent_fingerprint
+        self.__serialized = None
+        self.__base58 = None
         if depth == 0:
             if parent_fingerprint != 0x00000000:
                 raise ValueError(
                     "Master node fingerprint should be 0x00000000")
 
+    @property
+    def keypair(self):
+        """ Returns the ECPair object of this node """
+        return self.__keypair
+
+    @property
+    def chain_code(self):
+        """ Returns the chain code as bytes """
+        return self.__chain_code
+
+    @property
+    def depth(self):
+        """ Returns the depth in the tree (0 for master nodes) """
+        return self.__depth
+
+    @property
+    def index(self):
+        """ Returns the index of this node """
+        return self.__index
+
+    @property
+    def parent_fingerprint(self):
+        """ Returns the fingerprint of the parent as int """
+        return self.__parent_fingerprint
+
     def neutered(self):
         """
         Returns a new node without the private key. (Removes the privkey)
@@ -60,34 +124,52 @@ class HDNode:
         Returns the extended key (xpriv or xpub) as a Base58Check string.
         (xpub if neutered; xpriv otherwise)
 
+        The main version of the network is always used: keys parsed from an
+        extra version (e.g. SLIP-132 ypub/zpub) are deliberately serialized
+        as xpub/xprv, since nodes do not keep the version they were parsed
+        with (it only tells how wallets use the key, not the key itself).
+
         :return: Extended key as Base58Check string
         """
-        net = self.keypair.network
-        version = net.version_pub if self.is_neutered() else net.version_priv
-        buffer = version.to_bytes(4, "big")
-        buffer += self.depth.to_bytes(1, "big")
-        buffer += self.parent_fingerprint.to_bytes(4, "big")
-        buffer += self.index.to_bytes(4, "big")
-        buffer += self.chain_code
-        if self.is_neutered():  # public
-            buffer += self.keypair.pubkey_buffer
-        else:                   # private
-            buffer += b'\x00'
-            buffer += self.keypair.privkey_buffer
-        assert len(buffer) == 78
-        return base58.b58encode_check(buffer).decode()
+        if self.__base58 is None:
+            self.__base58 = encoding.b58encode_check(self.to_bytes())
+        return self.__base58
+
+    def to_bytes(self):
+        """
+        Returns the extended key (xpriv or xpub) as its raw 78-byte BIP32
+        serialization (i.e. the payload of the Base58Check string), with
+        the main version of the network (see to_base58).
+
+        :return: Extended key as bytes
+        """
+        if self.__serialized is None:
+            keypair = self.keypair
+            net = keypair.network
+            if self.is_neutered():  # public
+                version, key = net.version_pub, keypair.pubkey_buffer
+            else:                   # private
+                version = net.version_priv
+                key = b'\x00' + keypair.privkey_buffer
+            self.__serialized = _HEADER.pack(
+                version, self.depth, self.parent_fingerprint, self.index,
+                self.chain_code) + key
+            assert len(self.__serialized) == SERIALIZED_SIZE
+        return self.__serialized
 
     def get_keypair(self):
         """ Returns the keypair """
         return self.keypair
 
-    def get_address(self):
+    def get_address(self, kind=address.P2PKH):
         """
-        Returns a P2PKH address
+        Returns the address of this node (P2PKH by default)
 
-        :return: Address as string (P2PKH address)
+        :param kind: address.P2PKH, address.P2WPKH, address.P2SH_P2WPKH or
+                     address.P2TR
+        :return: Address as string
         """
-        return self.keypair.get_address()
+        return self.keypair.get_address(kind)
 
     def get_identifier(self):
         """ Returns the identifier.
@@ -96,7 +178,7 @@ class HDNode:
 
         :return: identifier
          """
-        return hashutils.hash160(self.keypair.pubkey_buffer)
+        return self.keypair.pubkey_hash
 
     def get_fingerprint(self):
         """ Returns the fingerprint.
@@ -182,16 +264,69 @@ class HDNode:
         :return: HDNode child
         """
         obj = self
-        indexes = path.split("/")[1:]
-        for i in indexes:
-            if i[-1:] in ["'", 'H', 'h']:
-                num = int(i[:-1])
-                obj = obj.derive_hardened(num)
-            else:
-                num = int(i)
-                obj = obj.derive(num)
+        for index in parse_path(path):
+            obj = obj.derive(index)
         return obj
 
+    def sign_many(self, items):
+        """
+        Signs many hashes with keys derived from this node. The paths are
+        arranged in a prefix tree so each distinct intermediate node (e.g.
+        m/84'/0'/0'/0) is derived only once.
+
+        :param items: sequence of (derivation path, hash_buffer), e.g.
+                      [("m/84'/0'/0'/0/3", sighash), ...]
+        :return: list of ECSignature objects (in input order)
+        """
+        if self.is_neutered():
+            raise RuntimeError("A private key is needed for this operation")
+        nodes = {(): self}  # prefix of indexes -> node
+        secrets = []
+        for path, hash_buffer in items:
+            indexes = parse_path(path)
+            node = nodes.get(indexes)
+            if node is None:
+                depth = len(indexes)
+                while indexes[:depth] not in nodes:
+                    depth -= 1
+                node = nodes[indexes[:depth]]
+                for depth in range(depth, len(indexes)):
+                    node = node.derive(indexes[depth])
+                    nodes[indexes[:depth + 1]] = node
+            secrets.append((node.keypair.privkey, hash_buffer))
+        return ecutils.batch_sign(secrets)
+
+    def derive_range(self, start, stop):
+        """
+        Child Extended Key Derivation of a range of indexes.
+
+        :param start: first index
+        :param stop: index after the last one
+        :return: list of HDNode children
+        """
+        return [self.derive(i) for i in range(start, stop)]
+
+    async def aderive_path(self, path):
+        """
+        Asynchronous version of derive_path. (see pyhdwallet.aio)
+
+        :param path: derivation path as string (e.g. m/0/1'/0)
+        :return: HDNode child
+        """
+        from pyhdwallet import aio
+        return await aio.derive_path(self, path)
+
+    async def aderive_range(self, start, stop):
+        """
+        Asynchronous version of derive_range. (see pyhdwallet.aio)
+
+        :param start: first index
+        :param stop: index after the last one
+        :return: list of HDNode children
+        """
+        from pyhdwallet import aio
+        return await aio.derive_range(self, start, stop)
+
     @classmethod
     def from_seed(cls, seed_bytes, network=DEFAULT_NETWORK):
         """
@@ -206,46 +341,274 @@ class HDNode:
         chaincode = h[32:]  # right
         return cls(ECPair(privkey, network=network), chaincode)
 
+    @classmethod
+    def from_mnemonic(cls, words, passphrase="", network=DEFAULT_NETWORK):
+        """
+        Creates a new HDNode from a bip39 mnemonic (English wordlist)
+
+        :param words: mnemonic sentence as string
+        :param passphrase: optional bip39 passphrase
+        :param network: Network object
+        :return: new HDNode object
+        """
+        from pyhdwallet import mnemonic
+        return cls.from_seed(mnemonic.mnemonic_to_seed(words, passphrase),
+                             network)
+
+    @classmethod
+    def from_mnemonics(cls, items, passphrase="", network=DEFAULT_NETWORK,
+                       workers=None):
+        """
+        Creates many HDNode objects from bip39 mnemonics. The seeds are
+        computed in a process pool when workers is given.
+        (see mnemonic.mnemonics_to_seeds)
+
+        :param items: iterable of mnemonics or (mnemonic, passphrase) tuples
+        :param passphrase: passphrase used for the items given as strings
+        :param network: Network object
+        :param workers: number of processes (0 means one per CPU)
+        :return: list of mnemonic.NodeResult(index, node, error) in input
+                 order
+        """
+        from pyhdwallet import mnemonic
+        return [mnemonic.NodeResult(
+                    r.index,
+                    None if r.error else cls.from_seed(r.seed, network),
+                    r.error)
+                for r in mnemonic.mnemonics_to_seeds(items, passphrase,
+                                                     workers=workers)]
+
     @classmethod
     def from_base58(cls, encoded):
         """
-        Creates a new HDNode from a extended key (xpub/xpriv)
+        Creates a new HDNode from a extended key (xpub/xpriv). When the key
+        cache is enabled (see enable_key_cache), the same node object is
+        returned for the same string.
 
         :param encoded: a base58check string
         :return: a new HDNode object
         """
-        buffer = base58.b58decode_check(encoded)
-        if len(buffer) != 78:
+        cache = _key_cache
+        if cache is not None:
+            node = cache.get((cls, encoded))
+            if node is not None:
+                return node
+        buffer = encoding.b58decode_check(encoded)
+        if len(buffer) != SERIALIZED_SIZE:
+            raise ValueError("Invalid argument")
+        node = cls.__parse(buffer, 0)
+        if node.to_bytes() == buffer:
+            node.__base58 = encoded
+        if cache is not None:
+            node = cache.put((cls, encoded), _warm(node))
+        return node
+
+    @classmethod
+    def from_bytes(cls, buffer, offset=0):
+        """
+        Creates a new HDNode from the raw 78-byte serialization of an
+        extended key (see to_bytes). The key is read in place from the
+        buffer, so records can be parsed from a larger buffer (e.g. a BLOB
+        or a memory-mapped file) without slicing it first.
+
+        When the key cache is enabled (see enable_key_cache), the same node
+        object is returned for the same 78 bytes.
+
+        :param buffer: bytes-like object (bytes, bytearray, memoryview...)
+        :param offset: position of the serialization in the buffer
+        :return: a new HDNode object
+        """
+        cache = _key_cache
+        if cache is None:
+            return cls.__parse(buffer, offset)
+        if offset < 0:
             raise ValueError("Invalid argument")
-        version = int.from_bytes(buffer[:4], "big")
-        n = [x for x in Network.get_supported_networks() if
-             version in [x.version_pub, x.version_priv]]
-        if not n:
+        key = bytes(memoryview(buffer)[offset:offset + SERIALIZED_SIZE])
+        node = cache.get((cls, key))
+        if node is None:
+            node = cache.put((cls, key), _warm(cls.__parse(key, 0)))
+        return node
+
+    @classmethod
+    def __parse(cls, buffer, offset):
+        view = memoryview(buffer)
+        if offset < 0 or len(view) - offset < SERIALIZED_SIZE:
+            raise ValueError("Invalid argument")
+        version, depth, parent_fingerprint, index, chain_code = \
+            _HEADER.unpack_from(view, offset)
+        key = view[offset + _HEADER.size:offset + SERIALIZED_SIZE]
+        network = Network.get_by_version(version)
+        if network is None:
             raise ValueError("Network not supported")
-        network = n[0]
-        depth = buffer[4]
-        parent_fingerprint = int.from_bytes(buffer[5:9], "big")
-        index = int.from_bytes(buffer[9:13], "big")
-        chain_code = buffer[13:45]
-        key = buffer[45:]
-
-        if version == network.version_pub:
-            key_pair = ECPair(None, pubkey_buffer=key, network=network)
+
+        if network.is_public_version(version):
+            key_pair = ECPair(None, pubkey_buffer=bytes(key), network=network)
         else:
-            #validate key[0] == 0x00
-            key_pair = ECPair(key[1:], None, network=network)
+            if key[0] != 0:
+                raise ValueError("Invalid private key")
+            key_pair = ECPair(bytes(key[1:]), None, network=network)
         return cls(key_pair, chain_code, depth=depth, index=index,
                    parent_fingerprint=parent_fingerprint)
 
+    def __reduce__(self):
+        # compact state: the 78-byte serialization plus the public key and
+        # point of a private node when already computed
+        pubkey, point = self.keypair._cached_state()
+        if self.is_neutered():
+            pubkey = None
+        return self.__class__._from_state, (
+            self.to_bytes(), self.keypair.network, pubkey, point)
+
+    @classmethod
+    def _from_state(cls, buffer, network, pubkey, point):
+        """
+        Rebuilds an HDNode object from the 78-byte serialization and the
+        cached values of the key pair (see __reduce__).
+        """
+        _, depth, parent_fingerprint, index, chain_code = \
+            _HEADER.unpack_from(buffer)
+        key = buffer[_HEADER.size:]
+        if key[0] == 0:
+            keypair = ECPair._from_state(key[1:], pubkey, True, network,
+                                         point)
+        else:
+            keypair = ECPair._from_state(None, key, True, network, point)
+        node = cls(keypair, chain_code, depth=depth, index=index,
+                   parent_fingerprint=parent_fingerprint)
+        node.__serialized = buffer
+        return node
+
+    # equality and hash only depend on the memoized serialization (and the
+    # network, as networks may share versions), which never changes once
+    # computed and needs no curve operation
     def __eq__(self, other):
-        return self.keypair == other.keypair \
-               and self.chain_code == other.chain_code \
-               and self.depth == other.depth \
-               and self.index == other.index \
-               and self.parent_fingerprint == other.parent_fingerprint
+        if not isinstance(other, HDNode):
+            return NotImplemented
+        return self.to_bytes() == other.to_bytes() and \
+            self.keypair.network == other.keypair.network
+
+    def __hash__(self):
+        return hash(self.to_bytes())
 
     def __str__(self):
         return f"{self.__class__.__name__} (keyPair={self.keypair}, "\
                f"chainCode={self.chain_code}," \
                f"depth={self.depth}, index={self.index}," \
                f"parentFingerprint={self.parent_fingerprint})"
+
+
+class KeyCache:
+    """
+    Thread-safe bounded LRU cache of nodes (used for parsed extended keys,
+    see enable_key_cache, and by the derivation daemon)
+    """
+
+    def __init__(self, max_size):
+        """
+        :param max_size: maximum number of nodes kept
+        """
+        self.max_size = max_size
+        self.__hits = 0
+        self.__misses = 0
+        self.__nodes = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key, record=True):
+        """
+        Returns a cached node (and marks it as recently used).
+
+        :param key: key of the node
+        :param record: counts the lookup as a hit or a miss
+        :return: HDNode object or None if not cached
+        """
+        with self.__lock:
+            node = self.__nodes.get(key)
+            if node is not None:
+                self.__nodes.move_to_end(key)
+            if record:
+                self.__record(node is not None)
+            return node
+
+    def __record(self, hit):
+        if hit:
+            self.__hits += 1
+        else:
+            self.__misses += 1
+
+    def record(self, hit):
+        """
+        Counts a hit or a miss (for lookups done with record=False).
+
+        :param hit: True for a hit; False for a miss
+        """
+        with self.__lock:
+            self.__record(hit)
+
+    def put(self, key, node):
+        """
+        Stores a node, dropping the least recently used one beyond
+        max_size. If another thread stored the same key meanwhile, that
+        node is kept and returned.
+
+        :param key: key of the node
+        :param node: HDNode object
+        :return: the cached node
+        """
+        with self.__lock:
+            node = self.__nodes.setdefault(key, node)
+            if len(self.__nodes) > self.max_size:
+                self.__nodes.popitem(last=False)
+            return node
+
+    def info(self):
+        """
+        Returns the statistics of the cache.
+
+        :return: KeyCacheInfo(hits, misses, maxsize, currsize)
+        """
+        with self.__lock:
+            return KeyCacheInfo(self.__hits, self.__misses, self.max_size,
+                                len(self.__nodes))
+
+
+def _warm(node):
+    """ Computes the public key point and fingerprint of a node """
+    _ = node.keypair.pubkey_point
+    node.get_fingerprint()
+    return node
+
+
+_key_cache = None
+
+
+def enable_key_cache(max_size=DEFAULT_KEY_CACHE_SIZE):
+    """
+    Enables the cache of parsed extended keys used by HDNode.from_base58
+    and HDNode.from_bytes. Nodes are immutable, so the same object is
+    returned for the same key, with its public key point and fingerprint
+    already computed. The least recently used keys are dropped beyond
+    max_size. Enabling it again replaces the cache with an empty one.
+
+    :param max_size: maximum number of extended keys kept
+    """
+    global _key_cache
+    if max_size < 1:
+        raise ValueError("max_size should be at least 1")
+    _key_cache = KeyCache(max_size)
+
+
+def disable_key_cache():
+    """ Disables (and clears) the cache of parsed extended keys """
+    global _key_cache
+    _key_cache = None
+
+
+def key_cache_info():
+    """
+    Returns the statistics of the cache of parsed extended keys.
+
+    :return: KeyCacheInfo(hits, misses, maxsize, currsize) or None if the
+             cache is disabled
+    """
+    cache = _key_cache
+    return None if cache is None else cache.info()
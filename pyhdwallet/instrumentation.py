@@ -0,0 +1,130 @@
+"""
+Opt-in instrumentation of the hot paths (hashing, curve math and Base58).
+
+When enabled, the instrumented functions are replaced in their modules by
+wrappers that record the number of calls and the cumulative time spent (in
+nanoseconds) per operation. When disabled the original functions are put
+back, so instrumentation costs nothing unless it is turned on.
+
+Example::
+
+    >>> from pyhdwallet import instrumentation
+    >>> instrumentation.enable()
+    >>> node.derive_path("m/0/1")
+    >>> instrumentation.snapshot()["hmac_sha512"]
+    OperationStats(calls=2, total_ns=20131)
+"""
+import importlib
+import threading
+import time
+from collections import namedtuple
+from functools import wraps
+
+# operation name -> functions instrumented as (module, function)
+OPERATIONS = {
+    "hmac_sha512": [("pyhdwallet.hashutils", "hmac_sha512"),
+                    ("pyhdwallet.hashutils", "_hmac_sha512_copy")],
+    "hash160": [("pyhdwallet.hashutils", "hash160")],
+    "point_mul": [("pyhdwallet.ecutils", "mul_g"),
+                  ("pyhdwallet.ecutils", "mul"),
+                  ("pyhdwallet.ecutils", "multi_mul")],
+    "point_add": [("pyhdwallet.ecutils", "point_add")],
+    "decompress": [("pyhdwallet.ecutils", "point_from_bytes")],
+    "b58encode": [("pyhdwallet.encoding", "b58encode_check")],
+    "b58decode": [("pyhdwallet.encoding", "b58decode_check")],
+}
+
+OperationStats = namedtuple("OperationStats", ["calls", "total_ns"])
+
+_lock = threading.Lock()
+_counters = {name: [0, 0] for name in OPERATIONS}
+_originals = {}
+_callback = None
+
+
+def _wrap(name, func):
+    counter = _counters[name]
+    perf_counter_ns = time.perf_counter_ns
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = perf_counter_ns() - start
+            with _lock:
+                counter[0] += 1
+                counter[1] += elapsed
+            callback = _callback
+            if callback is not None:
+                callback(name, elapsed)
+    return wrapper
+
+
+def enable():
+    """
+    Enables the instrumentation of all operations (see OPERATIONS).
+    Calling it when already enabled has no effect.
+    """
+    with _lock:
+        if _originals:
+            return
+        for name, targets in OPERATIONS.items():
+            for module_name, attr in targets:
+                module = importlib.import_module(module_name)
+                func = getattr(module, attr)
+                _originals[(module_name, attr)] = func
+                setattr(module, attr, _wrap(name, func))
+
+
+def disable():
+    """
+    Disables the instrumentation restoring the original functions.
+    Recorded counters are kept until reset() is called.
+    """
+    with _lock:
+        for (module_name, attr), func in _originals.items():
+            setattr(importlib.import_module(module_name), attr, func)
+        _originals.clear()
+
+
+def is_enabled():
+    """
+    Returns whether or not instrumentation is enabled.
+
+    :return: True if enabled; False otherwise
+    """
+    return bool(_originals)
+
+
+def snapshot():
+    """
+    Returns the counters recorded so far.
+
+    :return: dict mapping operation name to OperationStats(calls, total_ns)
+    """
+    with _lock:
+        return {name: OperationStats(*values)
+                for name, values in _counters.items()}
+
+
+def reset():
+    """
+    Resets all counters to zero.
+    """
+    with _lock:
+        for values in _counters.values():
+            values[0] = values[1] = 0
+
+
+def set_callback(callback):
+    """
+    Sets up a function called after each instrumented operation, e.g. to
+    export timings to a metrics system. The callback receives the operation
+    name and the elapsed time in nanoseconds.
+
+    :param callback: callable(name, elapsed_ns) or None to remove it
+    """
+    global _callback
+    _callback = callback
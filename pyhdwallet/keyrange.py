@@ -0,0 +1,63 @@
+"""
+Enumeration of the public keys of consecutive private keys (k, k+1, ...).
+
+Only the first point of each chunk is a full scalar multiplication; the
+following ones are computed with one point addition each (P, P+G, P+2G,
+...) and the whole chunk is converted to affine coordinates with a single
+modular inversion. Chunks can be computed across processes (the range is
+split in chunks) and are yielded in order.
+
+Example::
+
+    >>> for chunk in enumerate_keys(1, 1000001, workers=4):
+    ...     for i, h160 in enumerate(chunk.hash160s):
+    ...         check(chunk.start + i, h160)
+"""
+from collections import namedtuple
+from pyhdwallet import ecutils
+from pyhdwallet import hashutils
+from pyhdwallet import parallel
+
+DEFAULT_CHUNK_SIZE = 4096
+
+# pubkeys[i] and hash160s[i] belong to the private key start + i
+# (hash160s is None when not requested)
+KeyChunk = namedtuple("KeyChunk", ["start", "pubkeys", "hash160s"])
+
+
+def _enumerate_chunk(bounds, compressed, hash160s):
+    """ Computes the public keys (and hashes) of a chunk of the range """
+    start, stop = bounds
+    point = ecutils.mul_g(start)
+    points = []
+    for _ in range(start, stop):
+        points.append(point)
+        point = ecutils.point_add(point, ecutils.G_AFFINE)
+    pubkeys = [ecutils.point_to_bytes(affine, compressed)
+               for affine in ecutils.batch_to_affine(points)]
+    hashes = list(map(hashutils.hash160, pubkeys)) if hash160s else None
+    return KeyChunk(start, pubkeys, hashes)
+
+
+def enumerate_keys(start, stop, compressed=True, hash160s=True,
+                   workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Enumerates the public keys of the private keys start, start + 1, ...,
+    stop - 1 in chunks.
+
+    :param start: first private key as int (at least 1)
+    :param stop: private key after the last one (at most ORDER)
+    :param compressed: compressed (33 bytes) or uncompressed (65 bytes)
+                       public keys
+    :param hash160s: also computes the hash160 of the public keys
+    :param workers: number of processes (0 means one per CPU)
+    :param chunk_size: number of keys per chunk
+    :return: generator of KeyChunk(start, pubkeys, hash160s) in order
+    """
+    if not 1 <= start <= stop <= ecutils.ORDER:
+        raise ValueError("Invalid range of private keys")
+    if chunk_size < 1:
+        raise ValueError("chunk_size should be at least 1")
+    return parallel.map_chunks(_enumerate_chunk,
+                               parallel.ranges(start, stop, chunk_size),
+                               workers, args=(compressed, hash160s))
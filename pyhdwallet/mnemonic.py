@@ -0,0 +1,120 @@
+"""
+Mnemonic code for generating deterministic keys according to BIP39
+specification (https://github.com/bitcoin/bips/blob/master/bip-0039.mediawiki)
+
+Only the English wordlist is supported.
+"""
+import os
+import unicodedata
+from collections import namedtuple
+from pyhdwallet import hashutils
+from pyhdwallet import parallel
+
+WORDLIST_FILE = os.path.join(os.path.dirname(__file__), "bip39_english.txt")
+PBKDF2_ROUNDS = 2048
+# mnemonics per chunk of the process pool (each one costs a PBKDF2)
+DEFAULT_CHUNK_SIZE = 16
+
+# index: position of the mnemonic in the input, seed: 64-byte seed (None on
+# error), error: error message (None on success)
+SeedResult = namedtuple("SeedResult", ["index", "seed", "error"])
+# same as SeedResult, with the master HDNode instead of the seed
+NodeResult = namedtuple("NodeResult", ["index", "node", "error"])
+
+_wordlist = None
+_word_index = None
+
+
+def get_wordlist():
+    """
+    Returns the BIP39 English wordlist.
+
+    :return: list of 2048 words
+    """
+    global _wordlist, _word_index
+    if _wordlist is None:
+        with open(WORDLIST_FILE, encoding="utf8") as file:
+            words = file.read().split()
+        _word_index = {word: i for i, word in enumerate(words)}
+        _wordlist = words
+    return _wordlist
+
+
+def _normalize(text):
+    return unicodedata.normalize("NFKD", text)
+
+
+def validate_mnemonic(mnemonic):
+    """
+    Checks the words and the checksum of a mnemonic.
+
+    :param mnemonic: mnemonic sentence as string
+    :raise ValueError: if the mnemonic is invalid
+    """
+    get_wordlist()
+    words = _normalize(mnemonic).split()
+    if len(words) not in (12, 15, 18, 21, 24):
+        raise ValueError("Invalid number of words")
+    number = 0
+    for word in words:
+        index = _word_index.get(word)
+        if index is None:
+            raise ValueError("Invalid word: {}".format(word))
+        number = (number << 11) | index
+    checksum_bits = len(words) // 3
+    entropy = (number >> checksum_bits).to_bytes(checksum_bits * 4, "big")
+    checksum = hashutils.sha256(entropy)[0] >> (8 - checksum_bits)
+    if number & ((1 << checksum_bits) - 1) != checksum:
+        raise ValueError("Invalid mnemonic checksum")
+
+
+def mnemonic_to_seed(mnemonic, passphrase="", validate=True):
+    """
+    Converts a mnemonic to a binary seed (PBKDF2-HMAC-SHA512).
+
+    :param mnemonic: mnemonic sentence as string
+    :param passphrase: optional passphrase
+    :param validate: check the words and the checksum before
+    :return: 64-byte seed
+    """
+    if validate:
+        validate_mnemonic(mnemonic)
+    return hashutils.pbkdf2_hmac_sha512(
+        _normalize(mnemonic).encode("utf8"),
+        ("mnemonic" + _normalize(passphrase)).encode("utf8"),
+        PBKDF2_ROUNDS)
+
+
+def _seeds_chunk(chunk, passphrase, validate):
+    result = []
+    for index, item in chunk:
+        try:
+            if isinstance(item, str):
+                seed = mnemonic_to_seed(item, passphrase, validate)
+            else:
+                seed = mnemonic_to_seed(item[0], item[1], validate)
+        except Exception as exc:  # pylint: disable=broad-except
+            result.append(SeedResult(index, None, str(exc) or repr(exc)))
+        else:
+            result.append(SeedResult(index, seed, None))
+    return result
+
+
+def mnemonics_to_seeds(items, passphrase="", validate=True, workers=None,
+                       chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Converts many mnemonics to seeds, spreading the PBKDF2 work over a
+    process pool.
+
+    :param items: iterable of mnemonics, or of (mnemonic, passphrase) tuples
+    :param passphrase: passphrase used for the items given as strings
+    :param validate: check the words and the checksum of each mnemonic
+    :param workers: number of processes (0 means one per CPU; None or 1
+                    runs in the calling process)
+    :param chunk_size: number of mnemonics per chunk
+    :return: generator of SeedResult(index, seed, error) in input order
+    """
+    chunks = parallel.chunked(enumerate(items), chunk_size)
+    for chunk in parallel.map_chunks(_seeds_chunk, chunks, workers,
+                                     args=(passphrase, validate)):
+        yield from chunk
@@ -0,0 +1,98 @@
+"""
+Multisig (m-of-n) addresses from cosigner extended public keys.
+
+For each index the child public keys of all cosigners are sorted (BIP67)
+and assembled into a redeem script OP_m <pubkeys> OP_n OP_CHECKMULTISIG,
+which is encoded as a P2SH, P2WSH or P2SH-P2WSH address.
+"""
+from collections import namedtuple
+from pyhdwallet import address
+from pyhdwallet import batch
+from pyhdwallet import ecutils
+from pyhdwallet.hdnode import HDNode
+
+OP_CHECKMULTISIG = b"\xae"
+MAX_KEYS = 16
+
+MultisigAddress = namedtuple("MultisigAddress",
+                             ["index", "redeem_script", "address"])
+
+
+def redeem_script(threshold, pubkeys):
+    """
+    Builds a multisig redeem script with the public keys sorted as BIP67.
+
+    :param threshold: number of signatures required (m)
+    :param pubkeys: compressed public keys as bytes (n)
+    :return: redeem script as bytes
+    """
+    if not 1 <= threshold <= len(pubkeys) <= MAX_KEYS:
+        raise ValueError("Invalid multisig parameters")
+    if any(len(pubkey) != 33 for pubkey in pubkeys):
+        raise ValueError("Multisig needs compressed public keys")
+    return bytes([0x50 + threshold]) + \
+        b"".join([b"\x21" + pubkey for pubkey in sorted(pubkeys)]) + \
+        bytes([0x50 + len(pubkeys)]) + OP_CHECKMULTISIG
+
+
+class MultisigWallet:
+    """
+    m-of-n multisig wallet built from the extended public keys of the
+    cosigners. Children of all cosigners are derived in one batch per range
+    and the points of the cosigner keys are decoded only once.
+    """
+
+    def __init__(self, threshold, cosigners, kind=address.P2WSH):
+        """
+        Creates a new multisig wallet.
+
+        :param threshold: number of signatures required (m)
+        :param cosigners: extended keys of the cosigners as HDNode objects or
+                          Base58 strings (private keys are neutered)
+        :param kind: address.P2SH, address.P2WSH or address.P2SH_P2WSH
+        """
+        nodes = [HDNode.from_base58(x) if isinstance(x, str) else x
+                 for x in cosigners]
+        if not 1 <= threshold <= len(nodes) <= MAX_KEYS:
+            raise ValueError("Invalid multisig parameters")
+        if kind not in address.SCRIPT_KINDS:
+            raise ValueError("Unknown kind of address: {}".format(kind))
+        networks = {node.keypair.network for node in nodes}
+        if len(networks) != 1:
+            raise ValueError("Cosigners should be on the same network")
+        self.threshold = threshold
+        self.kind = kind
+        self.network = networks.pop()
+        self.cosigners = [node if node.is_neutered() else node.neutered()
+                          for node in nodes]
+        for node in self.cosigners:
+            # decodes the parent points once
+            _ = node.keypair.pubkey_point
+
+    def derive_range(self, start, stop):
+        """
+        Derives the redeem scripts and addresses of a range of indexes.
+
+        :param start: first index
+        :param stop: index after the last one
+        :return: list of MultisigAddress(index, redeem_script, address)
+        """
+        indexes = range(start, stop)
+        points = batch.derive_public_points(self.cosigners, indexes)
+        result = []
+        for i, index in enumerate(indexes):
+            script = redeem_script(self.threshold, [
+                ecutils.point_to_bytes(cosigner[i]) for cosigner in points])
+            result.append(MultisigAddress(
+                index, script,
+                address.from_script(script, self.network, self.kind)))
+        return result
+
+    def get_address(self, index):
+        """
+        Returns the address of an index.
+
+        :param index: index for derivation
+        :return: address as string
+        """
+        return self.derive_range(index, index + 1)[0].address
@@ -1,59 +1,257 @@
 """
 Cryptocurrency network definitions
+
+The networks known by default are loaded from networks.json (shipped with
+the package). Other networks can be added to the registry with
+Network.register or loaded from another file with load_networks.
 """
+import json
+import os
+import threading
+
+NETWORKS_FILE = os.path.join(os.path.dirname(__file__), "networks.json")
+
 
 class Network:
     """
     Represents a cryptocurrency network (e.g. Bitcoin Mainnet)
+
+    Network objects are immutable and hashable.
     """
+    __slots__ = ("description", "version_priv", "version_pub",
+                 "pub_key_hash", "wif", "extra_versions", "script_hash",
+                 "bech32_hrp")
+
     def __init__(self, description, version_priv, version_pub, pub_key_hash,
-                 wif):
+                 wif, extra_versions=None, script_hash=None,
+                 bech32_hrp=None):
+        """
+        Creates a new Network object.
+
+        :param description: name of the network (e.g. Bitcoin Mainnet)
+        :param version_priv: version of extended private keys as int
+        :param version_pub: version of extended public keys as int
+        :param pub_key_hash: P2PKH address version as bytes
+        :param wif: WIF version as bytes
+        :param extra_versions: dict mapping a name to additional pairs of
+                               (version_priv, version_pub) accepted when
+                               parsing extended keys (e.g. SLIP-132 ypub/zpub)
+        :param script_hash: P2SH address version as bytes (None if not
+                            supported)
+        :param bech32_hrp: human-readable part of SegWit addresses (None if
+                           not supported)
+        """
         self.description = description
         self.version_priv = version_priv
         self.version_pub = version_pub
         self.pub_key_hash = pub_key_hash
         self.wif = wif
+        self.extra_versions = tuple(
+            (name, versions[0], versions[1])
+            for name, versions in (extra_versions or {}).items())
+        self.script_hash = script_hash
+        self.bech32_hrp = bech32_hrp
+
+    def __setattr__(self, name, value):
+        # each attribute is set once, by __init__
+        if hasattr(self, name):
+            raise AttributeError("Network objects are immutable")
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError("Network objects are immutable")
+
+    def get_versions(self):
+        """
+        Returns all pairs of extended key versions of this network, the
+        main one first.
+
+        :return: list of (version_priv, version_pub)
+        """
+        return [(self.version_priv, self.version_pub)] + \
+            [(priv, pub) for _, priv, pub in self.extra_versions]
+
+    def is_public_version(self, version):
+        """
+        Checks whether an extended key version of this network is public.
+
+        :param version: version as int
+        :return: True for public versions; False for private versions
+        """
+        for priv, pub in self.get_versions():
+            if version == pub:
+                return True
+            if version == priv:
+                return False
+        raise ValueError("Version does not belong to this network")
+
+    # the registry (list of networks and lookup indexes) is replaced as a
+    # whole, so readers in other threads always see a consistent one
+    __registry_lock = threading.Lock()
 
     @classmethod
     def get_supported_networks(cls):
         """
         Returns the list of supported networks
 
-        :return: list of supported networks
+        :return: list of supported networks (a copy: changing it does not
+                 change the supported networks)
         """
-        return cls.__NETWORK_LIST
+        return list(cls.__registry[0])
 
     @classmethod
     def set_supported_networks(cls, network_list):
         """
-        Sets up the list of supported networks
+        Sets up the list of supported networks and rebuilds the lookup
+        indexes. When more than one network has the same prefix the first one
+        in the list is used.
 
-        :param network_list: New list of supported networks
+        :param network_list: New list of supported networks (any iterable;
+                             it is copied)
         """
-        cls.__NETWORK_LIST = network_list
+        with cls.__registry_lock:
+            cls.__set_registry(tuple(network_list))
+
+    @classmethod
+    def __set_registry(cls, networks):
+        by_version, by_wif, by_pub_key_hash = {}, {}, {}
+        for network in networks:
+            for priv, pub in network.get_versions():
+                by_version.setdefault(priv, network)
+                by_version.setdefault(pub, network)
+            by_wif.setdefault(network.wif, network)
+            by_pub_key_hash.setdefault(network.pub_key_hash, network)
+        cls.__registry = (networks, frozenset(id(x) for x in networks),
+                          by_version, by_wif, by_pub_key_hash)
+
+    @classmethod
+    def register(cls, network):
+        """
+        Adds a network to the list of supported networks. Prefixes already
+        used by a supported network keep resolving to that network.
+
+        :param network: Network object
+        """
+        with cls.__registry_lock:
+            if not cls.is_supported(network):
+                cls.__set_registry(cls.__registry[0] + (network,))
+
+    @classmethod
+    def is_supported(cls, network):
+        """
+        Checks whether or not a network is supported. Supported network
+        objects are found by identity; equal copies (e.g. unpickled objects)
+        are still accepted.
+
+        :param network: Network object
+        :return: True if the network is supported; False otherwise
+        """
+        registry = cls.__registry
+        return id(network) in registry[1] or network in registry[0]
+
+    @classmethod
+    def get_by_version(cls, version):
+        """
+        Returns the supported network of an extended key version
+        (private or public, including extra versions such as ypub/zpub).
+
+        :param version: version as int (e.g. 0x0488B21E for xpub)
+        :return: Network object or None if not supported
+        """
+        return cls.__registry[2].get(version)
+
+    @classmethod
+    def get_by_wif(cls, wif):
+        """
+        Returns the supported network of a WIF version byte.
+
+        :param wif: WIF version as bytes (e.g. b"\\x80")
+        :return: Network object or None if not supported
+        """
+        return cls.__registry[3].get(wif)
+
+    @classmethod
+    def get_by_pub_key_hash(cls, pub_key_hash):
+        """
+        Returns the supported network of a P2PKH address version byte.
+
+        :param pub_key_hash: address version as bytes (e.g. b"\\x00")
+        :return: Network object or None if not supported
+        """
+        return cls.__registry[4].get(pub_key_hash)
+
+    def __reduce__(self):
+        return _unpickle_network, (
+            self.description, self.version_priv, self.version_pub,
+            self.pub_key_hash, self.wif,
+            {name: (priv, pub) for name, priv, pub in self.extra_versions},
+            self.script_hash, self.bech32_hrp)
+
+    def __key(self):
+        return (self.description, self.version_priv, self.version_pub,
+                self.pub_key_hash, self.wif, self.extra_versions,
+                self.script_hash, self.bech32_hrp)
 
     def __eq__(self, other):
-        return self.description == other.description and \
-               self.version_priv == other.version_priv and \
-               self.version_pub == other.version_pub and \
-               self.pub_key_hash == other.pub_key_hash and \
-               self.wif == other.wif
+        if not isinstance(other, Network):
+            return NotImplemented
+        return self.__key() == other.__key()
+
+    def __hash__(self):
+        return hash(self.__key())
 
     def __str__(self):
         return self.description
 
 
-BITCOIN_MAINNET = Network(description="Bitcoin Mainnet",
-                          version_priv=0x0488ADE4,
-                          version_pub=0x0488B21E,
-                          pub_key_hash=b"\x00",
-                          wif=b"\x80")
+def _unpickle_network(*args):
+    """
+    Rebuilds a pickled Network object. If an equal network is supported,
+    the supported object itself is returned (so objects are shared and
+    identity checks stay fast across processes).
+    """
+    network = Network(*args)
+    supported = Network.get_by_version(network.version_priv)
+    return supported if supported == network else network
+
+
+def load_networks(path):
+    """
+    Loads network definitions from a JSON file: a list of objects with the
+    Network arguments, versions and prefixes as hex strings. (see the
+    networks.json file shipped with the package)
+
+    :param path: path of the JSON file
+    :return: list of Network objects
+    """
+    def _version(hexa):
+        return int(hexa, 16)
+
+    def _prefix(hexa):
+        return None if hexa is None else bytes.fromhex(hexa)
+
+    with open(path, encoding="utf8") as file:
+        definitions = json.load(file)
+    return [Network(description=d["description"],
+                    version_priv=_version(d["version_priv"]),
+                    version_pub=_version(d["version_pub"]),
+                    pub_key_hash=bytes.fromhex(d["pub_key_hash"]),
+                    wif=bytes.fromhex(d["wif"]),
+                    extra_versions={
+                        name: (_version(priv), _version(pub))
+                        for name, (priv, pub)
+                        in d.get("extra_versions", {}).items()},
+                    script_hash=_prefix(d.get("script_hash")),
+                    bech32_hrp=d.get("bech32_hrp"))
+            for d in definitions]
 
-BITCOIN_TESTNET = Network(description="Bitcoin Testnet",
-                          version_priv=0x04358394,
-                          version_pub=0x043587CF,
-                          pub_key_hash=b"\x6F",
-                          wif=b"\xEF")
 
 # supported networks
-Network.set_supported_networks([BITCOIN_MAINNET, BITCOIN_TESTNET])
+Network.set_supported_networks(load_networks(NETWORKS_FILE))
+
+_DEFAULT_NETWORKS = {x.description: x for x in
+                     Network.get_supported_networks()}
+BITCOIN_MAINNET = _DEFAULT_NETWORKS["Bitcoin Mainnet"]
+BITCOIN_TESTNET = _DEFAULT_NETWORKS["Bitcoin Testnet"]
+LITECOIN_MAINNET = _DEFAULT_NETWORKS["Litecoin Mainnet"]
+DOGECOIN_MAINNET = _DEFAULT_NETWORKS["Dogecoin Mainnet"]
@@ -0,0 +1,149 @@
+"""
+Helpers to run bulk work in chunks, optionally across processes or threads.
+
+Chunks are submitted lazily and at most a few of them are in flight per
+worker, so the memory used does not depend on the size of the input.
+Results are yielded in input order.
+
+Process pools work on every interpreter but pickle the chunks and results.
+Thread pools avoid that cost; they only run the curve arithmetic in parallel
+on free-threaded (no-GIL) CPython builds.
+
+The batch module is imported by the functions using it (batch imports
+hdnode, which imports mnemonic, which uses this module).
+"""
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+DEFAULT_CHUNK_SIZE = 1000
+# kinds of executor
+PROCESS = "process"
+THREAD = "thread"
+_EXECUTORS = {PROCESS: ProcessPoolExecutor, THREAD: ThreadPoolExecutor}
+# chunks in flight per worker
+_PREFETCH = 2
+
+
+def chunked(iterable, size):
+    """
+    Splits an iterable in lists of (at most) size items.
+
+    :param iterable: any iterable
+    :param size: number of items per chunk
+    :return: generator of lists
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ranges(start, stop, size):
+    """
+    Splits the range start, start + 1, ..., stop - 1 in consecutive chunks
+    of (at most) size numbers.
+
+    :param start: first number
+    :param stop: number after the last one
+    :param size: numbers per chunk
+    :return: generator of (chunk start, chunk stop) tuples
+    """
+    for i in range(start, stop, size):
+        yield i, min(i + size, stop)
+
+
+def resolve_workers(workers):
+    """
+    Returns the number of workers to use.
+
+    :param workers: number of workers (0 means one per CPU; None or 1 means
+                    running in the calling process)
+    :return: number of workers
+    """
+    if workers == 0:
+        return os.cpu_count() or 1
+    return workers or 1
+
+
+def map_chunks(func, chunks, workers=None, args=(), executor=PROCESS):
+    """
+    Applies func(chunk, *args) to each chunk yielding the results in order.
+
+    :param func: function (module level, so it is picklable, for processes)
+    :param chunks: iterable of chunks (consumed lazily)
+    :param workers: number of workers (see resolve_workers)
+    :param args: tuple of additional arguments passed to func
+    :param executor: PROCESS or THREAD
+    :return: generator of func results
+    """
+    if executor not in _EXECUTORS:
+        raise ValueError("Unknown executor: {}".format(executor))
+    workers = resolve_workers(workers)
+    if workers == 1:
+        for chunk in chunks:
+            yield func(chunk, *args)
+        return
+    with _EXECUTORS[executor](workers) as pool:
+        pending = deque()
+        try:
+            for chunk in chunks:
+                pending.append(pool.submit(func, chunk, *args))
+                if len(pending) >= workers * _PREFETCH:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _derive_chunk(bounds, node):
+    from pyhdwallet import batch
+    return batch.derive_children([(node, i) for i in range(*bounds)])
+
+
+def _sign_chunk(items):
+    from pyhdwallet import batch
+    return batch.sign_many(items)
+
+
+def derive_range(node, start, stop, workers=None, executor=THREAD,
+                 chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Child Extended Key Derivation of a range of indexes, split in chunks
+    run in parallel. (parallel version of HDNode.derive_range)
+
+    :param node: HDNode object
+    :param start: first index
+    :param stop: index after the last one
+    :param workers: number of workers (see resolve_workers)
+    :param executor: THREAD or PROCESS
+    :param chunk_size: number of children per chunk
+    :return: list of HDNode children
+    """
+    return [child for chunk in map_chunks(_derive_chunk,
+                                          ranges(start, stop, chunk_size),
+                                          workers, (node,), executor)
+            for child in chunk]
+
+
+def sign_many(items, workers=None, executor=THREAD,
+              chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Signs many hashes, split in chunks run in parallel.
+    (parallel version of batch.sign_many)
+
+    :param items: sequence of (ECPair, hash_buffer)
+    :param workers: number of workers (see resolve_workers)
+    :param executor: THREAD or PROCESS
+    :param chunk_size: number of signatures per chunk
+    :return: list of ECSignature objects (in the same order)
+    """
+    return [sig for chunk in map_chunks(_sign_chunk,
+                                        chunked(items, chunk_size), workers,
+                                        executor=executor)
+            for sig in chunk]
@@ -0,0 +1,177 @@
+"""
+Micro-batching scheduler for signing and derivation services.
+
+Requests submitted by many concurrent callers are collected for at most
+max_delay seconds (or until max_batch_size requests are waiting) and run as
+batch operations (see pyhdwallet.batch). Each caller gets the result through
+a concurrent.futures.Future, so throughput increases at the cost of a
+bounded added latency.
+
+Example::
+
+    >>> with BatchScheduler(max_batch_size=128, max_delay=0.002) as scheduler:
+    ...     future = scheduler.sign(ecpair, hash_buffer)
+    ...     signature = future.result()
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from pyhdwallet import batch
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_DELAY = 0.002  # seconds
+
+# operation -> (batch function, single item function)
+_OPERATIONS = {
+    "sign": (batch.sign_many,
+             lambda ecpair, hash_buffer: ecpair.sign(hash_buffer)),
+    "verify": (batch.verify_many,
+               lambda ecpair, hash_buffer, sig: ecpair.verify(hash_buffer,
+                                                              sig)),
+    "derive": (batch.derive_children,
+               lambda node, index: node.derive(index)),
+}
+
+_STOP = object()
+
+
+class BatchScheduler:
+    """
+    Collects requests from concurrent callers and runs them in batches in
+    a background thread.
+    """
+
+    def __init__(self, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_delay=DEFAULT_MAX_DELAY):
+        """
+        Creates a new scheduler and starts its worker thread.
+
+        :param max_batch_size: maximum number of requests per batch
+        :param max_delay: maximum time (seconds) a request waits for others
+                          before its batch is dispatched
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size should be at least 1")
+        if max_delay < 0:
+            raise ValueError("max_delay should not be negative")
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.__queue = queue.Queue()
+        self.__closed = False
+        # nothing is queued after _STOP: submit and close check and change
+        # the state holding this lock
+        self.__lock = threading.Lock()
+        self.__thread = threading.Thread(target=self.__run, daemon=True,
+                                         name="pyhdwallet-batch-scheduler")
+        self.__thread.start()
+
+    def sign(self, ecpair, hash_buffer):
+        """
+        Requests the signature of a 32 byte hash. (see ECPair.sign)
+
+        :param ecpair: ECPair object with a private key
+        :param hash_buffer: 32 byte buffer (as bytes)
+        :return: Future of ECSignature object
+        """
+        return self.__submit("sign", (ecpair, hash_buffer))
+
+    def verify(self, ecpair, hash_buffer, ec_signature):
+        """
+        Requests the verification of a signature. (see ECPair.verify)
+
+        :param ecpair: ECPair object
+        :param hash_buffer: 32 byte buffer (as bytes)
+        :param ec_signature: ECSignature object
+        :return: Future of bool (True if this signature is valid)
+        """
+        return self.__submit("verify", (ecpair, hash_buffer, ec_signature))
+
+    def derive(self, node, index):
+        """
+        Requests a Child Extended Key Derivation. (see HDNode.derive)
+
+        :param node: HDNode object
+        :param index: index for derivation
+        :return: Future of HDNode child
+        """
+        return self.__submit("derive", (node, index))
+
+    def close(self):
+        """
+        Stops accepting requests and waits for the pending ones.
+        """
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__queue.put(_STOP)
+        self.__thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __submit(self, operation, args):
+        future = Future()
+        with self.__lock:
+            if self.__closed:
+                raise RuntimeError("Scheduler is closed")
+            self.__queue.put((operation, args, future))
+        return future
+
+    def __run(self):
+        stop = False
+        while not stop:
+            request = self.__queue.get()
+            if request is _STOP:
+                break
+            requests = [request]
+            deadline = time.monotonic() + self.max_delay
+            while len(requests) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    request = self.__queue.get(timeout=timeout) \
+                        if timeout > 0 else self.__queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is _STOP:
+                    stop = True
+                    break
+                requests.append(request)
+            self.__dispatch(requests)
+        self.__fail_queued()
+
+    def __fail_queued(self):
+        """ Fails the requests left in the queue after stopping """
+        while True:
+            try:
+                request = self.__queue.get_nowait()
+            except queue.Empty:
+                return
+            if request is not _STOP and \
+                    request[2].set_running_or_notify_cancel():
+                request[2].set_exception(RuntimeError("Scheduler is closed"))
+
+    @staticmethod
+    def __dispatch(requests):
+        groups = {}
+        for request in requests:
+            groups.setdefault(request[0], []).append(request)
+        for operation, group in groups.items():
+            group = [r for r in group if r[2].set_running_or_notify_cancel()]
+            batch_func, single_func = _OPERATIONS[operation]
+            try:
+                results = batch_func([args for _, args, _ in group])
+            except Exception:  # pylint: disable=broad-except
+                # isolates the failing requests
+                for _, args, future in group:
+                    try:
+                        future.set_result(single_func(*args))
+                    except Exception as exc:  # pylint: disable=broad-except
+                        future.set_exception(exc)
+                continue
+            for (_, _, future), result in zip(group, results):
+                future.set_result(result)
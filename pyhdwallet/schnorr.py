@@ -0,0 +1,143 @@
+"""
+BIP340 Schnorr signatures
+(https://github.com/bitcoin/bips/blob/master/bip-0340.mediawiki)
+
+Public keys are x-only (32 bytes) and signatures are 64 bytes. Many
+signatures can be checked at once with batch_verify, which does a single
+multi-scalar multiplication for the whole batch.
+"""
+import os
+from pyhdwallet import ecutils
+from pyhdwallet import hashutils
+
+TAG_AUX = "BIP0340/aux"
+TAG_NONCE = "BIP0340/nonce"
+TAG_CHALLENGE = "BIP0340/challenge"
+
+
+def _int(buffer):
+    return int.from_bytes(buffer, "big")
+
+
+def _bytes(number):
+    return number.to_bytes(32, "big")
+
+
+def _challenge(r_bytes, pubkey, msg):
+    return _int(hashutils.tagged_hash(TAG_CHALLENGE, r_bytes + pubkey + msg))\
+        % ecutils.ORDER
+
+
+def xonly_pubkey(secret):
+    """
+    Returns the x-only public key of a private key.
+
+    :param secret: private key (32-byte int)
+    :return: public key as bytes (32 bytes)
+    """
+    return _bytes(ecutils.batch_points([secret])[0][0])
+
+
+def sign(secret, msg, aux_rand=None):
+    """
+    Signs a message.
+
+    :param secret: private key (32-byte int)
+    :param msg: message as bytes (usually a 32-byte hash)
+    :param aux_rand: 32 bytes of auxiliary randomness (random by default)
+    :return: signature as bytes (64 bytes)
+    """
+    order = ecutils.ORDER
+    if not 0 < secret < order:
+        raise ValueError("Invalid private key")
+    if aux_rand is None:
+        aux_rand = os.urandom(32)
+    if len(aux_rand) != 32:
+        raise ValueError("aux_rand should be 32 bytes")
+    pub_x, pub_y = ecutils.batch_points([secret])[0]
+    if pub_y & 1:
+        secret = order - secret
+    pubkey = _bytes(pub_x)
+    t = _bytes(secret ^ _int(hashutils.tagged_hash(TAG_AUX, aux_rand)))
+    nonce = _int(hashutils.tagged_hash(TAG_NONCE, t + pubkey + msg)) % order
+    if nonce == 0:
+        raise ValueError("Invalid nonce")
+    r_x, r_y = ecutils.batch_points([nonce])[0]
+    if r_y & 1:
+        nonce = order - nonce
+    r_bytes = _bytes(r_x)
+    e = _challenge(r_bytes, pubkey, msg)
+    return r_bytes + _bytes((nonce + e * secret) % order)
+
+
+def _parse(pubkey, sig):
+    """
+    Returns the public key point, r and s of a signature (None if they are
+    invalid).
+    """
+    if len(pubkey) != 32 or len(sig) != 64:
+        return None
+    point = ecutils.lift_x(_int(pubkey))
+    r = _int(sig[:32])
+    s = _int(sig[32:])
+    if point is None or r >= ecutils.FIELD_PRIME or s >= ecutils.ORDER:
+        return None
+    return point, r, s
+
+
+def verify(pubkey, msg, sig):
+    """
+    Verifies a signature.
+
+    :param pubkey: x-only public key as bytes (32 bytes)
+    :param msg: message as bytes
+    :param sig: signature as bytes (64 bytes)
+    :return: True if the signature is valid
+    """
+    parsed = _parse(pubkey, sig)
+    if parsed is None:
+        return False
+    point, r, s = parsed
+    e = _challenge(sig[:32], pubkey, msg)
+    result = ecutils.point_add(ecutils.mul_g(s),
+                               ecutils.mul(point, ecutils.ORDER - e))
+    if ecutils.is_infinity(result):
+        return False
+    x, y = ecutils.to_affine(result)
+    return y & 1 == 0 and x == r
+
+
+def batch_verify(items):
+    """
+    Verifies many signatures at once (BIP340 batch verification): with
+    random a_i (a_1 = 1), checks that
+    (s_1 + a_2 s_2 + ...) G ==
+        R_1 + a_2 R_2 + ... + e_1 P_1 + a_2 e_2 P_2 + ...
+    with a single multi-scalar multiplication. The result is True only if
+    every signature is valid; check them one by one with verify to find the
+    invalid ones.
+
+    :param items: list of (pubkey, msg, sig) as in verify
+    :return: True if all signatures are valid
+    """
+    order = ecutils.ORDER
+    rand = os.urandom
+    total = 0
+    terms = []
+    for i, (pubkey, msg, sig) in enumerate(items):
+        parsed = _parse(pubkey, sig)
+        if parsed is None:
+            return False
+        point, r, s = parsed
+        r_point = ecutils.lift_x(r)
+        if r_point is None:
+            return False
+        a = 1 if i == 0 else _int(rand(32)) % (order - 1) + 1
+        e = _challenge(sig[:32], pubkey, msg)
+        total += a * s
+        terms.append((r_point, a))
+        terms.append((point, a * e))
+    if not terms:
+        return True
+    terms.append((ecutils.G_AFFINE, order - total % order))
+    return ecutils.is_infinity(ecutils.multi_mul(terms))
@@ -0,0 +1,46 @@
+"""
+Taproot output keys for key path spending (BIP341/BIP86)
+(https://github.com/bitcoin/bips/blob/master/bip-0086.mediawiki)
+
+The output key is the internal key (taken with even y) tweaked with the
+TapTweak tagged hash of its x coordinate: Q = P + int(hash(x(P))) * G.
+output_keys tweaks many points at once sharing a single modular inversion,
+so keys whose points are already known (e.g. children derived in batch)
+need no decompression.
+"""
+from pyhdwallet import ecutils
+from pyhdwallet import hashutils
+
+TAG_TAPTWEAK = "TapTweak"
+
+
+def _tweak_item(point):
+    x, y = point
+    xonly = x.to_bytes(32, "big")
+    tweak = int.from_bytes(hashutils.tagged_hash(TAG_TAPTWEAK, xonly), "big")
+    if tweak >= ecutils.ORDER:
+        raise ValueError("Invalid tweak")
+    return tweak, (x, ecutils.FIELD_PRIME - y if y & 1 else y)
+
+
+def output_keys(points):
+    """
+    Computes the output keys of many internal keys (no script path).
+
+    :param points: internal public key points as (x, y) tuples of ints
+    :return: list of x-only output keys (32 bytes each)
+    """
+    results = ecutils.batch_combine([_tweak_item(p) for p in points])
+    if None in results:
+        raise ValueError("Point at infinity")
+    return [x.to_bytes(32, "big") for x, _ in results]
+
+
+def output_key(point):
+    """
+    Computes the output key of an internal key (no script path).
+
+    :param point: internal public key point as (x, y) tuple of ints
+    :return: x-only output key (32 bytes)
+    """
+    return output_keys([point])[0]
@@ -22,15 +22,20 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/henriquetft/pyhdwallet",
     packages=setuptools.find_packages(),
+    package_data={"pyhdwallet": ["networks.json", "bip39_english.txt"]},
     keywords=["cryptocurrency", "bitcoin", "bip32", "python", "crypto",
               "wallet", "hierarchical-deterministic-wallets", "hdwallet",
               "bitcoincash"],
     install_requires=requirements,
+    extras_require={
+        "numpy": ["numpy>=1.17"],
+        "arrow": ["pyarrow>=3.0"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: BSD License",
         "Operating System :: OS Independent",
         "Intended Audience :: Developers"
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.8',
 )
\ No newline at end of file
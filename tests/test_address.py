@@ -0,0 +1,104 @@
+import unittest
+from binascii import unhexlify
+from pyhdwallet import address
+from pyhdwallet import encoding
+from pyhdwallet import taproot
+from pyhdwallet.ecpair import ECPair
+from pyhdwallet.hdnode import HDNode
+from pyhdwallet.networks import BITCOIN_TESTNET, DOGECOIN_MAINNET
+
+# https://github.com/bitcoin/bips/blob/master/bip-0173.mediawiki
+PUBKEY_G = unhexlify("0279BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F"
+                     "2815B16F81798")
+
+
+class TestSegWitAddress(unittest.TestCase):
+    def test_p2wpkh(self):
+        ecpair = ECPair(None, PUBKEY_G)
+        self.assertEqual(ecpair.get_address(address.P2WPKH),
+                         "bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4")
+        ecpair = ECPair(None, PUBKEY_G, network=BITCOIN_TESTNET)
+        self.assertEqual(ecpair.get_address(address.P2WPKH),
+                         "tb1qw508d6qejxtdg4y5r3zarvary0c5xw7kxpjzsx")
+
+    def test_p2sh_p2wpkh(self):
+        # https://github.com/bitcoin/bips/blob/master/bip-0049.mediawiki
+        ecpair = ECPair.from_wif(
+            "cULrpoZGXiuC19Uhvykx7NugygA3k86b3hmdCeyvHYQZSxojGyXJ")
+        self.assertEqual(ecpair.get_address(address.P2SH_P2WPKH),
+                         "2Mww8dCYPUpKHofjgcXcBCEGmniw9CoaiD2")
+
+    def test_p2pkh_default(self):
+        ecpair = ECPair(None, PUBKEY_G)
+        self.assertEqual(ecpair.get_address(),
+                         ecpair.get_address(address.P2PKH))
+
+    def test_p2wsh_program(self):
+        program = unhexlify("1863143c14c5166804bd19203356da136c985678cd4d27a1"
+                            "b8c6329604903262")
+        self.assertEqual(encoding.segwit_encode("bc", 0, program),
+                         "bc1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpy"
+                         "sxf3qccfmv3")
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            ECPair(1, compressed=False).get_address(address.P2WPKH)
+        with self.assertRaises(ValueError):
+            ECPair(1, network=DOGECOIN_MAINNET).get_address(address.P2WPKH)
+        with self.assertRaises(ValueError):
+            ECPair(1).get_address("p2abc")
+
+    def test_get_addresses(self):
+        root = HDNode.from_seed(unhexlify('000102030405060708090a0b0c0d0e0f'))
+        nodes = root.derive_range(0, 5)
+        for kind in (address.P2PKH, address.P2WPKH, address.P2SH_P2WPKH):
+            self.assertEqual(address.get_addresses(nodes, kind),
+                             [node.get_address(kind) for node in nodes])
+        self.assertEqual(address.get_addresses([]), [])
+
+
+class TestTaproot(unittest.TestCase):
+    # https://github.com/bitcoin/bips/blob/master/bip-0086.mediawiki
+    MNEMONIC = "abandon abandon abandon abandon abandon abandon abandon " \
+               "abandon abandon abandon abandon about"
+
+    def test_bip86(self):
+        node = HDNode.from_mnemonic(self.MNEMONIC).derive_path(
+            "m/86'/0'/0'/0/0")
+        self.assertEqual(
+            node.keypair.xonly_pubkey.hex(),
+            "cc8a4bc64d897bddc5fbc2f670f7a8ba0b386779106cf1223c6fc5d7cd6fc115")
+        self.assertEqual(
+            taproot.output_key(node.keypair.pubkey_point).hex(),
+            "a60869f0dbcf1dc659c9cecbaf8050135ea9e8cdc487053f1dc6880949dc684c")
+        self.assertEqual(
+            node.get_address(address.P2TR),
+            "bc1p5cyxnuxmeuwuvkwfem96lqzszd02n6xdcjrs20cac6yqjjwudpxqkedrcr")
+
+    def test_bech32m(self):
+        # https://github.com/bitcoin/bips/blob/master/bip-0350.mediawiki
+        program = unhexlify("79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d9"
+                            "59f2815b16f81798")
+        self.assertEqual(encoding.segwit_encode("bc", 1, program),
+                         "bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9"
+                         "hcz7vqzk5jj0")
+        with self.assertRaises(ValueError):
+            encoding.segwit_encode("bc", 17, program)
+        with self.assertRaises(ValueError):
+            encoding.segwit_encode("bc", 0, program[:30])
+
+    def test_get_addresses(self):
+        root = HDNode.from_mnemonic(self.MNEMONIC).derive_path("m/86'/0'/0'/0")
+        nodes = root.derive_range(0, 5)
+        self.assertEqual(address.get_addresses(nodes, address.P2TR),
+                         [node.get_address(address.P2TR) for node in nodes])
+        testnet = ECPair(1, network=BITCOIN_TESTNET)
+        self.assertTrue(testnet.get_address(address.P2TR).startswith("tb1p"))
+        with self.assertRaises(ValueError):
+            address.from_hash160(bytes(20), BITCOIN_TESTNET, address.P2TR)
+        with self.assertRaises(ValueError):
+            ECPair(1, network=DOGECOIN_MAINNET).get_address(address.P2TR)
+
+
+if __name__ == '__main__':
+    unittest.main()
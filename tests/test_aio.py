@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import unittest
+from binascii import unhexlify
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
+from pyhdwallet import aio
+from pyhdwallet.ecpair import ECPair
+from pyhdwallet.hashutils import sha256
+from pyhdwallet.hdnode import HDNode
+
+SEED = unhexlify('000102030405060708090a0b0c0d0e0f')
+
+
+class TestAsyncAPI(unittest.TestCase):
+    def setUp(self):
+        self.node = HDNode.from_seed(SEED)
+
+    def tearDown(self):
+        aio.set_executor(None)
+
+    def test_aderive_path(self):
+        child = asyncio.run(self.node.aderive_path("m/0'/1"))
+        self.assertEqual(child, self.node.derive_path("m/0'/1"))
+
+    def test_aderive_range(self):
+        async def run():
+            return await aio.derive_range(self.node, 3, 10, chunk_size=3)
+        children = asyncio.run(run())
+        self.assertEqual([c.index for c in children], list(range(3, 10)))
+        self.assertEqual(children[4], self.node.derive(7))
+
+    def test_asign_averify_batch(self):
+        ecpair = self.node.derive(1).get_keypair()
+        other = self.node.derive(2).get_keypair()
+        hash_buffer = sha256(b"message")
+
+        async def run():
+            signature = await ecpair.asign(hash_buffer)
+            return await ECPair.averify_batch(
+                [(ecpair, hash_buffer, signature),
+                 (other, hash_buffer, signature)])
+        self.assertEqual(asyncio.run(run()), [True, False])
+
+    def test_asign_bytes_like(self):
+        ecpair = self.node.derive(1).get_keypair()
+        hash_buffer = bytearray(sha256(b"message"))
+
+        async def run():
+            return await asyncio.gather(
+                ecpair.asign(hash_buffer),
+                ecpair.asign(memoryview(hash_buffer)))
+        for signature in asyncio.run(run()):
+            self.assertTrue(ecpair.verify(hash_buffer, signature))
+
+    def test_coalesce(self):
+        calls = []
+        release = threading.Event()
+
+        def derive_path(node, path):
+            calls.append(path)
+            release.wait(5)
+            return node.derive_path(path)
+
+        async def run():
+            tasks = [asyncio.ensure_future(self.node.aderive_path("m/1"))
+                     for _ in range(5)]
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*tasks)
+
+        with mock.patch('pyhdwallet.aio._derive_path', derive_path):
+            results = asyncio.run(run())
+        self.assertEqual(calls, ["m/1"])
+        self.assertTrue(all(r is results[0] for r in results))
+
+    def test_cancel_one_waiter(self):
+        release = threading.Event()
+
+        def derive_path(node, path):
+            release.wait(5)
+            return node.derive_path(path)
+
+        async def run():
+            task1 = asyncio.ensure_future(self.node.aderive_path("m/2"))
+            task2 = asyncio.ensure_future(self.node.aderive_path("m/2"))
+            await asyncio.sleep(0.05)
+            task1.cancel()
+            await asyncio.sleep(0)
+            release.set()
+            result = await task2
+            with self.assertRaises(asyncio.CancelledError):
+                await task1
+            return result
+
+        with mock.patch('pyhdwallet.aio._derive_path', derive_path):
+            self.assertEqual(asyncio.run(run()), self.node.derive(2))
+
+    def test_request_after_cancelling_only_waiter(self):
+        release = threading.Event()
+
+        def derive_path(node, path):
+            release.wait(5)
+            return node.derive_path(path)
+
+        async def run():
+            task = asyncio.ensure_future(self.node.aderive_path("m/4"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            await asyncio.sleep(0)
+            asyncio.get_running_loop().call_later(0.05, release.set)
+            # the work was cancelled with its only waiter: a new request
+            # for the same path starts new work
+            return await self.node.aderive_path("m/4")
+
+        with mock.patch('pyhdwallet.aio._derive_path', derive_path):
+            self.assertEqual(asyncio.run(run()), self.node.derive(4))
+
+    def test_thread_executor(self):
+        with ThreadPoolExecutor(2) as executor:
+            aio.set_executor(executor)
+            child = asyncio.run(self.node.aderive_path("m/3"))
+        self.assertEqual(child, self.node.derive(3))
+
+    def test_process_executor(self):
+        with ProcessPoolExecutor(1) as executor:
+            aio.set_executor(executor)
+            children = asyncio.run(self.node.aderive_range(0, 2))
+        self.assertEqual(children, [self.node.derive(0), self.node.derive(1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
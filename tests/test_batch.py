@@ -0,0 +1,148 @@
+import unittest
+from unittest import mock
+from binascii import unhexlify
+from pyhdwallet import batch
+from pyhdwallet import ecutils
+from pyhdwallet.ecpair import ECPair
+from pyhdwallet.hashutils import sha256
+from pyhdwallet.hdnode import HDNode
+
+SEED = unhexlify('000102030405060708090a0b0c0d0e0f')
+
+
+class TestCurveArithmetic(unittest.TestCase):
+    def test_batch_inverse(self):
+        values = [3, 5, 7, 11, ecutils.ORDER - 1]
+        inverses = ecutils._batch_inverse(values, ecutils.ORDER)
+        for value, inverse in zip(values, inverses):
+            self.assertEqual(value * inverse % ecutils.ORDER, 1)
+
+    def test_batch_points(self):
+        gx, gy = ecutils.G_AFFINE
+        vectors = {
+            1: (gx, gy),
+            2: (0xc6047f9441ed7d6d3045406e95c07cd85c778e4b8cef3ca7abac09b95c709ee5,
+                0x1ae168fea63dc339a3c58419466ceaeef7f632653266d0e1236431a950cfe52a),
+            3: (0xf9308a019258c31049344f85f89d5229b531c845836f99b08601f113bce036f9,
+                0x388f7b0f632de8140fe337e62a37f3566500a99934c2231b6cb9fd7584b8e672),
+            ecutils.ORDER - 1: (gx, ecutils.FIELD_PRIME - gy),
+        }
+        secrets = list(vectors)
+        for secret, point in zip(secrets, ecutils.batch_points(secrets)):
+            self.assertEqual(point, vectors[secret])
+
+    def test_to_affine(self):
+        point = ecutils.mul_g(3)
+        self.assertFalse(ecutils.is_infinity(point))
+        self.assertEqual(ecutils.to_affine(point),
+                         ecutils.batch_points([3])[0])
+        infinity = ecutils.point_add(point, ecutils.mul_g(ecutils.ORDER - 3))
+        self.assertTrue(ecutils.is_infinity(infinity))
+        with self.assertRaises(ValueError):
+            ecutils.to_affine(infinity)
+
+    def test_affine_bytes(self):
+        pubkey = ECPair(12345).pubkey_buffer
+        point = ecutils.point_from_bytes(pubkey)
+        self.assertEqual(ecutils.point_to_bytes(point), pubkey)
+        uncompressed = ecutils.point_to_bytes(point, compressed=False)
+        self.assertEqual(ecutils.point_from_bytes(uncompressed), point)
+
+    def test_affine_from_bytes_invalid(self):
+        with self.assertRaises(ValueError):
+            ecutils.point_from_bytes(b"\x02" + b"\x00" * 31 + b"\x05")
+        with self.assertRaises(ValueError):
+            ecutils.point_from_bytes(b"\x04" + b"\x01" * 64)
+
+    def test_batch_combine_infinity(self):
+        point = ecutils.batch_points([5])[0]
+        result = ecutils.batch_combine([(ecutils.ORDER - 5, point), (1, point)])
+        self.assertIsNone(result[0])
+        self.assertEqual(result[1], ecutils.batch_points([6])[0])
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.node = HDNode.from_seed(SEED)
+
+    def test_derive_children(self):
+        neutered = self.node.neutered()
+        items = [(self.node, 0), (neutered, 1), (self.node, 0x80000002),
+                 (self.node.derive(5).neutered(), 7)]
+        expected = [node.derive(index) for node, index in items]
+        self.assertEqual(batch.derive_children(items), expected)
+
+    def test_derive_children_neutered_hardened(self):
+        with self.assertRaises(RuntimeError):
+            batch.derive_children([(self.node.neutered(), 0x80000000)])
+
+    def test_derive_public(self):
+        parents = [self.node.derive(i).neutered() for i in range(4)] + \
+            [self.node.derive(9)]
+        children = batch.derive_public(parents, range(3, 6), chunk_size=4)
+        self.assertEqual(len(children), 15)
+        self.assertEqual(len(children.pubkeys), 15 * 33)
+        self.assertEqual(len(children.chain_codes), 15 * 32)
+        for n, parent in enumerate(parents):
+            for i, index in enumerate(range(3, 6)):
+                child = parent.derive(index)
+                self.assertEqual(children.get_pubkey(n, i),
+                                 child.keypair.pubkey_buffer)
+                self.assertEqual(children.get_chain_code(n, i),
+                                 child.chain_code)
+                self.assertEqual(children.get_node(n, i), child.neutered())
+        with self.assertRaises(IndexError):
+            children.get_node(5, 0)
+
+    def test_derive_public_chunks_of_one_parent(self):
+        parent = self.node.neutered()
+        sizes = []
+        batch_combine = ecutils.batch_combine
+
+        def combine(items):
+            sizes.append(len(items))
+            return batch_combine(items)
+
+        with mock.patch.object(ecutils, "batch_combine", side_effect=combine):
+            children = batch.derive_public([parent], range(10), chunk_size=4)
+        self.assertEqual(sizes, [4, 4, 2])
+        self.assertEqual([children.get_node(0, i) for i in range(10)],
+                         parent.derive_range(0, 10))
+
+    def test_derive_public_single_index(self):
+        parents = [self.node.derive(i).neutered() for i in range(3)]
+        children = batch.derive_public(parents, 7)
+        self.assertEqual(list(children.child_indexes), [7, 7, 7])
+        self.assertEqual([children.get_node(n, 0) for n in range(3)],
+                         [parent.derive(7) for parent in parents])
+        with self.assertRaises(ValueError):
+            batch.derive_public(parents, 0x80000000)
+
+    def test_derive_public_invalid_il(self):
+        parent = self.node.neutered()
+        with mock.patch('pyhdwallet.hashutils.hmac_sha512_keyed',
+                        return_value=lambda msg: b"\xff" * 64):
+            children = batch.derive_public([parent], 2)
+        self.assertEqual(list(children.child_indexes), [3])
+        self.assertEqual(children.get_node(0, 0), parent.derive(3))
+
+    def test_sign_verify_many(self):
+        pairs = [self.node.derive(i).get_keypair() for i in range(5)]
+        hashes = [sha256(bytes([i])) for i in range(5)]
+        signatures = batch.sign_many(zip(pairs, hashes))
+        for ecpair, hash_buffer, sig in zip(pairs, hashes, signatures):
+            self.assertTrue(ecpair.verify(hash_buffer, sig))
+        items = list(zip(pairs, hashes, signatures))
+        self.assertEqual(batch.verify_many(items), [True] * 5)
+        items[2] = (pairs[2], hashes[3], signatures[2])
+        self.assertEqual(batch.verify_many(items),
+                         [True, True, False, True, True])
+
+    def test_sign_many_no_privkey(self):
+        with self.assertRaises(RuntimeError):
+            batch.sign_many([(self.node.neutered().get_keypair(),
+                              sha256(b"a"))])
+
+
+if __name__ == '__main__':
+    unittest.main()
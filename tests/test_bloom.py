@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pyhdwallet import bloom
+from pyhdwallet.bloom import BloomFilter
+from pyhdwallet.hashutils import hash160
+from pyhdwallet.keyrange import enumerate_keys
+
+
+def _hashes(start, count):
+    return [hash160(i.to_bytes(8, "big")) for i in range(start, start + count)]
+
+
+class TestBloomFilter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "keys.bloom")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_optimal_parameters(self):
+        self.assertEqual(bloom.optimal_parameters(1000, 0.01), (9592, 7))
+        with self.assertRaises(ValueError):
+            bloom.optimal_parameters(0, 0.01)
+        with self.assertRaises(ValueError):
+            bloom.optimal_parameters(10, 1)
+
+    def test_no_false_negatives(self):
+        chunk, = enumerate_keys(1, 201)
+        bloom_filter = BloomFilter.from_hash160s(chunk.hash160s, 0.01)
+        self.assertEqual(bloom_filter.count, 200)
+        self.assertTrue(all(bloom_filter.contains_many(chunk.hash160s)))
+        self.assertIn(chunk.hash160s[0], bloom_filter)
+
+    def test_false_positive_rate(self):
+        bloom_filter = BloomFilter(2000, fp_rate=0.01)
+        bloom_filter.add_many(_hashes(0, 2000))
+        self.assertAlmostEqual(bloom_filter.false_positive_rate, 0.01,
+                               delta=0.002)
+        hits = sum(bloom_filter.contains_many(_hashes(10 ** 6, 10000)))
+        self.assertLess(hits, 200)
+
+    def test_save_load(self):
+        hashes = _hashes(0, 500)
+        others = _hashes(10 ** 6, 500)
+        bloom_filter = BloomFilter.from_hash160s(hashes)
+        expected = bloom_filter.contains_many(others)
+        bloom_filter.save(self.path)
+        for use_mmap in (True, False):
+            with BloomFilter.load(self.path, use_mmap) as loaded:
+                self.assertEqual(loaded.count, 500)
+                self.assertEqual(loaded.size_bits, bloom_filter.size_bits)
+                self.assertEqual(loaded.num_hashes, bloom_filter.num_hashes)
+                self.assertTrue(all(loaded.contains_many(hashes)))
+                self.assertEqual(loaded.contains_many(others), expected)
+        loaded = BloomFilter.load(self.path)
+        with self.assertRaises(RuntimeError):
+            loaded.add(hashes[0])
+        loaded.close()
+        with self.assertRaises(RuntimeError):
+            loaded.contains_many(hashes)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            BloomFilter(10).add(b"short")
+        with open(self.path, "wb") as file:
+            file.write(b"not a bloom filter" * 3)
+        with self.assertRaises(ValueError):
+            BloomFilter.load(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
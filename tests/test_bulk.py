@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from binascii import unhexlify
+import base58
+from pyhdwallet.bulk import parse_extended_keys
+from pyhdwallet.hdnode import HDNode
+
+SEED = unhexlify('000102030405060708090a0b0c0d0e0f')
+
+
+class TestParseExtendedKeys(unittest.TestCase):
+    def setUp(self):
+        root = HDNode.from_seed(SEED)
+        self.nodes = [root.derive(i).neutered() for i in range(6)]
+        self.nodes.append(root.derive(6))
+        self.lines = [node.to_base58() for node in self.nodes]
+        # valid checksum, x coordinate not on the curve
+        payload = base58.b58decode_check(self.lines[0])
+        invalid_point = payload[:45] + b"\x02" + b"\x00" * 31 + b"\x05"
+        self.invalid_point = base58.b58encode_check(invalid_point).decode()
+
+    def test_iterable(self):
+        results = list(parse_extended_keys(self.lines, chunk_size=3))
+        self.assertEqual([r.line for r in results], list(range(1, 8)))
+        self.assertEqual([r.node for r in results], self.nodes)
+        self.assertTrue(all(r.error is None for r in results))
+
+    def test_errors(self):
+        lines = [self.lines[0], "invalid", "", self.invalid_point,
+                 self.lines[1]]
+        results = list(parse_extended_keys(lines, validate=True))
+        self.assertEqual([r.line for r in results], [1, 2, 4, 5])
+        self.assertEqual(results[0].node, self.nodes[0])
+        self.assertIsNone(results[1].node)
+        self.assertIsNotNone(results[1].error)
+        self.assertIsNone(results[2].node)
+        self.assertEqual(results[3].node, self.nodes[1])
+
+    def test_without_validation(self):
+        results = list(parse_extended_keys([self.invalid_point]))
+        self.assertIsNotNone(results[0].node)
+
+    def test_file_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "keys.txt")
+            with open(path, "w") as file:
+                file.write("\n".join(self.lines + ["bad"]) + "\n")
+            results = list(parse_extended_keys(path, workers=2, chunk_size=2,
+                                               validate=True))
+        self.assertEqual([r.node for r in results[:-1]], self.nodes)
+        self.assertEqual(results[-1].line, 8)
+        self.assertIsNotNone(results[-1].error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import io
+import json
+import unittest
+from binascii import unhexlify
+from contextlib import redirect_stderr
+from pyhdwallet import cli
+from pyhdwallet.hdnode import HDNode
+
+SEED = '000102030405060708090a0b0c0d0e0f'
+
+
+class TestCLI(unittest.TestCase):
+    def setUp(self):
+        self.root = HDNode.from_seed(unhexlify(SEED))
+
+    def run_cli(self, *args):
+        out = io.BytesIO()
+        with redirect_stderr(io.StringIO()):
+            status = cli.main(list(args), out)
+        return status, out.getvalue()
+
+    def test_csv_addresses(self):
+        xpub = self.root.derive(0).neutered().to_base58()
+        status, data = self.run_cli("--xkey", xpub, "--path", "m/*",
+                                    "--start", "5", "--count", "3",
+                                    "--chunk-size", "2")
+        self.assertEqual(status, 0)
+        expected = ["index,address"] + [
+            "{},{}".format(i, self.root.derive_path("m/0/%d" % i)
+                           .get_address()) for i in range(5, 8)]
+        self.assertEqual(data.decode().splitlines(), expected)
+
+    def test_jsonl_wif_workers(self):
+        status, data = self.run_cli("--seed", SEED, "--path", "m/1'/*'",
+                                    "--count", "4", "--output", "wif",
+                                    "--format", "jsonl", "--workers", "2",
+                                    "--chunk-size", "1")
+        self.assertEqual(status, 0)
+        records = [json.loads(line) for line in data.decode().splitlines()]
+        self.assertEqual([r["index"] for r in records], [0, 1, 2, 3])
+        self.assertEqual(records[2]["wif"], self.root.derive_path(
+            "m/1'/2'").get_keypair().to_wif())
+
+    def test_binary_pubkeys(self):
+        status, data = self.run_cli("--seed", SEED, "--path", "m/0/*",
+                                    "--count", "3", "--output", "pubkey",
+                                    "--format", "binary")
+        self.assertEqual(status, 0)
+        self.assertEqual(len(data), 3 * 37)
+        self.assertEqual(data[37:41], (1).to_bytes(4, "big"))
+        self.assertEqual(data[41:74], self.root.derive_path(
+            "m/0/1").get_keypair().pubkey_buffer)
+
+    def test_segwit_address(self):
+        status, data = self.run_cli("--seed", SEED, "--count", "1",
+                                    "--address-kind", "p2wpkh")
+        self.assertEqual(data.decode().splitlines()[1], "0," +
+                         self.root.derive_path("m/0/0").get_address("p2wpkh"))
+
+    def test_taproot_address(self):
+        status, data = self.run_cli("--seed", SEED, "--count", "3",
+                                    "--address-kind", "p2tr")
+        self.assertEqual(data.decode().splitlines()[1:], [
+            "{},{}".format(i, self.root.derive_path(
+                "m/0/{}".format(i)).get_address("p2tr")) for i in range(3)])
+        status, data = self.run_cli("--seed", SEED, "--count", "2",
+                                    "--address-kind", "p2tr",
+                                    "--format", "binary")
+        self.assertEqual(len(data), 2 * 36)
+
+    def test_broken_pipe(self):
+        class ClosedPipe(io.BytesIO):
+            def write(self, data):
+                raise BrokenPipeError()
+
+        with redirect_stderr(io.StringIO()) as stderr:
+            status = cli.main(["--seed", SEED, "--count", "3"], ClosedPipe())
+        self.assertEqual(status, 1)
+        self.assertEqual(stderr.getvalue(), "")
+
+    def test_errors(self):
+        xpub = self.root.neutered().to_base58()
+        self.assertEqual(self.run_cli("--xkey", xpub, "--count", "1",
+                                      "--output", "wif")[0], 1)
+        self.assertEqual(self.run_cli("--xkey", xpub, "--count", "1",
+                                      "--path", "m/*'")[0], 1)
+        self.assertEqual(self.run_cli("--xkey", xpub, "--count", "1",
+                                      "--path", "m/0")[0], 1)
+        self.assertEqual(self.run_cli("--seed", SEED, "--count", "1",
+                                      "--network", "abc")[0], 1)
+        with self.assertRaises(SystemExit):
+            self.run_cli("--xkey", xpub, "--count", "-1")
+
+
+if __name__ == '__main__':
+    unittest.main()
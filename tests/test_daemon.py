@@ -0,0 +1,155 @@
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from binascii import unhexlify
+from pyhdwallet import daemon
+from pyhdwallet.hashutils import sha256
+from pyhdwallet.hdnode import HDNode
+
+SEED = unhexlify('000102030405060708090a0b0c0d0e0f')
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix domain sockets")
+class TestDaemon(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.socket_path = os.path.join(cls.directory, "daemon.sock")
+        cls.server = daemon.DerivationServer(cls.socket_path, cache_size=64)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.thread.join()
+        cls.server.server_close()
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        self.node = HDNode.from_seed(SEED)
+        self.client = daemon.DaemonClient(self.socket_path, pool_size=2)
+        self.remote = self.client.node(self.node.to_base58())
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_socket_permissions(self):
+        mode = stat.S_IMODE(os.stat(self.socket_path).st_mode)
+        self.assertEqual(mode & 0o077, 0)
+
+    def test_derive(self):
+        path = "m/0'/1/2'"
+        self.assertEqual(self.remote.derive_path(path).to_base58(),
+                         self.node.derive_path(path).to_base58())
+        self.assertEqual(self.remote.derive_hardened(0).derive(1).to_bytes(),
+                         self.node.derive_hardened(0).derive(1).to_bytes())
+        self.assertEqual(self.remote.derive(3).to_hdnode(),
+                         self.node.derive(3))
+
+    def test_derive_range_pipelined(self):
+        remote = self.remote.derive_range(0, 20)
+        self.assertEqual([x.to_hdnode() for x in remote],
+                         self.node.derive_range(0, 20))
+
+    def test_addresses(self):
+        paths = ["m/0/{}".format(i) for i in range(5)]
+        for kind in daemon.ADDRESS_KINDS:
+            self.assertEqual(
+                self.remote.get_addresses(paths, kind),
+                [self.node.derive_path(p).get_address(kind) for p in paths])
+        self.assertEqual(self.remote.get_address(),
+                         self.node.get_address())
+
+    def test_sign_verify(self):
+        items = [("m/0'/{}".format(i), sha256(bytes([i]))) for i in range(4)]
+        signatures = self.remote.sign_many(items)
+        for (path, hash_buffer), sig in zip(items, signatures):
+            keypair = self.node.derive_path(path).keypair
+            self.assertTrue(keypair.verify(hash_buffer, sig))
+            self.assertTrue(self.remote.derive_path(path).verify(
+                hash_buffer, sig))
+        self.assertFalse(self.remote.verify(items[0][1], signatures[0]))
+        self.assertTrue(self.node.keypair.verify(
+            items[0][1], self.remote.sign(items[0][1])))
+
+    def test_errors(self):
+        with self.assertRaises(daemon.DaemonError):
+            self.remote.derive_path("m/x")
+        neutered = self.client.node(self.node.neutered())
+        with self.assertRaises(daemon.DaemonError):
+            neutered.sign(bytes(32))
+        with self.assertRaises(daemon.DaemonError):
+            self.client.call(99, self.node.to_bytes())
+        # the connection is still usable after errors
+        self.assertEqual(neutered.derive(1).to_hdnode(),
+                         self.node.neutered().derive(1))
+
+    def test_pipeline_larger_than_socket_buffer(self):
+        count = 20000  # about 860 KB of responses
+        addresses = self.remote.get_addresses(["m/0"] * count)
+        self.assertEqual(addresses,
+                         [self.node.derive(0).get_address()] * count)
+
+    def test_unexpected_error(self):
+        with mock.patch.object(daemon, "process_request",
+                               side_effect=KeyError("boom")):
+            with self.assertRaises(daemon.DaemonError) as context:
+                self.remote.derive(1)
+        self.assertIn("KeyError", str(context.exception))
+        self.assertEqual(self.remote.derive(1).to_hdnode(),
+                         self.node.derive(1))
+
+    def test_keeps_regular_file(self):
+        path = os.path.join(self.directory, "file")
+        with open(path, "w") as file:
+            file.write("data")
+        with self.assertRaises(OSError):
+            daemon.DerivationServer(path)
+        self.assertTrue(os.path.isfile(path))
+
+    def test_concurrent_clients(self):
+        results = {}
+
+        def derive(i):
+            results[i] = self.remote.derive(i).to_hdnode()
+
+        threads = [threading.Thread(target=derive, args=(i,))
+                   for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([results[i] for i in range(8)],
+                         self.node.derive_range(0, 8))
+
+
+class TestNodeCache(unittest.TestCase):
+    def test_shared_prefixes(self):
+        node = HDNode.from_seed(SEED)
+        cache = daemon.NodeCache(max_size=10)
+        key = node.to_bytes()
+        self.assertEqual(cache.get(key, "m/0'/1/2"),
+                         node.derive_path("m/0'/1/2"))
+        self.assertEqual(len(cache), 4)
+        self.assertEqual(cache.get(key, "m/0'/1/3"),
+                         node.derive_path("m/0'/1/3"))
+        self.assertEqual(len(cache), 5)
+        cache.get(key, "m/0'/1/3")
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_size_limit(self):
+        node = HDNode.from_seed(SEED)
+        cache = daemon.NodeCache(max_size=3)
+        for i in range(10):
+            cache.get(node.to_bytes(), "m/{}".format(i))
+        self.assertEqual(len(cache), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
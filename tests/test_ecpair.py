@@ -1,6 +1,8 @@
+import pickle
 import unittest
 import random
 import base58
+from unittest import mock
 from pyhdwallet.ecpair import ECPair
 from pyhdwallet.hashutils import sha256
 from pyhdwallet.networks import Network, BITCOIN_TESTNET
@@ -145,6 +147,60 @@ class TestWIF(unittest.TestCase):
             ecpair.to_wif()
 
 
+class TestEquality(unittest.TestCase):
+    def test_eq_without_curve_operations(self):
+        with mock.patch('pyhdwallet.ecutils.get_pubkey_from_privkey',
+                        side_effect=AssertionError), \
+                mock.patch('pyhdwallet.ecutils.batch_points',
+                           side_effect=AssertionError):
+            self.assertEqual(ECPair(PRIVKEY_HEXA), ECPair(PRIVKEY_HEXA))
+            self.assertNotEqual(ECPair(PRIVKEY_HEXA),
+                                ECPair(PRIVKEY_HEXA, compressed=False))
+            self.assertNotEqual(ECPair(PRIVKEY_HEXA),
+                                ECPair(PRIVKEY_HEXA, network=BITCOIN_TESTNET))
+            self.assertEqual(hash(ECPair(PRIVKEY_HEXA)),
+                             hash(ECPair(PRIVKEY_HEXA)))
+
+    def test_eq_public_private(self):
+        ecpair = ECPair(PRIVKEY_HEXA)
+        public = ECPair(None, ecpair.pubkey_buffer)
+        self.assertNotEqual(ecpair, public)
+        self.assertEqual(public, ECPair(None, ecpair.pubkey_buffer))
+        self.assertNotEqual(ecpair, "abc")
+
+    def test_hashable(self):
+        ecpair = ECPair(PRIVKEY_HEXA)
+        public = ECPair(None, ecpair.pubkey_buffer)
+        keys = {ecpair, ECPair(PRIVKEY_HEXA), public,
+                ECPair(None, ecpair.pubkey_buffer)}
+        self.assertEqual(len(keys), 2)
+
+
+class TestPickle(unittest.TestCase):
+    def test_pickle_private(self):
+        ecpair = ECPair(PRIVKEY_HEXA, network=BITCOIN_TESTNET)
+        ecpair.pubkey_buffer, ecpair.pubkey_point
+        copy = pickle.loads(pickle.dumps(ecpair))
+        self.assertEqual(copy, ecpair)
+        self.assertIs(copy.network, BITCOIN_TESTNET)
+        # cached values are sent along, so nothing is computed again
+        with mock.patch('pyhdwallet.ecutils.get_pubkey_from_privkey',
+                        side_effect=AssertionError), \
+                mock.patch('pyhdwallet.ecutils.batch_points',
+                           side_effect=AssertionError):
+            self.assertEqual(copy.pubkey_buffer, ecpair.pubkey_buffer)
+            self.assertEqual(copy.pubkey_point, ecpair.pubkey_point)
+
+    def test_pickle_public(self):
+        public = ECPair(None, ECPair(PRIVKEY_HEXA,
+                                     compressed=False).pubkey_buffer)
+        copy = pickle.loads(pickle.dumps(public))
+        self.assertEqual(copy, public)
+        self.assertFalse(copy.compressed)
+        with self.assertRaises(RuntimeError):
+            copy.to_wif()
+
+
 class TestSignatures(unittest.TestCase):
     def test_sign_verify_comp_mainnet(self):
         wif = 'KzHvGCQJWGr3NT8L83Kpj6KK245QTKeXPy1jGV14LRWd1XA74Ngy'
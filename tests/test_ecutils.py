@@ -1,6 +1,9 @@
 import unittest
+from binascii import unhexlify
+from unittest import mock
 from pyhdwallet.ecpair import ECPair
 from pyhdwallet.hashutils import sha256
+from pyhdwallet import ecutils
 from pyhdwallet.ecutils import ECSignature
 
 
@@ -44,5 +47,80 @@ class TestECSignature(unittest.TestCase):
         self.assertFalse(result2)
 
 
+class TestPublicKeys(unittest.TestCase):
+    G = unhexlify("0279be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b"
+                  "16f81798")
+    G2 = unhexlify("02c6047f9441ed7d6d3045406e95c07cd85c778e4b8cef3ca7abac09b"
+                   "95c709ee5")
+    G3 = unhexlify("02f9308a019258c31049344f85f89d5229b531c845836f99b08601f11"
+                   "3bce036f9")
+
+    def test_get_pubkey_from_privkey(self):
+        self.assertEqual(ecutils.get_pubkey_from_privkey(1), self.G)
+        self.assertEqual(ecutils.get_pubkey_from_privkey(3), self.G3)
+        self.assertEqual(
+            ecutils.get_pubkey_from_privkey(1, compressed=False).hex(),
+            "0479be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f8"
+            "1798483ada7726a3c4655da4fbfc0e1108a8fd17b448a68554199c47d08ffb"
+            "10d4b8")
+        self.assertEqual(
+            ecutils.get_pubkey_from_privkey(ecutils.ORDER - 1).hex(),
+            "0379be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f8"
+            "1798")
+
+    def test_combine_pubkeys(self):
+        self.assertEqual(ecutils.combine_pubkeys(1, self.G2), self.G3)
+        self.assertEqual(ecutils.combine_pubkeys(2, self.G), self.G3)
+        # G + G is a doubling
+        self.assertEqual(ecutils.combine_pubkeys(1, self.G), self.G2)
+        with self.assertRaises(ValueError):
+            ecutils.combine_pubkeys(ecutils.ORDER - 1, self.G)
+
+
+class TestBytesLike(unittest.TestCase):
+    def setUp(self):
+        self.ecpair = ECPair(privkey='73d286994b2ac1a0f160fb45816c1dd6605551'
+                                     'eb0ea12d5595a440a3665ef89d')
+        self.hash = sha256(b"message")
+
+    def test_sign_verify_buffers(self):
+        buffers = [self.hash, bytearray(self.hash), memoryview(self.hash),
+                   memoryview(b"\x00" + self.hash)[1:]]
+        for buffer in buffers:
+            sig = self.ecpair.sign(buffer)
+            for other in buffers:
+                self.assertTrue(self.ecpair.verify(other, sig))
+                self.assertTrue(sig.verify(
+                    memoryview(self.ecpair.pubkey_buffer), other))
+        self.assertFalse(self.ecpair.verify(sha256(b"other"), sig))
+
+    def test_module_functions(self):
+        r, s = ecutils.sign(self.ecpair.privkey, memoryview(self.hash))
+        point = self.ecpair.pubkey_point
+        self.assertTrue(ecutils.verify(point, self.hash, r, s))
+        self.assertFalse(ecutils.verify(point, self.hash, s, r))
+        self.assertFalse(ecutils.verify(point, self.hash, 0, s))
+        self.assertFalse(ecutils.verify(point, self.hash, r, ecutils.ORDER))
+
+    def test_sign_vector(self):
+        # private key 1 and the RFC 6979 nonce of "Satoshi Nakamoto"
+        # (the usual vector gives the low s, ORDER - s)
+        k = 0x8f8a276c19f4149656b280621e358cce24f5f52542772691ee69063b74f15d15
+        r = 0x934b1ea10a4b3c1757e2b0c017d0b6143ce3c9a7e6a4a49860d7a6ab210ee3d8
+        s = 0x2442ce9d2b916064108014783e923ec36b49743e2ffa1c4496f01a512aafd9e5
+        hash_buffer = sha256(b"Satoshi Nakamoto")
+        with mock.patch("pyhdwallet.ecutils._random_scalar", return_value=k):
+            self.assertEqual(ecutils.sign(1, hash_buffer),
+                             (r, ecutils.ORDER - s))
+        self.assertTrue(ecutils.verify(ecutils.G_AFFINE, hash_buffer, r, s))
+        self.assertTrue(ecutils.verify(ecutils.G_AFFINE, hash_buffer, r,
+                                       ecutils.ORDER - s))
+
+    def test_hash_to_int(self):
+        self.assertEqual(ecutils._hash_to_int(bytearray(b"\x01\x00")), 256)
+        self.assertEqual(ecutils._hash_to_int(memoryview(self.hash)),
+                         int(self.hash.hex(), 16))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+from binascii import unhexlify
+from pyhdwallet import batch
+from pyhdwallet import export
+from pyhdwallet.hashutils import hash160
+from pyhdwallet.hdnode import HDNode
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+SEED = unhexlify('000102030405060708090a0b0c0d0e0f')
+
+
+class ExportTestCase(unittest.TestCase):
+    def setUp(self):
+        root = HDNode.from_seed(SEED)
+        self.parents = [root.derive(i).neutered() for i in range(3)]
+        self.children = batch.derive_public(self.parents, range(4))
+        self.expected = [
+            (n, i, self.children.get_pubkey(n, i),
+             hash160(self.children.get_pubkey(n, i)))
+            for n in range(3) for i in range(4)]
+
+
+@unittest.skipUnless(numpy, "needs numpy")
+class TestNumpy(ExportTestCase):
+    def test_to_numpy(self):
+        table = export.to_numpy(self.children)
+        self.assertEqual(table.dtype.names,
+                         ("parent", "index", "pubkey", "hash160"))
+        self.assertEqual(table["pubkey"].dtype, numpy.dtype("S33"))
+        self.assertEqual(len(table), 12)
+        self.assertEqual(table["pubkey"].tobytes(), self.children.pubkeys)
+        self.assertEqual([(int(r["parent"]), int(r["index"]))
+                          for r in table],
+                         [(n, i) for n, i, _, _ in self.expected])
+        self.assertEqual(table["hash160"].tobytes(),
+                         b"".join([e[3] for e in self.expected]))
+
+    def test_without_hash160s(self):
+        table = export.to_numpy(self.children, hash160s=False)
+        self.assertEqual(table.dtype.names, ("parent", "index", "pubkey"))
+
+
+@unittest.skipUnless(pyarrow, "needs pyarrow")
+class TestArrow(ExportTestCase):
+    def test_to_arrow(self):
+        table = export.to_arrow(self.children)
+        self.assertEqual(table.column_names,
+                         ["parent", "index", "pubkey", "hash160"])
+        self.assertEqual(table.schema.field("index").type, pyarrow.uint32())
+        rows = list(zip(*[table.column(name).to_pylist()
+                          for name in table.column_names]))
+        self.assertEqual(rows, self.expected)
+
+    def test_write_parquet(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "keys.parquet")
+            export.write_parquet(self.children, path, hash160s=False)
+            table = pyarrow.parquet.read_table(path)
+            self.assertEqual(table.column("pubkey").to_pylist(),
+                             [e[2] for e in self.expected])
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,8 @@
+import pickle
+import base58
 import unittest
 from binascii import unhexlify
+from pyhdwallet import hdnode
 from pyhdwallet.hdnode import HDNode
 from pyhdwallet.ecpair import ECPair
 from pyhdwallet.networks import BITCOIN_MAINNET
@@ -140,6 +143,100 @@ class TestHDNode(unittest.TestCase):
         path2 = self.hdnode_from_seed.derive_path("m/0/1'/0").to_base58()
         self.assertEqual(path1, path2)
 
+    def test_hash(self):
+        nodes = {self.hdnode_from_seed, self.hdnode_from_base58,
+                 self.hdnode_from_seed.neutered(),
+                 self.hdnode_from_base58.neutered(),
+                 self.hdnode_from_seed.derive(0)}
+        self.assertEqual(len(nodes), 3)
+        self.assertNotEqual(self.hdnode_from_seed, None)
+        self.assertEqual(hash(self.hdnode_from_seed),
+                         hash(self.hdnode_from_seed.to_bytes()))
+        with mock.patch('pyhdwallet.ecutils.mul_g',
+                        side_effect=AssertionError):
+            node = HDNode.from_base58(self.hdnode_from_seed.to_base58())
+            self.assertEqual(node, self.hdnode_from_seed)
+            self.assertEqual(hash(node), hash(self.hdnode_from_seed))
+
+    def test_pickle(self):
+        node = self.hdnode_from_seed.derive_path("m/0'/1")
+        node.keypair.pubkey_point
+        for obj in (node, node.neutered()):
+            copy = pickle.loads(pickle.dumps(obj))
+            self.assertEqual(copy, obj)
+            self.assertEqual(copy.to_base58(), obj.to_base58())
+            self.assertIs(copy.keypair.network, BITCOIN_MAINNET)
+        copy = pickle.loads(pickle.dumps(node))
+        with mock.patch('pyhdwallet.ecutils.get_pubkey_from_privkey',
+                        side_effect=AssertionError):
+            self.assertEqual(copy.get_fingerprint(), node.get_fingerprint())
+            self.assertEqual(copy.keypair.pubkey_point,
+                             node.keypair.pubkey_point)
+
+    def test_to_bytes(self):
+        for node in (self.hdnode_from_seed, self.hdnode_from_base58,
+                     self.hdnode_from_seed.derive_path("m/0'/1").neutered()):
+            buffer = node.to_bytes()
+            self.assertEqual(len(buffer), 78)
+            self.assertEqual(base58.b58encode_check(buffer).decode(),
+                             node.to_base58())
+            self.assertEqual(HDNode.from_bytes(buffer), node)
+
+    def test_from_bytes_offset(self):
+        nodes = self.hdnode_from_seed.derive_range(0, 3)
+        blob = bytearray(b"\xff" + b"".join(n.to_bytes() for n in nodes))
+        view = memoryview(blob)
+        parsed = [HDNode.from_bytes(view, 1 + 78 * i) for i in range(3)]
+        self.assertEqual(parsed, nodes)
+        with self.assertRaises(ValueError):
+            HDNode.from_bytes(view, 2 + 78 * 2)
+        with self.assertRaises(ValueError):
+            HDNode.from_bytes(b"\x00" * 78)
+
+    def test_base58_memoized(self):
+        node = self.hdnode_from_seed.derive(1)
+        encoded = node.to_base58()
+        with mock.patch('pyhdwallet.encoding.b58encode_check',
+                        side_effect=AssertionError):
+            self.assertIs(node.to_base58(), encoded)
+            self.assertIs(HDNode.from_base58(encoded).to_base58(), encoded)
+
+    def test_extra_version_serialized_as_xpub(self):
+        xpub = self.hdnode_from_seed.neutered().to_base58()
+        zpub = base58.b58encode_check(
+            bytes.fromhex("04b24746") + base58.b58decode_check(xpub)[4:])
+        node = HDNode.from_base58(zpub.decode())
+        self.assertIs(node.keypair.network, BITCOIN_MAINNET)
+        self.assertEqual(node.to_base58(), xpub)
+
+    def test_read_only(self):
+        with self.assertRaises(AttributeError):
+            self.hdnode_from_seed.depth = 2
+        with self.assertRaises(AttributeError):
+            self.hdnode_from_seed.keypair = None
+
+    def test_sign_many(self):
+        paths = ["m/84'/0'/0'/0/0", "m/84'/0'/0'/0/1", "m/84'/0'/0'/1/0",
+                 "m/84'/0'/0'/0/0", "m/0", "m"]
+        items = [(path, hashutils.sha256(bytes([i])))
+                 for i, path in enumerate(paths)]
+        derive = HDNode.derive
+        with mock.patch.object(HDNode, "derive", autospec=True,
+                               side_effect=derive) as mocked:
+            signatures = self.hdnode_from_seed.sign_many(items)
+        # m/84', m/84'/0', m/84'/0'/0', .../0, .../0/0, .../0/1, .../1,
+        # .../1/0 and m/0
+        self.assertEqual(mocked.call_count, 9)
+        self.assertEqual(len(signatures), len(items))
+        for (path, hash_buffer), sig in zip(items, signatures):
+            keypair = self.hdnode_from_seed.derive_path(path).keypair
+            self.assertTrue(keypair.verify(hash_buffer, sig))
+
+    def test_sign_many_neutered(self):
+        with self.assertRaises(RuntimeError):
+            self.hdnode_from_seed.neutered().sign_many(
+                [("m/0", hashutils.sha256(b"a"))])
+
     def test_derive_neutered(self):
         path1 = self.hdnode_from_seed.derive(0).neutered().derive(1).to_base58()
         path2 = self.hdnode_from_seed.derive_path("m/0/1").neutered().to_base58()
@@ -166,6 +263,49 @@ class TestHDNode(unittest.TestCase):
 
 
 
+class TestKeyCache(unittest.TestCase):
+    def setUp(self):
+        root = HDNode.from_seed(unhexlify('000102030405060708090a0b0c0d0e0f'))
+        self.xpubs = [root.derive(i).neutered().to_base58() for i in range(4)]
+
+    def tearDown(self):
+        hdnode.disable_key_cache()
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(hdnode.key_cache_info())
+        self.assertIsNot(HDNode.from_base58(self.xpubs[0]),
+                         HDNode.from_base58(self.xpubs[0]))
+
+    def test_interning(self):
+        hdnode.enable_key_cache(max_size=10)
+        node = HDNode.from_base58(self.xpubs[0])
+        self.assertIs(HDNode.from_base58(self.xpubs[0]), node)
+        self.assertIs(HDNode.from_bytes(b"\x00" + node.to_bytes(), 1),
+                      HDNode.from_bytes(node.to_bytes()))
+        self.assertEqual(node.keypair._cached_state()[1],
+                         node.keypair.pubkey_point)
+        self.assertEqual(hdnode.key_cache_info(),
+                         hdnode.KeyCacheInfo(2, 2, 10, 2))
+
+    def test_size_limit(self):
+        hdnode.enable_key_cache(max_size=2)
+        first = HDNode.from_base58(self.xpubs[0])
+        for xpub in self.xpubs[1:]:
+            HDNode.from_base58(xpub)
+        self.assertEqual(hdnode.key_cache_info().currsize, 2)
+        self.assertIsNot(HDNode.from_base58(self.xpubs[0]), first)
+        with self.assertRaises(ValueError):
+            hdnode.enable_key_cache(0)
+
+    def test_invalid_not_cached(self):
+        hdnode.enable_key_cache()
+        with self.assertRaises(ValueError):
+            HDNode.from_base58(self.xpubs[0][:-1] + "x")
+        with self.assertRaises(ValueError):
+            HDNode.from_bytes(bytes(10))
+        self.assertEqual(hdnode.key_cache_info().currsize, 0)
+
+
 class TestHDNodeVector1(TestVector):
     def setUp(self):
         seed = '000102030405060708090a0b0c0d0e0f'
@@ -0,0 +1,61 @@
+import subprocess
+import sys
+import unittest
+import pyhdwallet
+from pyhdwallet import ecutils
+
+XPUB = "xpub661MyMwAqRbcFtXgS5sYJABqqG9YLmC4Q1Rdap9gSE8NqtwybGhePY2gZ29ESFjqJoCu1Rupje8YtGqsefD265TMg7usUDFdp6W1EGMcet8"
+DEFERRED = ("ecdsa", "asyncio", "random", "concurrent.futures",
+            "pyhdwallet.aio", "pyhdwallet.mnemonic")
+
+
+def loaded_modules(statement):
+    """ Returns the deferred modules loaded by a statement in a new process """
+    code = "import sys\n{}\nprint(' '.join(m for m in {!r} " \
+           "if m in sys.modules))".format(statement, DEFERRED)
+    output = subprocess.check_output([sys.executable, "-c", code],
+                                     universal_newlines=True)
+    return output.split()
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_import_package(self):
+        self.assertEqual(loaded_modules("import pyhdwallet"), [])
+        output = subprocess.check_output(
+            [sys.executable, "-c", "import sys, pyhdwallet\n"
+             "print('pyhdwallet.hdnode' in sys.modules)"],
+            universal_newlines=True)
+        self.assertEqual(output.strip(), "False")
+
+    def test_parse_xpub_and_address(self):
+        statement = "from pyhdwallet import HDNode\n" \
+                    "HDNode.from_base58({!r}).derive(0).get_address()" \
+                    .format(XPUB)
+        self.assertEqual(loaded_modules(statement), [])
+
+    def test_lazy_attributes(self):
+        from pyhdwallet.hdnode import HDNode
+        from pyhdwallet.ecpair import ECPair
+        self.assertIs(pyhdwallet.HDNode, HDNode)
+        self.assertIs(pyhdwallet.ECPair, ECPair)
+        self.assertIn("HDNode", dir(pyhdwallet))
+        with self.assertRaises(AttributeError):
+            pyhdwallet.Unknown
+
+    def test_curve_constants(self):
+        x, y = ecutils.G_AFFINE
+        p = ecutils.FIELD_PRIME
+        self.assertEqual(y * y % p, (x ** 3 + 7) % p)
+        # (ORDER - 1) * G == -G
+        self.assertEqual(ecutils.batch_points([ecutils.ORDER - 1]),
+                         [(x, p - y)])
+
+    def test_warmup(self):
+        pyhdwallet.warmup()
+        self.assertIsNotNone(ecutils._g_table)
+        self.assertNotIn("ecdsa", loaded_modules("import pyhdwallet\n"
+                                                 "pyhdwallet.warmup()"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from binascii import unhexlify
+from pyhdwallet import batch
+from pyhdwallet import instrumentation
+from pyhdwallet import hashutils
+from pyhdwallet import keyrange
+from pyhdwallet import schnorr
+from pyhdwallet.hdnode import HDNode
+
+SEED = unhexlify('000102030405060708090a0b0c0d0e0f')
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        instrumentation.reset()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.set_callback(None)
+        instrumentation.reset()
+
+    def test_disabled_keeps_original_functions(self):
+        original = hashutils.hmac_sha512
+        instrumentation.enable()
+        self.assertIsNot(hashutils.hmac_sha512, original)
+        instrumentation.disable()
+        self.assertIs(hashutils.hmac_sha512, original)
+        self.assertFalse(instrumentation.is_enabled())
+
+    def test_disabled_records_nothing(self):
+        HDNode.from_seed(SEED).derive_path("m/0/1").to_base58()
+        stats = instrumentation.snapshot()
+        self.assertTrue(all(s.calls == 0 for s in stats.values()))
+
+    def test_counters(self):
+        instrumentation.enable()
+        node = HDNode.from_seed(SEED).derive_path("m/0/1")
+        encoded = node.neutered().to_base58()
+        HDNode.from_base58(encoded).derive(2)
+        stats = instrumentation.snapshot()
+        self.assertEqual(stats["hmac_sha512"].calls, 4)
+        self.assertEqual(stats["b58encode"].calls, 1)
+        self.assertEqual(stats["b58decode"].calls, 1)
+        self.assertEqual(stats["decompress"].calls, 1)
+        self.assertEqual(stats["point_add"].calls, 1)
+        self.assertGreater(stats["point_mul"].calls, 0)
+        self.assertGreater(stats["hash160"].calls, 0)
+        self.assertGreater(stats["hmac_sha512"].total_ns, 0)
+
+    def test_batch_path(self):
+        root = HDNode.from_seed(SEED)
+        parents = [root.derive(i).neutered() for i in range(3)]
+        instrumentation.enable()
+        batch.derive_public(parents, range(10))
+        stats = instrumentation.snapshot()
+        self.assertEqual(stats["hmac_sha512"].calls, 30)
+        self.assertEqual(stats["point_add"].calls, 30)
+
+    def test_keyrange_and_schnorr(self):
+        instrumentation.enable()
+        list(keyrange.enumerate_keys(1, 11, hash160s=False))
+        self.assertEqual(instrumentation.snapshot()["point_add"].calls, 10)
+        instrumentation.reset()
+        sig = schnorr.sign(3, bytes(32), bytes(32))
+        schnorr.verify(schnorr.xonly_pubkey(3), bytes(32), sig)
+        stats = instrumentation.snapshot()
+        self.assertEqual(stats["point_add"].calls, 1)
+        self.assertGreater(stats["point_mul"].calls, 0)
+
+    def test_reset(self):
+        instrumentation.enable()
+        hashutils.hash160(b"abc")
+        instrumentation.reset()
+        self.assertEqual(instrumentation.snapshot()["hash160"].calls, 0)
+
+    def test_callback(self):
+        events = []
+        instrumentation.set_callback(lambda name, ns: events.append(name))
+        instrumentation.enable()
+        hashutils.hmac_sha512(b"key", b"msg")
+        self.assertEqual(events, ["hmac_sha512"])
+
+
+if __name__ == '__main__':
+    unittest.main()
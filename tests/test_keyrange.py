@@ -0,0 +1,52 @@
+import unittest
+from pyhdwallet import ecutils
+from pyhdwallet import hashutils
+from pyhdwallet.keyrange import enumerate_keys
+
+
+class TestEnumerateKeys(unittest.TestCase):
+    def test_pubkeys_and_hashes(self):
+        chunks = list(enumerate_keys(1, 21, chunk_size=8))
+        self.assertEqual([c.start for c in chunks], [1, 9, 17])
+        pubkeys = [p for c in chunks for p in c.pubkeys]
+        hashes = [h for c in chunks for h in c.hash160s]
+        for k, pubkey, h160 in zip(range(1, 21), pubkeys, hashes):
+            self.assertEqual(pubkey, ecutils.get_pubkey_from_privkey(k))
+            self.assertEqual(h160, hashutils.hash160(pubkey))
+        self.assertEqual(len(pubkeys), 20)
+
+    def test_uncompressed_without_hashes(self):
+        start = 0x4ccbf2a1c6ee9a5106cb19c6be343947701a4e4acb2c4311f5a10836109711a1
+        chunk, = enumerate_keys(start, start + 5, compressed=False,
+                                hash160s=False)
+        self.assertIsNone(chunk.hash160s)
+        self.assertEqual(chunk.pubkeys,
+                         [ecutils.get_pubkey_from_privkey(k, False)
+                          for k in range(start, start + 5)])
+
+    def test_end_of_range(self):
+        order = ecutils.ORDER
+        chunk, = enumerate_keys(order - 3, order)
+        self.assertEqual(chunk.pubkeys,
+                         [ecutils.get_pubkey_from_privkey(k)
+                          for k in range(order - 3, order)])
+
+    def test_workers(self):
+        single = list(enumerate_keys(100, 150, chunk_size=7))
+        self.assertEqual(list(enumerate_keys(100, 150, workers=2,
+                                             chunk_size=7)), single)
+
+    def test_invalid_range(self):
+        with self.assertRaises(ValueError):
+            enumerate_keys(0, 10)
+        with self.assertRaises(ValueError):
+            enumerate_keys(5, ecutils.ORDER + 1)
+        with self.assertRaises(ValueError):
+            enumerate_keys(10, 5)
+        with self.assertRaises(ValueError):
+            enumerate_keys(1, 10, chunk_size=0)
+        self.assertEqual(list(enumerate_keys(5, 5)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from binascii import unhexlify
+from pyhdwallet import mnemonic
+from pyhdwallet.hdnode import HDNode
+from pyhdwallet.networks import BITCOIN_TESTNET
+
+# https://github.com/trezor/python-mnemonic/blob/master/vectors.json
+VECTOR_1 = {
+    "mnemonic": "abandon abandon abandon abandon abandon abandon abandon "
+                "abandon abandon abandon abandon about",
+    "seed": "c55257c360c07c72029aebc1b53c05ed0362ada38ead3e3e9efa3708e5349553"
+            "1f09a6987599d18264c1e1c92f2cf141630c7a3c4ab7c81b2f001698e7463b04",
+    "xprv": "xprv9s21ZrQH143K3h3fDYiay8mocZ3afhfULfb5GX8kCBdno77K4HiA15Tg23wp"
+            "beF1pLfs1c5SPmYHrEpTuuRhxMwvKDwqdKiGJS9XFKzUsAF"
+}
+
+VECTOR_2 = {
+    "mnemonic": "legal winner thank year wave sausage worth useful legal "
+                "winner thank yellow",
+    "seed": "2e8905819b8723fe2c1d161860e5ee1830318dbf49a83bd451cfb8440c28bd6f"
+            "a457fe1296106559a3c80937a1c1069be3a3a5bd381ee6260e8d9739fce1f607"
+}
+
+
+class TestMnemonic(unittest.TestCase):
+    def test_wordlist(self):
+        words = mnemonic.get_wordlist()
+        self.assertEqual(len(words), 2048)
+        self.assertEqual(words[0], "abandon")
+        self.assertEqual(words[-1], "zoo")
+
+    def test_seed(self):
+        for vector in (VECTOR_1, VECTOR_2):
+            seed = mnemonic.mnemonic_to_seed(vector["mnemonic"], "TREZOR")
+            self.assertEqual(seed, unhexlify(vector["seed"]))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            mnemonic.validate_mnemonic("abandon " * 11)
+        with self.assertRaises(ValueError):
+            mnemonic.validate_mnemonic("abandon " * 11 + "foo")
+        with self.assertRaises(ValueError):
+            mnemonic.validate_mnemonic("abandon " * 12)
+        mnemonic.mnemonic_to_seed("abandon " * 12, validate=False)
+
+    def test_from_mnemonic(self):
+        node = HDNode.from_mnemonic(VECTOR_1["mnemonic"], "TREZOR")
+        self.assertEqual(node.to_base58(), VECTOR_1["xprv"])
+        node = HDNode.from_mnemonic(VECTOR_1["mnemonic"], "TREZOR",
+                                    network=BITCOIN_TESTNET)
+        self.assertIs(node.keypair.network, BITCOIN_TESTNET)
+
+    def test_from_mnemonics(self):
+        items = [VECTOR_1["mnemonic"], "abandon " * 12,
+                 (VECTOR_2["mnemonic"], "")]
+        for workers in (None, 2):
+            results = HDNode.from_mnemonics(items, "TREZOR", workers=workers)
+            self.assertEqual([r.index for r in results], [0, 1, 2])
+            self.assertEqual(results[0].node.to_base58(), VECTOR_1["xprv"])
+            self.assertIsNone(results[1].node)
+            self.assertIsNotNone(results[1].error)
+            self.assertEqual(results[2].node,
+                             HDNode.from_mnemonic(VECTOR_2["mnemonic"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from binascii import unhexlify
+from pyhdwallet import address
+from pyhdwallet import batch
+from pyhdwallet.hdnode import HDNode
+from pyhdwallet.multisig import MultisigWallet, redeem_script
+from pyhdwallet.networks import BITCOIN_MAINNET, BITCOIN_TESTNET
+
+
+class TestRedeemScript(unittest.TestCase):
+    def test_bip67(self):
+        # https://github.com/bitcoin/bips/blob/master/bip-0067.mediawiki
+        pubkeys = [unhexlify("02ff12471208c14bd580709cb2358d98975247d8765f92"
+                             "bc25eab3b2763ed605f8"),
+                   unhexlify("02fe6f0a5a297eb38c391581c4413e084773ea23954d93"
+                             "f7753db7dc0adc188b2f")]
+        script = redeem_script(2, pubkeys)
+        self.assertEqual(script.hex(),
+                         "522102fe6f0a5a297eb38c391581c4413e084773ea23954d93"
+                         "f7753db7dc0adc188b2f2102ff12471208c14bd580709cb2358d"
+                         "98975247d8765f92bc25eab3b2763ed605f852ae")
+        self.assertEqual(address.from_script(script, BITCOIN_MAINNET),
+                         "39bgKC7RFbpoCRbtD5KEdkYKtNyhpsNa3Z")
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            redeem_script(3, [b"\x02" * 33] * 2)
+        with self.assertRaises(ValueError):
+            redeem_script(1, [b"\x04" * 65])
+
+
+class TestMultisigWallet(unittest.TestCase):
+    def setUp(self):
+        self.cosigners = [
+            HDNode.from_seed(bytes([i]) * 16).derive_path("m/48'/0'")
+            for i in range(3)]
+
+    def test_derive_range(self):
+        for kind in address.SCRIPT_KINDS:
+            wallet = MultisigWallet(2, [c.neutered().to_base58()
+                                        for c in self.cosigners], kind)
+            results = wallet.derive_range(10, 14)
+            self.assertEqual([r.index for r in results], [10, 11, 12, 13])
+            for result in results:
+                pubkeys = [c.derive(result.index).keypair.pubkey_buffer
+                           for c in self.cosigners]
+                script = redeem_script(2, pubkeys)
+                self.assertEqual(result.redeem_script, script)
+                self.assertEqual(result.address, address.from_script(
+                    script, BITCOIN_MAINNET, kind))
+            self.assertEqual(wallet.get_address(12), results[2].address)
+
+    def test_private_cosigners(self):
+        wallet = MultisigWallet(1, self.cosigners, address.P2SH)
+        self.assertTrue(all(c.is_neutered() for c in wallet.cosigners))
+        self.assertEqual(
+            wallet.get_address(0),
+            MultisigWallet(1, [c.neutered() for c in self.cosigners],
+                           address.P2SH).get_address(0))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            MultisigWallet(4, self.cosigners)
+        with self.assertRaises(ValueError):
+            MultisigWallet(2, self.cosigners, address.P2PKH)
+        testnet = HDNode.from_seed(b"\x05" * 16, BITCOIN_TESTNET)
+        with self.assertRaises(ValueError):
+            MultisigWallet(2, self.cosigners[:2] + [testnet])
+
+
+class TestDerivePublicPoints(unittest.TestCase):
+    def test_points(self):
+        root = HDNode.from_seed(b"\x01" * 16)
+        nodes = [root.derive(0).neutered(), root.derive(1)]
+        points = batch.derive_public_points(nodes, [3, 4])
+        for node, node_points in zip(nodes, points):
+            self.assertEqual(node_points,
+                             [node.derive(3).keypair.pubkey_point,
+                              node.derive(4).keypair.pubkey_point])
+        with self.assertRaises(ValueError):
+            batch.derive_public_points(nodes, [0x80000000])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import json
+import os
+import pickle
+import tempfile
+import unittest
+import base58
+from pyhdwallet.hdnode import HDNode
+from pyhdwallet.networks import Network, BITCOIN_MAINNET, BITCOIN_TESTNET, \
+    LITECOIN_MAINNET, load_networks
+
+XPUB = "xpub661MyMwAqRbcFtXgS5sYJABqqG9YLmC4Q1Rdap9gSE8NqtwybGhePY2gZ29ESFjqJoCu1Rupje8YtGqsefD265TMg7usUDFdp6W1EGMcet8"
+
+
+class TestNetworkLookup(unittest.TestCase):
+    def setUp(self):
+        self.networks = Network.get_supported_networks()
+
+    def tearDown(self):
+        Network.set_supported_networks(self.networks)
+
+    def test_get_by_version(self):
+        self.assertIs(Network.get_by_version(0x0488B21E), BITCOIN_MAINNET)
+        self.assertIs(Network.get_by_version(0x0488ADE4), BITCOIN_MAINNET)
+        self.assertIs(Network.get_by_version(0x043587CF), BITCOIN_TESTNET)
+        self.assertIsNone(Network.get_by_version(0x01020304))
+
+    def test_get_by_wif(self):
+        self.assertIs(Network.get_by_wif(b"\x80"), BITCOIN_MAINNET)
+        self.assertIs(Network.get_by_wif(b"\xEF"), BITCOIN_TESTNET)
+        self.assertIsNone(Network.get_by_wif(b"\x01"))
+
+    def test_get_by_pub_key_hash(self):
+        self.assertIs(Network.get_by_pub_key_hash(b"\x00"), BITCOIN_MAINNET)
+        self.assertIs(Network.get_by_pub_key_hash(b"\x6F"), BITCOIN_TESTNET)
+
+    def test_is_supported(self):
+        self.assertTrue(Network.is_supported(BITCOIN_MAINNET))
+        copy = Network(*BITCOIN_MAINNET.__reduce__()[1])
+        self.assertIsNot(copy, BITCOIN_MAINNET)
+        self.assertTrue(Network.is_supported(copy))
+        other = Network("Other", 1, 2, b"\x01", b"\x02")
+        self.assertFalse(Network.is_supported(other))
+
+    def test_indexes_rebuilt(self):
+        Network.set_supported_networks([BITCOIN_TESTNET])
+        self.assertIsNone(Network.get_by_version(0x0488B21E))
+        self.assertFalse(Network.is_supported(BITCOIN_MAINNET))
+        self.assertIs(Network.get_by_wif(b"\xEF"), BITCOIN_TESTNET)
+
+
+class TestNetworkRegistry(unittest.TestCase):
+    def setUp(self):
+        self.networks = Network.get_supported_networks()
+
+    def tearDown(self):
+        Network.set_supported_networks(self.networks)
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            BITCOIN_MAINNET.wif = b"\x00"
+        with self.assertRaises(AttributeError):
+            del BITCOIN_MAINNET.wif
+        with self.assertRaises(AttributeError):
+            BITCOIN_MAINNET.other = 1
+
+    def test_pickle_interned(self):
+        self.assertIs(pickle.loads(pickle.dumps(BITCOIN_MAINNET)),
+                      BITCOIN_MAINNET)
+        network = Network("Test coin", 0x01020304, 0x01020305, b"\x42",
+                          b"\x43", {"other": (1, 2)})
+        copy = pickle.loads(pickle.dumps(network))
+        self.assertIsNot(copy, network)
+        self.assertEqual(copy, network)
+        Network.register(network)
+        self.assertIs(pickle.loads(pickle.dumps(network)), network)
+
+    def test_hashable(self):
+        copy = Network(*BITCOIN_MAINNET.__reduce__()[1])
+        self.assertEqual(hash(copy), hash(BITCOIN_MAINNET))
+        self.assertEqual(len({BITCOIN_MAINNET, copy, BITCOIN_TESTNET}), 2)
+
+    def test_register(self):
+        network = Network("Test coin", 0x01020304, 0x01020305, b"\x42",
+                          b"\x43")
+        Network.register(network)
+        Network.register(network)
+        self.assertEqual(Network.get_supported_networks(),
+                         self.networks + [network])
+        self.assertIs(Network.get_by_version(0x01020305), network)
+        self.assertIs(Network.get_by_wif(b"\x80"), BITCOIN_MAINNET)
+
+    def test_supported_networks_copied(self):
+        Network.set_supported_networks(iter(self.networks))
+        self.assertEqual(Network.get_supported_networks(), self.networks)
+        Network.set_supported_networks(tuple(self.networks))
+        network = Network("Test coin", 0x01020304, 0x01020305, b"\x42",
+                          b"\x43")
+        Network.register(network)
+        supported = Network.get_supported_networks()
+        supported.clear()
+        self.assertEqual(Network.get_supported_networks(),
+                         self.networks + [network])
+
+    def test_load_networks(self):
+        definitions = [{"description": "Test coin", "version_priv": "01020304",
+                        "version_pub": "01020305", "pub_key_hash": "42",
+                        "wif": "43",
+                        "extra_versions": {"abcd": ["01020306", "01020307"]}}]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "networks.json")
+            with open(path, "w") as file:
+                json.dump(definitions, file)
+            network, = load_networks(path)
+        self.assertEqual(network.pub_key_hash, b"\x42")
+        self.assertEqual(network.get_versions(),
+                         [(0x01020304, 0x01020305), (0x01020306, 0x01020307)])
+        self.assertTrue(network.is_public_version(0x01020307))
+        self.assertFalse(network.is_public_version(0x01020306))
+        with self.assertRaises(ValueError):
+            network.is_public_version(0x0488B21E)
+
+    def test_default_registry(self):
+        self.assertIs(Network.get_by_version(0x019DA462), LITECOIN_MAINNET)
+        self.assertIs(Network.get_by_wif(b"\xB0"), LITECOIN_MAINNET)
+
+    def test_parse_slip132(self):
+        payload = base58.b58decode_check(XPUB)
+        for version in (0x049D7CB2, 0x04B24746):
+            encoded = base58.b58encode_check(
+                version.to_bytes(4, "big") + payload[4:]).decode()
+            node = HDNode.from_base58(encoded)
+            self.assertIs(node.keypair.network, BITCOIN_MAINNET)
+            self.assertTrue(node.is_neutered())
+            self.assertEqual(node.to_base58(), XPUB)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from binascii import unhexlify
+from concurrent.futures import ThreadPoolExecutor
+from pyhdwallet import parallel
+from pyhdwallet.ecpair import ECPair
+from pyhdwallet.hashutils import sha256
+from pyhdwallet.hdnode import HDNode
+from pyhdwallet.networks import Network
+
+SEED = unhexlify('000102030405060708090a0b0c0d0e0f')
+
+
+class TestParallel(unittest.TestCase):
+    def setUp(self):
+        self.node = HDNode.from_seed(SEED)
+
+    def test_map_chunks_executors(self):
+        chunks = [[1, 2], [3], [4, 5, 6]]
+        for executor in (parallel.THREAD, parallel.PROCESS):
+            self.assertEqual(list(parallel.map_chunks(
+                sum, chunks, 2, executor=executor)), [3, 3, 15])
+        with self.assertRaises(ValueError):
+            list(parallel.map_chunks(sum, chunks, 2, executor="fiber"))
+
+    def test_map_chunks_args(self):
+        self.assertEqual(list(parallel.map_chunks(
+            divmod, [7, 9], None, args=(2,))), [(3, 1), (4, 1)])
+        self.assertEqual(list(parallel.map_chunks(
+            divmod, [7, 9], 2, (4,), parallel.THREAD)), [(1, 3), (2, 1)])
+
+    def test_ranges(self):
+        self.assertEqual(list(parallel.ranges(3, 10, 3)),
+                         [(3, 6), (6, 9), (9, 10)])
+        self.assertEqual(list(parallel.ranges(5, 5, 3)), [])
+
+    def test_derive_range(self):
+        expected = self.node.derive_range(0, 7)
+        for executor in (parallel.THREAD, parallel.PROCESS):
+            self.assertEqual(parallel.derive_range(
+                self.node, 0, 7, workers=2, executor=executor,
+                chunk_size=3), expected)
+
+    def test_sign_many(self):
+        items = [(self.node.derive(i).keypair, sha256(bytes([i])))
+                 for i in range(5)]
+        signatures = parallel.sign_many(items, workers=2, chunk_size=2)
+        self.assertEqual(len(signatures), 5)
+        for (ecpair, hash_buffer), sig in zip(items, signatures):
+            self.assertTrue(ecpair.verify(hash_buffer, sig))
+
+
+class TestThreadSafety(unittest.TestCase):
+    def test_lazy_caches(self):
+        nodes = [HDNode.from_seed(SEED).derive(i) for i in range(4)]
+        keypairs = [ECPair(node.keypair.privkey) for node in nodes]
+        expected = [(node.to_base58(), node.keypair.pubkey_buffer,
+                     node.keypair.pubkey_point) for node in nodes]
+        fresh = [HDNode.from_base58(e[0]) for e in expected]
+
+        def first_access(i):
+            node, keypair = fresh[i % 4], keypairs[i % 4]
+            return (node.to_base58(), keypair.pubkey_buffer,
+                    keypair.pubkey_point)
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(first_access, range(32)))
+        self.assertEqual(results, expected * 8)
+
+    def test_register_networks(self):
+        networks = Network.get_supported_networks()
+        new = [Network("Coin {}".format(i), 0x10000000 + 2 * i,
+                       0x10000001 + 2 * i, bytes([0x40 + i]),
+                       bytes([0x60 + i])) for i in range(16)]
+        try:
+            with ThreadPoolExecutor(8) as pool:
+                list(pool.map(Network.register, new * 2))
+            supported = Network.get_supported_networks()
+            self.assertEqual(len(supported), len(networks) + 16)
+            for network in new:
+                self.assertIs(Network.get_by_version(network.version_pub),
+                              network)
+        finally:
+            Network.set_supported_networks(networks)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import threading
+import unittest
+from binascii import unhexlify
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from pyhdwallet import batch
+from pyhdwallet.hashutils import sha256
+from pyhdwallet.hdnode import HDNode
+from pyhdwallet.scheduler import BatchScheduler
+
+SEED = unhexlify('000102030405060708090a0b0c0d0e0f')
+
+
+class TestBatchScheduler(unittest.TestCase):
+    def setUp(self):
+        self.node = HDNode.from_seed(SEED)
+
+    def test_concurrent_sign_verify(self):
+        pairs = [self.node.derive(i).get_keypair() for i in range(20)]
+        hashes = [sha256(bytes([i])) for i in range(20)]
+        with BatchScheduler(max_batch_size=8, max_delay=0.01) as scheduler:
+            with ThreadPoolExecutor(10) as pool:
+                signatures = list(pool.map(
+                    lambda a: scheduler.sign(*a).result(),
+                    zip(pairs, hashes)))
+            futures = [scheduler.verify(ecpair, hash_buffer, sig)
+                       for ecpair, hash_buffer, sig
+                       in zip(pairs, hashes, signatures)]
+            self.assertTrue(all(f.result() for f in futures))
+
+    def test_batches_bounded(self):
+        sizes = []
+        original = batch.derive_children
+
+        def derive_children(items):
+            sizes.append(len(items))
+            return original(items)
+
+        with mock.patch.dict('pyhdwallet.scheduler._OPERATIONS',
+                             {"derive": (derive_children, None)}):
+            with BatchScheduler(max_batch_size=4, max_delay=0.05) as sched:
+                futures = [sched.derive(self.node, i) for i in range(10)]
+                children = [f.result() for f in futures]
+        self.assertEqual(children, [self.node.derive(i) for i in range(10)])
+        self.assertTrue(all(size <= 4 for size in sizes))
+        self.assertLess(len(sizes), 10)
+
+    def test_per_request_errors(self):
+        neutered = self.node.neutered()
+        with BatchScheduler(max_delay=0.05) as scheduler:
+            ok = scheduler.derive(neutered, 1)
+            failed = scheduler.derive(neutered, 0x80000000)
+            self.assertEqual(ok.result(), self.node.derive(1).neutered())
+            with self.assertRaises(RuntimeError):
+                failed.result()
+
+    def test_closed(self):
+        scheduler = BatchScheduler()
+        scheduler.close()
+        with self.assertRaises(RuntimeError):
+            scheduler.derive(self.node, 0)
+
+    def test_submit_while_closing(self):
+        for _ in range(5):
+            scheduler = BatchScheduler(max_delay=0)
+            futures = []
+            started = threading.Event()
+
+            def submit():
+                started.set()
+                for _ in range(100):
+                    try:
+                        futures.append(scheduler.derive(self.node, 1))
+                    except RuntimeError:
+                        return
+
+            threads = [threading.Thread(target=submit) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            started.wait()
+            scheduler.close()
+            for thread in threads:
+                thread.join()
+            for future in futures:
+                self.assertEqual(future.result(timeout=5),
+                                 self.node.derive(1))
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            BatchScheduler(max_batch_size=0)
+        with self.assertRaises(ValueError):
+            BatchScheduler(max_delay=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
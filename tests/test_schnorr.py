@@ -0,0 +1,78 @@
+import random
+import unittest
+from pyhdwallet import schnorr
+from pyhdwallet.ecpair import ECPair
+
+# (secret, x-only pubkey, aux_rand, message, signature) from the BIP340 test
+# vectors
+VECTORS = [
+    (3,
+     "F9308A019258C31049344F85F89D5229B531C845836F99B08601F113BCE036F9",
+     "0000000000000000000000000000000000000000000000000000000000000000",
+     "0000000000000000000000000000000000000000000000000000000000000000",
+     "E907831F80848D1069A5371B402410364BDF1C5F8307B0084C55F1CE2DCA8215"
+     "25F66A4A85EA8B71E482A74F382D2CE5EBEEE8FDB2172F477DF4900D310536C0"),
+    (0xB7E151628AED2A6ABF7158809CF4F3C762E7160F38B4DA56A784D9045190CFEF,
+     "DFF1D77F2A671C5F36183726DB2341BE58FEAE1DA2DECED843240F7B502BA659",
+     "0000000000000000000000000000000000000000000000000000000000000001",
+     "243F6A8885A308D313198A2E03707344A4093822299F31D0082EFA98EC4E6C89",
+     "6896BD60EEAE296DB48A229FF71DFE071BDE413E6D43F917DC8DCF8C78DE3341"
+     "8906D11AC976ABCCB20B091292BFF4EA897EFCB639EA871CFA95F6DE339E4B0A"),
+]
+
+
+def random_items(count):
+    items = []
+    for _ in range(count):
+        secret = random.randrange(1, 2 ** 256 - 2 ** 129)
+        msg = bytes(random.getrandbits(8) for _ in range(32))
+        items.append((schnorr.xonly_pubkey(secret), msg,
+                      schnorr.sign(secret, msg)))
+    return items
+
+
+class TestSchnorr(unittest.TestCase):
+    def test_vectors(self):
+        for secret, pubkey, aux, msg, sig in VECTORS:
+            pubkey, aux, msg, sig = map(bytes.fromhex, (pubkey, aux, msg, sig))
+            self.assertEqual(schnorr.xonly_pubkey(secret), pubkey)
+            self.assertEqual(schnorr.sign(secret, msg, aux), sig)
+            self.assertTrue(schnorr.verify(pubkey, msg, sig))
+
+    def test_invalid(self):
+        _, pubkey, _, msg, sig = [bytes.fromhex(x) if isinstance(x, str)
+                                  else x for x in VECTORS[1]]
+        self.assertFalse(schnorr.verify(pubkey, msg[::-1], sig))
+        self.assertFalse(schnorr.verify(pubkey, msg, sig[:63] + b"\x00"))
+        self.assertFalse(schnorr.verify(b"\xff" * 32, msg, sig))
+        self.assertFalse(schnorr.verify(pubkey, msg, b"\xff" * 64))
+        self.assertFalse(schnorr.verify(pubkey, msg, sig[:32]))
+        with self.assertRaises(ValueError):
+            schnorr.sign(0, msg)
+
+    def test_batch_verify(self):
+        for count in (1, 5, 300):
+            items = random_items(count)
+            self.assertTrue(schnorr.batch_verify(items))
+            pubkey, msg, sig = items[-1]
+            items[-1] = (pubkey, msg[::-1], sig)
+            self.assertFalse(schnorr.batch_verify(items))
+        self.assertTrue(schnorr.batch_verify([]))
+
+    def test_ecpair(self):
+        secret, pubkey, aux, msg, sig = VECTORS[1]
+        ecpair = ECPair(secret)
+        self.assertEqual(ecpair.xonly_pubkey, bytes.fromhex(pubkey))
+        signature = ecpair.sign_schnorr(bytes.fromhex(msg),
+                                        bytes.fromhex(aux))
+        self.assertEqual(signature, bytes.fromhex(sig))
+        public = ECPair(None, ecpair.pubkey_buffer)
+        self.assertTrue(public.verify_schnorr(bytes.fromhex(msg), signature))
+        self.assertTrue(public.verify_schnorr(
+            b"abc", ecpair.sign_schnorr(b"abc")))
+        with self.assertRaises(RuntimeError):
+            public.sign_schnorr(b"abc")
+
+
+if __name__ == '__main__':
+    unittest.main()